@@ -0,0 +1,153 @@
+"""library and playlist indexes
+
+Brings a database created from the initial models up to date: composite and
+unique indexes for library and playlist lookups, playlist aggregates and
+version, listening history, listener sketches and trigram search indexes.
+Duplicate likes and playlist entries are removed (keeping the oldest) before
+the unique constraints go on, and the new playlist columns are backfilled.
+
+This revision collects every model change made before migrations existed;
+until it, startup ran create_all, which adds missing tables but never new
+columns or indexes on existing ones:
+
+- trigram search indexes (user-005)
+- keyset indexes on liked_songs and songs (user-006)
+- playlists.version (user-008)
+- playlist aggregates and the playlist_songs position index (user-009)
+- recently_played and artists.monthly_listeners ranking indexes (user-013)
+- artist_daily_listeners and rollup_watermarks (user-014)
+- listening_history, seeded from the play log (user-015)
+- unique liked_songs and playlist_songs constraints (user-016)
+
+Later schema changes each ship their own revision.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 18:16:20
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_INDEXES = (
+    ('ix_songs_title_trgm', 'songs', 'title'),
+    ('ix_albums_title_trgm', 'albums', 'title'),
+    ('ix_artists_name_trgm', 'artists', 'name'),
+)
+
+
+def _delete_duplicates(table: str, owner: str) -> None:
+    op.execute(
+        f"DELETE FROM {table} WHERE id NOT IN ("
+        f"SELECT MIN(id) FROM {table} GROUP BY {owner}, song_id)"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.Column('last_full_day', sa.Date(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('artist_daily_listeners',
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('sketch', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['artist_id'], ['artists.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('artist_id', 'day')
+    )
+    op.create_index('ix_artist_daily_listeners_day', 'artist_daily_listeners', ['day'], unique=False)
+
+    op.create_table('listening_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('song_id', sa.Integer(), nullable=False),
+    sa.Column('played_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['song_id'], ['songs.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'song_id', name='uq_listening_history_user_song')
+    )
+    op.create_index('ix_listening_history_id', 'listening_history', ['id'], unique=False)
+    op.create_index('ix_listening_history_user_played', 'listening_history', ['user_id', 'played_at', 'id'], unique=False)
+    op.execute(
+        "INSERT INTO listening_history (user_id, song_id, played_at) "
+        "SELECT user_id, song_id, MAX(played_at) FROM recently_played GROUP BY user_id, song_id"
+    )
+
+    _delete_duplicates('liked_songs', 'user_id')
+    with op.batch_alter_table('liked_songs', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_liked_songs_user_song', ['user_id', 'song_id'])
+    op.create_index('ix_liked_songs_user_created', 'liked_songs', ['user_id', 'created_at', 'id'], unique=False)
+
+    _delete_duplicates('playlist_songs', 'playlist_id')
+    with op.batch_alter_table('playlist_songs', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_playlist_songs_playlist_song', ['playlist_id', 'song_id'])
+    op.create_index('ix_playlist_songs_playlist_position', 'playlist_songs', ['playlist_id', 'position', 'id'], unique=False)
+
+    with op.batch_alter_table('playlists', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+        batch_op.add_column(sa.Column('song_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('total_duration', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('max_position', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE playlists SET "
+        "song_count = (SELECT COUNT(*) FROM playlist_songs WHERE playlist_songs.playlist_id = playlists.id), "
+        "total_duration = (SELECT COALESCE(SUM(songs.duration), 0) FROM playlist_songs "
+        "JOIN songs ON songs.id = playlist_songs.song_id WHERE playlist_songs.playlist_id = playlists.id), "
+        "max_position = (SELECT COALESCE(MAX(position), 0) FROM playlist_songs WHERE playlist_songs.playlist_id = playlists.id)"
+    )
+
+    op.create_index('ix_recently_played_played_song', 'recently_played', ['played_at', 'song_id'], unique=False)
+    op.create_index('ix_songs_plays_id', 'songs', ['plays', 'id'], unique=False)
+    op.create_index('ix_artists_monthly_listeners', 'artists', ['monthly_listeners', 'id'], unique=False)
+
+    if op.get_context().dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(name, table, [column], unique=False, postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name == 'postgresql':
+        for name, table, _ in TRIGRAM_INDEXES:
+            op.drop_index(name, table_name=table)
+
+    op.drop_index('ix_artists_monthly_listeners', table_name='artists')
+    op.drop_index('ix_songs_plays_id', table_name='songs')
+    op.drop_index('ix_recently_played_played_song', table_name='recently_played')
+
+    with op.batch_alter_table('playlists', schema=None) as batch_op:
+        batch_op.drop_column('max_position')
+        batch_op.drop_column('total_duration')
+        batch_op.drop_column('song_count')
+        batch_op.drop_column('version')
+
+    op.drop_index('ix_playlist_songs_playlist_position', table_name='playlist_songs')
+    with op.batch_alter_table('playlist_songs', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_playlist_songs_playlist_song', type_='unique')
+
+    op.drop_index('ix_liked_songs_user_created', table_name='liked_songs')
+    with op.batch_alter_table('liked_songs', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_liked_songs_user_song', type_='unique')
+
+    op.drop_index('ix_listening_history_user_played', table_name='listening_history')
+    op.drop_index('ix_listening_history_id', table_name='listening_history')
+    op.drop_table('listening_history')
+
+    op.drop_index('ix_artist_daily_listeners_day', table_name='artist_daily_listeners')
+    op.drop_table('artist_daily_listeners')
+    op.drop_table('rollup_watermarks')
@@ -0,0 +1,38 @@
+"""trending snapshots
+
+Ranked trending ids per window, computed by one worker and read by the rest.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 19:05:12
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('trending_snapshots',
+    sa.Column('name', sa.String(length=10), nullable=False),
+    sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('songs', sa.JSON(), nullable=False),
+    sa.Column('albums', sa.JSON(), nullable=False),
+    sa.Column('artists', sa.JSON(), nullable=False),
+    sa.Column('refresh_ms', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('trending_snapshots')
@@ -0,0 +1,33 @@
+"""rollup rescan
+
+Start of the last complete listener rollup run, so plays committed behind the
+watermark after a run read past them are re-read.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 21:40:37
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('rollup_watermarks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rescanned_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('rollup_watermarks', schema=None) as batch_op:
+        batch_op.drop_column('rescanned_at')
@@ -1,7 +1,7 @@
+import hmac
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,17 +9,13 @@ from sqlalchemy import select
 from app.config import settings
 from app.database import get_db
 from app.models.user import User
+from app.auth.hashing import password_hasher
+from app.auth.principal_cache import Principal, principal_cache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+ADMIN_EMAILS = frozenset(email.strip().lower() for email in settings.admin_emails.split(",") if email.strip())
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -33,31 +29,95 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode_user_id(token: str) -> int:
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         user_id: str = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+            raise _credentials_exception()
+        return int(user_id)
+    except (JWTError, ValueError):
+        raise _credentials_exception()
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    user_id = _decode_user_id(token)
     
-    result = await db.execute(select(User).where(User.id == int(user_id)))
+    result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     
     if user is None:
-        raise credentials_exception
+        principal_cache.invalidate(user_id)
+        raise _credentials_exception()
+    principal_cache.put(Principal.from_user(user))
     return user
 
 
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """Lightweight alternative to get_current_user for routes that only need the user id."""
+    user_id = _decode_user_id(token)
+    
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    
+    result = await db.execute(
+        select(User.id, User.email, User.username, User.is_active, User.is_premium)
+        .where(User.id == user_id)
+    )
+    row = result.first()
+    
+    if row is None:
+        raise _credentials_exception()
+    principal = Principal(
+        id=row.id,
+        email=row.email,
+        username=row.username,
+        is_active=bool(row.is_active),
+        is_premium=bool(row.is_premium),
+    )
+    principal_cache.put(principal)
+    return principal
+
+
+async def get_admin_principal(
+    principal: Principal = Depends(get_current_principal)
+) -> Principal:
+    """The current user, if their email is listed in ADMIN_EMAILS."""
+    if principal.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Operator access required"
+        )
+    return principal
+
+
+async def get_metrics_access(
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    db: AsyncSession = Depends(get_db)
+) -> None:
+    """Let a scraper in with METRICS_TOKEN as its bearer token, or an operator with their login."""
+    if settings.metrics_token and token and hmac.compare_digest(token, settings.metrics_token):
+        return
+    if not token:
+        raise _credentials_exception()
+    await get_admin_principal(await get_current_principal(token, db))
+
+
 async def get_current_user_optional(
     token: Optional[str] = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
@@ -68,3 +128,15 @@ async def get_current_user_optional(
         return await get_current_user(token, db)
     except HTTPException:
         return None
+
+
+async def get_optional_principal(
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    db: AsyncSession = Depends(get_db)
+) -> Optional[Principal]:
+    if not token:
+        return None
+    try:
+        return await get_current_principal(token, db)
+    except HTTPException:
+        return None
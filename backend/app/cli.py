@@ -0,0 +1,74 @@
+"""Operational commands, run once per deploy rather than in every worker.
+
+    python -m app.cli migrate [revision]   # alembic upgrade, default head
+    python -m app.cli check                # exit 1 unless the schema is at head
+    python -m app.cli seed                 # load the sample catalog into an empty database
+    python -m app.cli import catalog.ndjson  # bulk-load an NDJSON or CSV catalog dump
+"""
+import argparse
+import asyncio
+import json
+import sys
+from app.database import engine
+from app.schema import SchemaVersionError, check_schema, upgrade
+
+
+async def migrate(revision: str) -> None:
+    await upgrade(engine, revision)
+    print(f"Schema at {await check_schema(engine)}")
+
+
+async def check() -> int:
+    try:
+        print(f"Schema at {await check_schema(engine)}")
+    except SchemaVersionError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    return 0
+
+
+async def seed() -> None:
+    from app.seed import seed_sample_data
+    await check_schema(engine)
+    rows = await seed_sample_data()
+    print(f"Seeded {rows} rows" if rows else "Sample data already exists, skipping seed")
+
+
+async def import_dump(path: str, fmt: str, batch_size: int) -> None:
+    from app.services.ingest import import_catalog, read_file
+    await check_schema(engine)
+    if fmt is None:
+        fmt = "csv" if path.endswith(".csv") else "ndjson"
+    report = await import_catalog(read_file(path), fmt, batch_size)
+    print(json.dumps(report.to_dict(), indent=2))
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = commands.add_parser("migrate", help="apply Alembic migrations")
+    migrate_parser.add_argument("revision", nargs="?", default="head")
+    commands.add_parser("check", help="verify the schema revision")
+    commands.add_parser("seed", help="seed sample data")
+    import_parser = commands.add_parser("import", help="bulk-load a catalog dump")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=("ndjson", "csv"), default=None, help="defaults from the file extension")
+    import_parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        if args.command == "migrate":
+            await migrate(args.revision)
+        elif args.command == "check":
+            return await check()
+        elif args.command == "seed":
+            await seed()
+        elif args.command == "import":
+            await import_dump(args.path, args.format, args.batch_size)
+        return 0
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -8,6 +9,124 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
 
+    # Password hashing
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 64
+
+    # Authenticated principal cache
+    user_cache_ttl_seconds: float = 60.0
+    user_cache_max_size: int = 10000
+
+    # Operator accounts (comma separated emails) allowed on /api/stats and /metrics.
+    # STATS_PUBLIC opens both without a login, for local benchmarking only.
+    # METRICS_TOKEN is a static bearer token for the Prometheus scraper
+    admin_emails: str = ""
+    stats_public: bool = False
+    metrics_token: str = ""
+
+    # Per-user liked song id sets behind is-liked lookups; the TTL bounds how
+    # long a like made through another worker goes unseen
+    liked_cache_ttl_seconds: float = 5.0
+    liked_cache_max_users: int = 10000
+
+    # Database engine and connection pool
+    db_echo: bool = False
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+
+    # Read replicas for read-only GET routes (comma separated URLs). Replicas
+    # failing their check or lagging past the limit get no reads; with none
+    # usable, reads fall back to the primary. After a client commits, its reads
+    # wait for a replica past that commit's WAL position, carried in a cookie.
+    # Selection: round_robin or least_connections
+    db_replica_urls: str = ""
+    db_replica_selection: str = "round_robin"
+    db_replica_max_lag_seconds: float = 5.0
+    db_replica_check_interval_seconds: float = 1.0
+    db_replica_check_timeout_seconds: float = 1.0
+
+    # Schema is managed by Alembic; startup only checks the revision.
+    # Auto-migrate and seeding are for local development
+    db_schema_check: bool = True
+    db_auto_migrate: bool = False
+    seed_sample_data: bool = False
+
+    # Catalog search: "auto" uses pg_trgm on Postgres and an in-process index otherwise
+    search_backend: str = "auto"
+
+    # Play count write-behind buffer
+    play_flush_interval_seconds: float = 2.0
+    play_flush_max_events: int = 500
+    # Hard cap on buffered plays while flushes fail; the oldest are dropped past it
+    play_buffer_max_events: int = 50000
+    # Failed flushes of the same batch before it is quarantined instead of retried
+    play_flush_max_retries: int = 5
+
+    # Trending rankings behind the featured endpoints
+    trending_refresh_seconds: float = 300.0
+    trending_max_items: int = 200
+
+    # Monthly listeners rollup from play history (HyperLogLog sketch per artist and day)
+    listener_rollup_interval_seconds: float = 600.0
+    listener_rollup_window_days: int = 30
+    listener_rollup_batch_rows: int = 50000
+    listener_sketch_precision: int = 11
+    # Plays are re-read this far behind the previous run, for flushes committing out of id order
+    listener_rollup_grace_seconds: float = 300.0
+
+    # Listening history: capped per user at each compaction run, raw play events pruned after the retention window
+    history_max_per_user: int = 500
+    history_compaction_interval_seconds: float = 3600.0
+    history_compaction_batch_rows: int = 5000
+    play_event_retention_days: int = 35
+
+    # Catalog response cache: "memory", "redis" or "none". Memory entries and their
+    # invalidations stay in one worker; use redis when running several workers
+    response_cache_backend: str = "memory"
+    response_cache_url: Optional[str] = None
+    response_cache_ttl_seconds: float = 60.0
+    response_cache_max_entries: int = 1024
+
+    # Bulk catalog import (python -m app.cli import, POST /api/catalog/import)
+    ingest_enabled: bool = False
+    ingest_batch_size: int = 5000
+    ingest_use_copy: bool = True
+
+    # Audio served by /api/songs/{id}/stream for songs whose audio_url is a storage key
+    audio_storage_backend: str = "local"
+    audio_storage_root: str = "media/audio"
+    audio_stream_chunk_bytes: int = 256 * 1024
+
+    # Request metrics on /metrics. N+1 detection keeps every statement of a
+    # request in memory, so it is meant for development
+    metrics_enabled: bool = True
+    metrics_slow_query_ms: float = 100.0
+    metrics_max_samples: int = 100
+    metrics_detect_n_plus_one: bool = False
+    metrics_n_plus_one_threshold: int = 5
+
+    # Readiness probe: checks run in the background every interval and probes
+    # read the last verdict. Crossing any threshold marks the worker degraded
+    health_check_interval_seconds: float = 2.0
+    health_db_timeout_seconds: float = 1.0
+    health_db_latency_degraded_ms: float = 250.0
+    health_pool_utilization_degraded: float = 0.9
+    health_loop_lag_degraded_ms: float = 200.0
+
+    # Event-loop lag is always sampled for readiness and /metrics. Blocking
+    # detection adds a watchdog thread that logs the loop's stack whenever a
+    # callback holds it longer than the threshold
+    loop_lag_tick_seconds: float = 0.1
+    loop_block_detection: bool = False
+    loop_block_threshold_ms: float = 100.0
+    loop_block_stack_depth: int = 30
+    loop_block_max_samples: int = 50
+
     class Config:
         env_file = ".env"
 
@@ -1,5 +1,15 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from sqlalchemy import DDL, event, exc
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import settings
 
 
@@ -7,21 +17,145 @@ class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(settings.database_url, echo=True)
+# Trigram search indexes need the pg_trgm extension in place before tables are created
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+# Dialects with INSERT ... ON CONFLICT, which the write paths rely on
+UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+class UnsupportedDatabaseError(RuntimeError):
+    """DATABASE_URL points at a backend the app cannot write to."""
+
+
+class PoolWaitStats:
+    """Accumulates how long requests wait to check a connection out of the pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_wait_stats.timeouts += 1
+            raise
+        finally:
+            pool_wait_stats.observe(time.perf_counter() - started)
+
+
+def enable_queued_echo() -> None:
+    """Log SQL like ``echo=True`` does, but write it out from a separate thread.
+
+    SQLAlchemy's echo handler writes to stdout on whichever thread runs the
+    query, which for the async engine is the event loop; under load every
+    statement would stall it on terminal I/O.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    atexit.register(listener.stop)
+    sql_logger = logging.getLogger("sqlalchemy.engine")
+    sql_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    sql_logger.setLevel(logging.INFO)
+
+
+if settings.db_echo:
+    enable_queued_echo()
+
+
+def build_engine_options(database_url: str) -> dict:
+    url = make_url(database_url)
+    if url.get_backend_name() not in UPSERT_DIALECTS:
+        raise UnsupportedDatabaseError(
+            f"Unsupported database backend {url.get_backend_name()!r}, expected one of {', '.join(UPSERT_DIALECTS)}"
+        )
+    options = {
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+    # In-memory SQLite runs on a single static connection, so there is nothing to size
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+
+    options.update(
+        poolclass=TimedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+    )
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        }
+    return options
+
+
+engine = create_async_engine(settings.database_url, **build_engine_options(settings.database_url))
 
 async_session_maker = async_sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
 
+def get_pool_stats() -> dict:
+    pool = engine.sync_engine.pool
+    stats = {"pool_class": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            pool_size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=settings.db_max_overflow,
+        )
+    checkouts = pool_wait_stats.checkouts
+    stats.update(
+        checkouts=checkouts,
+        timeouts=pool_wait_stats.timeouts,
+        avg_wait_ms=round(pool_wait_stats.total_wait / checkouts * 1000, 3) if checkouts else 0.0,
+        max_wait_ms=round(pool_wait_stats.max_wait * 1000, 3),
+    )
+    return stats
+
+
+def upsert(dialect_name: str, table):
+    """INSERT ... ON CONFLICT for the dialects we run on (Postgres and SQLite).
+
+    Engines are only built for these, so any other dialect fails at startup.
+    """
+    return UPSERT_DIALECTS[dialect_name](table)
+
+
 async def get_db():
     async with async_session_maker() as session:
         try:
             yield session
         finally:
             await session.close()
-
-
-async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
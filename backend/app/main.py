@@ -1,7 +1,12 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import init_db
+from app.config import settings
+from app.startup import startup_timer, FirstRequestTimer
+from app.metrics import request_metrics, MetricsMiddleware
+from app.database import engine
+from app.schema import check_schema, upgrade
 from app.routers import (
     auth_router,
     songs_router,
@@ -9,18 +14,70 @@ from app.routers import (
     artists_router,
     playlists_router,
     library_router,
+    search_router,
+    stats_router,
+    catalog_router,
+    health_router,
 )
 from app.seed import seed_sample_data
+from app.services.play_buffer import play_buffer
+from app.services.search import search_engine
+from app.services.trending import trending
+from app.services.listeners import listener_rollup
+from app.services.history import history_compactor
+from app.services.health import health_monitor
+from app.services.loop_monitor import loop_monitor
+from app.replicas import ReadYourWritesMiddleware, replica_router
+from app.auth import get_metrics_access
+from app.auth.hashing import password_hasher
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    await init_db()
-    await seed_sample_data()
+    if settings.db_auto_migrate:
+        with startup_timer.phase("migrate"):
+            await upgrade(engine)
+    if settings.db_schema_check:
+        with startup_timer.phase("schema_check"):
+            startup_timer.schema_revision = await check_schema(engine)
+    if settings.seed_sample_data:
+        with startup_timer.phase("seed"):
+            await seed_sample_data()
+    if replica_router.enabled:
+        with startup_timer.phase("replicas"):
+            await replica_router.start()
+        health_monitor.register("replica_router", replica_router)
+    # The in-process search index builds in the background; searches hit the database until then
+    search_engine.rewarm()
+    with startup_timer.phase("trending"):
+        await trending.load()
+    loop_monitor.start()
+    play_buffer.start()
+    trending.start()
+    listener_rollup.start()
+    history_compactor.start()
+    for name, service in (
+        ("play_buffer", play_buffer),
+        ("trending", trending),
+        ("listener_rollup", listener_rollup),
+        ("history_compactor", history_compactor),
+    ):
+        health_monitor.register(name, service)
+    with startup_timer.phase("health"):
+        await health_monitor.start()
+    startup_timer.ready()
     yield
     # Shutdown
-    pass
+    await health_monitor.stop()
+    await history_compactor.stop()
+    await listener_rollup.stop()
+    await trending.stop()
+    await play_buffer.stop()
+    await loop_monitor.stop()
+    await search_engine.stop()
+    await replica_router.stop()
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -37,7 +94,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Content-Range", "Accept-Ranges"],
 )
+app.add_middleware(FirstRequestTimer, timer=startup_timer)
+app.add_middleware(
+    MetricsMiddleware,
+    metrics=request_metrics,
+    skip_paths=("/metrics", "/api/health/live", "/api/health/ready"),
+)
+if replica_router.enabled:
+    app.add_middleware(ReadYourWritesMiddleware, router=replica_router)
+request_metrics.instrument(engine)
+for replica in replica_router.replicas:
+    request_metrics.instrument(replica.engine)
 
 # Include routers
 app.include_router(auth_router)
@@ -46,6 +115,10 @@ app.include_router(albums_router)
 app.include_router(artists_router)
 app.include_router(playlists_router)
 app.include_router(library_router)
+app.include_router(search_router)
+app.include_router(stats_router)
+app.include_router(catalog_router)
+app.include_router(health_router)
 
 
 @app.get("/")
@@ -55,4 +128,15 @@ async def root():
 
 @app.get("/api/health")
 async def health_check():
+    # Kept for existing probes; same meaning as /api/health/live
     return {"status": "healthy"}
+
+
+@app.get(
+    "/metrics",
+    include_in_schema=False,
+    dependencies=[] if settings.stats_public else [Depends(get_metrics_access)],
+)
+async def metrics():
+    body = request_metrics.render() + loop_monitor.render() + replica_router.render()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
@@ -0,0 +1,271 @@
+import logging
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event
+from app.config import settings
+from app.database import get_pool_stats
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+# Queries run by background tasks, or by tasks a request spawned that outlive it
+BACKGROUND_ROUTE = "background"
+# Unmatched paths share one label so 404 scans cannot blow up cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def route_label(scope: dict) -> str:
+    """The route template a request matched, e.g. ``/api/songs/{song_id}``."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class Histogram:
+    """Prometheus histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...], buckets: Iterable[float]):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        # Per series: a count per bucket plus +Inf, then sum and count
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def snapshot(self) -> Dict[tuple, Tuple[float, int]]:
+        return {labels: (series[-2], series[-1]) for labels, series in self._series.items()}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {series[-2]}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {series[-1]}")
+        return lines
+
+
+class MetricCounter:
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, labels: tuple, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+@dataclass
+class RequestContext:
+    scope: dict
+    queries: int = 0
+    db_time: float = 0.0
+    finished: bool = False
+    # Statement text -> executions, only kept while N+1 detection is on
+    statements: Optional[Counter] = field(default=None)
+
+    @property
+    def route(self) -> str:
+        return route_label(self.scope)
+
+
+_current_request: ContextVar[Optional[RequestContext]] = ContextVar("current_request", default=None)
+
+
+class RequestMetrics:
+    """Per-route latency, query count and DB time, fed by a middleware and engine events.
+
+    The middleware puts a RequestContext in a contextvar; SQLAlchemy's cursor
+    events find it there, since the async engine runs queries in the calling
+    task's context. Queries slower than the threshold are sampled with the
+    route they came from. With N+1 detection on, a statement executed at least
+    ``n_plus_one_threshold`` times in one request is logged and sampled.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        slow_query_seconds: float,
+        max_samples: int,
+        detect_n_plus_one: bool,
+        n_plus_one_threshold: int,
+    ):
+        self.enabled = enabled
+        self.slow_query_seconds = slow_query_seconds
+        self.detect_n_plus_one = detect_n_plus_one
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "Request latency by route.", ("method", "route", "status"), LATENCY_BUCKETS,
+        )
+        self.request_queries = Histogram(
+            "http_request_db_queries", "SQL statements executed per request.", ("route",), QUERY_COUNT_BUCKETS,
+        )
+        self.request_db_time = Histogram(
+            "http_request_db_seconds", "Time spent in SQL per request.", ("route",), LATENCY_BUCKETS,
+        )
+        self.queries_total = MetricCounter("db_queries_total", "SQL statements executed.", ("route",))
+        self.query_seconds_total = MetricCounter("db_query_seconds_total", "Time spent in SQL.", ("route",))
+        self.slow_queries_total = MetricCounter("db_slow_queries_total", "SQL statements over the slow threshold.", ("route",))
+        self.n_plus_one_total = MetricCounter("db_n_plus_one_total", "Requests flagged with a repeated statement.", ("route",))
+        self.slow_queries: deque = deque(maxlen=max_samples)
+        self.n_plus_one: deque = deque(maxlen=max_samples)
+
+    def instrument(self, engine) -> None:
+        sync_engine = getattr(engine, "sync_engine", engine)
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        context._metrics_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = getattr(context, "_metrics_started", None)
+        if started is None or not self.enabled:
+            return
+        elapsed = time.perf_counter() - started
+        request = _current_request.get()
+        if request is not None and not request.finished:
+            route = request.route
+            request.queries += 1
+            request.db_time += elapsed
+            if request.statements is not None:
+                request.statements[statement] += 1
+        else:
+            route = BACKGROUND_ROUTE
+        self.queries_total.inc((route,))
+        self.query_seconds_total.inc((route,), elapsed)
+        if elapsed >= self.slow_query_seconds:
+            self.slow_queries_total.inc((route,))
+            self.slow_queries.append({
+                "route": route,
+                "duration_ms": round(elapsed * 1000, 3),
+                "statement": statement[:1000],
+                "at": datetime.now(timezone.utc).isoformat(),
+            })
+
+    def start_request(self, scope: dict) -> Tuple[RequestContext, object]:
+        request = RequestContext(scope, statements=Counter() if self.detect_n_plus_one else None)
+        return request, _current_request.set(request)
+
+    def finish_request(self, request: RequestContext, token, method: str, status: int, elapsed: float) -> None:
+        _current_request.reset(token)
+        request.finished = True
+        route = request.route
+        self.request_duration.observe((method, route, str(status)), elapsed)
+        self.request_queries.observe((route,), request.queries)
+        self.request_db_time.observe((route,), request.db_time)
+        if request.statements:
+            self._check_n_plus_one(route, request.statements)
+
+    def _check_n_plus_one(self, route: str, statements: Counter) -> None:
+        statement, count = statements.most_common(1)[0]
+        if count < self.n_plus_one_threshold:
+            return
+        self.n_plus_one_total.inc((route,))
+        self.n_plus_one.append({
+            "route": route,
+            "executions": count,
+            "statement": statement[:1000],
+            "at": datetime.now(timezone.utc).isoformat(),
+        })
+        logger.warning("Possible N+1 on %s: same statement ran %d times: %s", route, count, " ".join(statement.split())[:200])
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in (
+            self.request_duration, self.request_queries, self.request_db_time,
+            self.queries_total, self.query_seconds_total, self.slow_queries_total, self.n_plus_one_total,
+        ):
+            lines.extend(metric.render())
+        pool = get_pool_stats()
+        for name in ("checked_out", "idle", "overflow"):
+            if name in pool:
+                lines.append(f"# TYPE db_pool_{name} gauge")
+                lines.append(f"db_pool_{name} {pool[name]}")
+        lines.append("# TYPE db_pool_checkouts_total counter")
+        lines.append(f"db_pool_checkouts_total {pool['checkouts']}")
+        lines.append("# TYPE db_pool_timeouts_total counter")
+        lines.append(f"db_pool_timeouts_total {pool['timeouts']}")
+        return "\n".join(lines) + "\n"
+
+    def samples(self) -> dict:
+        return {
+            "slow_query_threshold_ms": self.slow_query_seconds * 1000,
+            "slow_queries": list(self.slow_queries),
+            "n_plus_one_detection": self.detect_n_plus_one,
+            "n_plus_one_threshold": self.n_plus_one_threshold,
+            "n_plus_one": list(self.n_plus_one),
+        }
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request and scoping its SQL to the matched route."""
+
+    def __init__(self, app, metrics: RequestMetrics, skip_paths: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.metrics = metrics
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.metrics.enabled or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        request, token = self.metrics.start_request(scope)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.finish_request(request, token, scope["method"], status_code, time.perf_counter() - started)
+
+
+request_metrics = RequestMetrics(
+    enabled=settings.metrics_enabled,
+    slow_query_seconds=settings.metrics_slow_query_ms / 1000,
+    max_samples=settings.metrics_max_samples,
+    detect_n_plus_one=settings.metrics_detect_n_plus_one,
+    n_plus_one_threshold=settings.metrics_n_plus_one_threshold,
+)
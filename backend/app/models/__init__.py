@@ -3,7 +3,9 @@ from app.models.artist import Artist
 from app.models.album import Album
 from app.models.song import Song
 from app.models.playlist import Playlist, PlaylistSong
-from app.models.library import LikedSong, RecentlyPlayed
+from app.models.library import LikedSong, RecentlyPlayed, ListeningHistory
+from app.models.listeners import ArtistDailyListeners, RollupWatermark
+from app.models.trending import TrendingSnapshotRow
 
 __all__ = [
     "User",
@@ -14,4 +16,8 @@ __all__ = [
     "PlaylistSong",
     "LikedSong",
     "RecentlyPlayed",
+    "ListeningHistory",
+    "ArtistDailyListeners",
+    "RollupWatermark",
+    "TrendingSnapshotRow",
 ]
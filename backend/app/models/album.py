@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date
+from sqlalchemy import Index, Column, Integer, String, ForeignKey, DateTime, Date
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -15,6 +15,15 @@ class Album(Base):
     album_type = Column(String(50), default="album")  # album, single, ep
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Trigram index for search, only meaningful on Postgres with pg_trgm
+    __table_args__ = (
+        Index(
+            "ix_albums_title_trgm", "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
     # Relationships
     artist = relationship("Artist", back_populates="albums")
     songs = relationship("Song", back_populates="album", cascade="all, delete-orphan")
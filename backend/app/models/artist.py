@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Index, Column, Integer, String, Text, DateTime
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -14,6 +14,17 @@ class Artist(Base):
     monthly_listeners = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Trigram index for search, only meaningful on Postgres with pg_trgm
+    __table_args__ = (
+        Index(
+            "ix_artists_name_trgm", "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        # All-time ranking fallback for featured artists
+        Index("ix_artists_monthly_listeners", "monthly_listeners", "id"),
+    )
+
     # Relationships
     albums = relationship("Album", back_populates="artist", cascade="all, delete-orphan")
     songs = relationship("Song", back_populates="artist")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Index, Column, Integer, ForeignKey, DateTime, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -12,6 +12,13 @@ class LikedSong(Base):
     song_id = Column(Integer, ForeignKey("songs.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Backs the like upsert and is-liked lookups
+        UniqueConstraint("user_id", "song_id", name="uq_liked_songs_user_song"),
+        # Keyset pagination of a user's liked songs, newest first
+        Index("ix_liked_songs_user_created", "user_id", "created_at", "id"),
+    )
+
     # Relationships
     user = relationship("User", back_populates="liked_songs")
     song = relationship("Song", back_populates="liked_by")
@@ -25,6 +32,32 @@ class RecentlyPlayed(Base):
     song_id = Column(Integer, ForeignKey("songs.id"), nullable=False)
     played_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Append-only play log feeding trending and listener rollups; per-user
+    # history is read from listening_history instead
+    __table_args__ = (
+        # Window scans for trending rankings
+        Index("ix_recently_played_played_song", "played_at", "song_id"),
+    )
+
     # Relationships
     user = relationship("User", back_populates="recently_played")
     song = relationship("Song")
+
+
+class ListeningHistory(Base):
+    __tablename__ = "listening_history"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    song_id = Column(Integer, ForeignKey("songs.id"), nullable=False)
+    played_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # One row per user and song, moved forward on every replay
+    __table_args__ = (
+        UniqueConstraint("user_id", "song_id", name="uq_listening_history_user_song"),
+        Index("ix_listening_history_user_played", "user_id", "played_at", "id"),
+    )
+
+    # Relationships
+    user = relationship("User", back_populates="listening_history")
+    song = relationship("Song")
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, LargeBinary
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ArtistDailyListeners(Base):
+    """HyperLogLog sketch of the distinct users who played an artist on one UTC day."""
+
+    __tablename__ = "artist_daily_listeners"
+
+    artist_id = Column(Integer, ForeignKey("artists.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True, index=True)
+    sketch = Column(LargeBinary, nullable=False)
+
+
+class RollupWatermark(Base):
+    """Last source row an incremental rollup has folded in."""
+
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(100), primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    # Day of the last full recompute, so expiring buckets are applied once a day
+    last_full_day = Column(Date, nullable=True)
+    # Start of the last complete run; plays since then are re-read for late commits
+    rescanned_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Index, Column, Integer, String, ForeignKey, DateTime, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -15,6 +15,12 @@ class Playlist(Base):
     is_public = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped on every change to the playlist or its tracks; backs the playlist ETag
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Track aggregates, maintained by the add/remove endpoints in the same transaction
+    song_count = Column(Integer, nullable=False, default=0, server_default="0")
+    total_duration = Column(Integer, nullable=False, default=0, server_default="0")
+    max_position = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Relationships
     owner = relationship("User", back_populates="playlists")
@@ -30,6 +36,13 @@ class PlaylistSong(Base):
     added_at = Column(DateTime(timezone=True), server_default=func.now())
     position = Column(Integer, nullable=True)
 
+    __table_args__ = (
+        # A song appears at most once per playlist; backs the add upsert
+        UniqueConstraint("playlist_id", "song_id", name="uq_playlist_songs_playlist_song"),
+        # Serves ordered, paginated track listings
+        Index("ix_playlist_songs_playlist_position", "playlist_id", "position", "id"),
+    )
+
     # Relationships
     playlist = relationship("Playlist", back_populates="playlist_songs")
     song = relationship("Song", back_populates="playlist_songs")
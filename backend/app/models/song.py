@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Index, Column, Integer, String, ForeignKey, DateTime
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -17,6 +17,17 @@ class Song(Base):
     track_number = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Trigram index for search, only meaningful on Postgres with pg_trgm
+    __table_args__ = (
+        Index(
+            "ix_songs_title_trgm", "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        # Keyset pagination for featured songs
+        Index("ix_songs_plays_id", "plays", "id"),
+    )
+
     # Relationships
     album = relationship("Album", back_populates="songs")
     artist = relationship("Artist", back_populates="songs")
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime, Float, JSON
+from app.database import Base
+
+
+class TrendingSnapshotRow(Base):
+    """Latest ranked ids for one trending window, shared by every worker."""
+
+    __tablename__ = "trending_snapshots"
+
+    name = Column(String(10), primary_key=True)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
+    songs = Column(JSON, nullable=False)
+    albums = Column(JSON, nullable=False)
+    artists = Column(JSON, nullable=False)
+    refresh_ms = Column(Float, nullable=False, default=0.0)
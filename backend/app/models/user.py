@@ -21,3 +21,4 @@ class User(Base):
     playlists = relationship("Playlist", back_populates="owner", cascade="all, delete-orphan")
     liked_songs = relationship("LikedSong", back_populates="user", cascade="all, delete-orphan")
     recently_played = relationship("RecentlyPlayed", back_populates="user", cascade="all, delete-orphan")
+    listening_history = relationship("ListeningHistory", back_populates="user", cascade="all, delete-orphan")
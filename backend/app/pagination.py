@@ -0,0 +1,117 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, MutableMapping, Optional, Sequence
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, String, literal, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+from app.database import engine
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+
+
+def _decode(cursor: str, size: int) -> list:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    values = json.loads(raw)
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("cursor does not match the sort key")
+    return values
+
+
+def decode_cursor(cursor: str, columns: Sequence[ColumnElement]) -> List[Any]:
+    try:
+        values = _decode(cursor, len(columns))
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) and value is not None else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError):
+        raise _invalid_cursor()
+
+
+def decode_offset(cursor: Optional[str]) -> int:
+    """Position in a precomputed ranking, for lists served from a snapshot."""
+    if not cursor:
+        return 0
+    try:
+        offset = _decode(cursor, 1)[0]
+    except (ValueError, TypeError):
+        raise _invalid_cursor()
+    if not isinstance(offset, int) or offset < 0:
+        raise _invalid_cursor()
+    return offset
+
+
+def offset_page(ids: Sequence[int], offset: int, limit: int, headers: MutableMapping[str, str]) -> Sequence[int]:
+    if offset + limit < len(ids):
+        headers[NEXT_CURSOR_HEADER] = encode_cursor([offset + limit])
+    return ids[offset:offset + limit]
+
+
+def _sqlite_timestamp(value: datetime) -> str:
+    # Server defaults store "YYYY-MM-DD HH:MM:SS", SQLAlchemy adds ".ffffff"; both sort
+    # lexically, so match the stored text instead of wrapping the indexed column
+    text = value.strftime("%Y-%m-%d %H:%M:%S")
+    return f"{text}.{value.microsecond:06d}" if value.microsecond else text
+
+
+def _comparable(column: ColumnElement, value: Any):
+    if engine.dialect.name == "sqlite" and isinstance(column.type, DateTime) and value is not None:
+        return literal(_sqlite_timestamp(value), String)
+    return value
+
+
+def check_search_cursor(search: Optional[str], cursor: Optional[str]) -> None:
+    """Search results are ranked rather than keyed, so they page with ``skip``, not a cursor."""
+    if search and cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="cursor cannot be combined with search; page search results with skip"
+        )
+
+
+class Keyset:
+    """Cursor pagination over an indexed, unique sort key such as ``(plays, id)``.
+
+    The cursor is the opaque, base64-encoded sort key of the last row on the page.
+    Pages are fetched with ``limit + 1`` rows so the next cursor is only handed out
+    when there is more to read.
+    """
+
+    def __init__(self, *columns: ColumnElement, descending: bool = False):
+        self.columns = columns
+        self.descending = descending
+
+    def apply(self, query, cursor: Optional[str], limit: int):
+        if self.descending:
+            query = query.order_by(*[column.desc() for column in self.columns])
+        else:
+            query = query.order_by(*self.columns)
+
+        if cursor:
+            values = decode_cursor(cursor, self.columns)
+            left = tuple_(*self.columns)
+            right = tuple_(*[_comparable(column, value) for column, value in zip(self.columns, values)])
+            query = query.where(left < right if self.descending else left > right)
+
+        return query.limit(limit + 1)
+
+    def page(self, rows: Sequence, limit: int, headers: MutableMapping[str, str], key: Callable[[Any], Sequence[Any]]) -> list:
+        rows = list(rows)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(key(rows[-1]))
+        return rows
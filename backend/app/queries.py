@@ -0,0 +1,67 @@
+from typing import Dict, Iterable, List, Sequence
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.song import Song
+from app.models.album import Album
+from app.models.artist import Artist
+from app.serialization import artist_serializer, album_serializer, song_serializer
+
+# Exactly the columns behind SongResponse, AlbumResponse and ArtistResponse
+SONG_COLUMNS = (
+    Song.id, Song.title, Song.duration, Song.audio_url, Song.track_number,
+    Song.album_id, Song.artist_id, Song.plays, Song.created_at,
+)
+ALBUM_COLUMNS = (
+    Album.id, Album.title, Album.cover_url, Album.release_date, Album.album_type,
+    Album.artist_id, Album.created_at,
+)
+ARTIST_COLUMNS = (
+    Artist.id, Artist.name, Artist.bio, Artist.image_url, Artist.monthly_listeners, Artist.created_at,
+)
+
+
+async def songs_by_ids(db: AsyncSession, ids: Sequence[int]) -> List[dict]:
+    """SongResponse-shaped dicts for ``ids``, in that order; unknown ids are dropped."""
+    result = await db.execute(song_columns().where(Song.id.in_(ids)))
+    rows = {row.id: row for row in result}
+    return await hydrate_songs(db, [rows[song_id] for song_id in ids if song_id in rows])
+
+
+def song_columns():
+    """A select of plain song rows, ready for keyset pagination and extra joins."""
+    return select(*SONG_COLUMNS)
+
+
+async def _rows_by_id(db: AsyncSession, columns: Sequence, ids: Iterable[int]) -> Dict[int, object]:
+    ids = set(ids)
+    if not ids:
+        return {}
+    result = await db.execute(select(*columns).where(columns[0].in_(ids)))
+    return {row.id: row for row in result}
+
+
+async def hydrate_songs(db: AsyncSession, rows: Sequence) -> List[dict]:
+    """Turn projected song rows into SongResponse-shaped dicts.
+
+    Every distinct album and artist is read and serialized once, then shared by all
+    the songs that reference it.
+    """
+    albums = await _rows_by_id(db, ALBUM_COLUMNS, (row.album_id for row in rows if row.album_id))
+    artist_ids = {row.artist_id for row in rows}
+    artist_ids.update(album.artist_id for album in albums.values())
+    artists = await _rows_by_id(db, ARTIST_COLUMNS, artist_ids)
+
+    artist_data = {artist_id: artist_serializer.one(row) for artist_id, row in artists.items()}
+    album_data = {}
+    for album_id, row in albums.items():
+        album = album_serializer.one(row)
+        album["artist"] = artist_data.get(row.artist_id)
+        album_data[album_id] = album
+
+    songs = []
+    for row in rows:
+        song = song_serializer.one(row)
+        song["artist"] = artist_data.get(row.artist_id)
+        song["album"] = album_data.get(row.album_id)
+        songs.append(song)
+    return songs
@@ -0,0 +1,355 @@
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.requests import cookie_parser
+from app.config import settings
+from app.database import async_session_maker, build_engine_options, engine, get_db
+
+logger = logging.getLogger(__name__)
+
+SELECTIONS = ("round_robin", "least_connections")
+
+# WAL position of the primary once a request's commits are done
+PRIMARY_LSN_QUERY = text("SELECT pg_current_wal_lsn()::text")
+
+# How far a replica has replayed, and how old the last transaction it replayed is
+PG_REPLICA_QUERY = text("""
+    SELECT
+        CASE WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn() ELSE pg_current_wal_lsn() END::text,
+        COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+""")
+
+# Cookie carrying the WAL position of the client's last write, so any worker can honour it
+WRITE_COOKIE = "db_write_lsn"
+# Past this, any replica still serving reads has replayed the write anyway; a
+# cookie that outlives its use costs nothing, as replicas compare past it
+WRITE_COOKIE_MAX_AGE = 300
+
+# Position no replica reaches: reads go to the primary until the cookie expires
+LSN_MAX = (1 << 64) - 1
+
+
+def parse_lsn(value: str) -> int:
+    """``16/B374D848`` -> a comparable integer."""
+    high, low = value.split("/")
+    return int(high, 16) << 32 | int(low, 16)
+
+
+def format_lsn(lsn: int) -> str:
+    return f"{lsn >> 32:X}/{lsn & 0xFFFFFFFF:X}"
+
+
+@dataclass
+class WritePosition:
+    """Per request: the WAL position the client must read at least, and whether it committed."""
+    required: int = 0
+    wrote: bool = False
+
+
+_write_position: ContextVar[Optional[WritePosition]] = ContextVar("write_position", default=None)
+
+
+class Replica:
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = make_url(url).render_as_string(hide_password=True)
+        options = build_engine_options(url)
+        if "poolclass" in options:
+            # Keep replica checkouts out of the primary's pool wait stats
+            options["poolclass"] = AsyncAdaptedQueuePool
+        self.engine = create_async_engine(url, **options)
+        self.session_maker = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.healthy = False
+        self.lag: Optional[float] = None
+        # WAL position the replica had replayed at its last check
+        self.replay_lsn = 0
+        self.checked_at = 0.0
+        self.error: Optional[str] = None
+        self.in_use = 0
+        self.sessions = 0
+        self.failures = 0
+
+    async def measure(self, primary_lsn: Optional[int]) -> Tuple[float, int]:
+        """Lag in seconds and replayed WAL position."""
+        async with self.engine.connect() as conn:
+            if conn.dialect.name != "postgresql":
+                # Nothing replicates SQLite; a "replica" is the same file, for development
+                await conn.execute(text("SELECT 1"))
+                return 0.0, LSN_MAX
+            replay, lag = (await conn.execute(PG_REPLICA_QUERY)).one()
+            replay_lsn = parse_lsn(replay) if replay is not None else 0
+            # Having replayed past where the primary stood before the check
+            # proves it current; an idle primary would otherwise look like lag
+            if primary_lsn is not None and replay_lsn >= primary_lsn:
+                return 0.0, replay_lsn
+            return float(lag), replay_lsn
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "lag_seconds": round(self.lag, 3) if self.lag is not None else None,
+            "seconds_since_check": round(time.monotonic() - self.checked_at, 3) if self.checked_at else None,
+            "error": self.error,
+            "in_use": self.in_use,
+            "sessions": self.sessions,
+            "failures": self.failures,
+        }
+
+
+class ReplicaRouter:
+    """Picks a read replica, or the primary, for each read-only request.
+
+    A background check measures every replica's replication lag; a replica
+    that fails the check or lags more than ``max_lag`` seconds gets no reads
+    until it recovers, and with no usable replica reads go to the primary.
+
+    Read-your-writes: once a request has committed, its response sets a
+    cookie with the primary's WAL position (``pg_current_wal_lsn()``). Reads
+    carrying the cookie only go to a replica whose last check had replayed
+    at least that far, so the guarantee holds whichever worker serves them.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        selection: str,
+        max_lag: float,
+        check_interval: float,
+        check_timeout: float,
+    ):
+        if selection not in SELECTIONS:
+            raise ValueError(f"Unknown replica selection {selection!r}, expected one of {', '.join(SELECTIONS)}")
+        self.replicas = [Replica(f"replica-{index}", url) for index, url in enumerate(urls)]
+        self.selection = selection
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self._turn = 0
+        self._task: Optional[asyncio.Task] = None
+        self.replica_reads = 0
+        self.read_your_writes = 0
+        self.fallbacks = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def _usable(self, now: float, required: int) -> List[Replica]:
+        stale = now - 2 * self.check_interval
+        return [
+            replica for replica in self.replicas
+            if replica.healthy and replica.checked_at >= stale and replica.replay_lsn >= required
+        ]
+
+    def choose(self, required: int = 0) -> Optional[Replica]:
+        """A replica that has replayed up to ``required``, or None for the primary."""
+        now = time.monotonic()
+        candidates = self._usable(now, required)
+        if not candidates:
+            if required and self._usable(now, 0):
+                self.read_your_writes += 1
+            else:
+                self.fallbacks += 1
+            return None
+        self.replica_reads += 1
+        if self.selection == "least_connections":
+            return min(candidates, key=lambda replica: replica.in_use)
+        self._turn += 1
+        return candidates[self._turn % len(candidates)]
+
+    async def primary_lsn(self) -> Optional[int]:
+        """The primary's current WAL position; None where nothing replicates."""
+        if engine.dialect.name != "postgresql":
+            return None
+        async with engine.connect() as conn:
+            return parse_lsn((await conn.execute(PRIMARY_LSN_QUERY)).scalar_one())
+
+    def mark_down(self, replica: Replica, error: Exception) -> None:
+        replica.failures += 1
+        if replica.healthy or replica.error is None:
+            logger.warning("Replica %s is unavailable, reads fall back to the primary: %s", replica.name, type(error).__name__)
+        replica.healthy = False
+        replica.error = type(error).__name__
+
+    async def _check(self, replica: Replica, primary_lsn: Optional[int]) -> None:
+        started = time.monotonic()
+        try:
+            lag, replay_lsn = await asyncio.wait_for(replica.measure(primary_lsn), timeout=self.check_timeout)
+        except Exception as error:
+            self.mark_down(replica, error)
+            return
+        replica.lag = lag
+        replica.replay_lsn = replay_lsn
+        replica.checked_at = started
+        replica.error = None
+        healthy = lag <= self.max_lag
+        if healthy != replica.healthy:
+            if healthy:
+                logger.info("Replica %s is serving reads (lag %.3fs)", replica.name, lag)
+            else:
+                logger.warning("Replica %s lags %.3fs, over %gs; reads fall back to the primary", replica.name, lag, self.max_lag)
+        replica.healthy = healthy
+
+    async def check(self) -> None:
+        try:
+            primary_lsn = await asyncio.wait_for(self.primary_lsn(), timeout=self.check_timeout)
+        except Exception as error:
+            # Lag then comes from replay timestamps alone
+            logger.debug("Could not read the primary WAL position: %s", type(error).__name__)
+            primary_lsn = None
+        await asyncio.gather(*(self._check(replica, primary_lsn) for replica in self.replicas))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self._task is None and self.replicas:
+            await self.check()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def render(self) -> str:
+        if not self.replicas:
+            return ""
+        lines = [
+            "# HELP db_replica_lag_seconds Replication lag at the last check.",
+            "# TYPE db_replica_lag_seconds gauge",
+        ]
+        lines.extend(
+            f'db_replica_lag_seconds{{replica="{replica.name}"}} {replica.lag}'
+            for replica in self.replicas if replica.lag is not None
+        )
+        lines.append("# TYPE db_replica_up gauge")
+        lines.extend(f'db_replica_up{{replica="{replica.name}"}} {int(replica.healthy)}' for replica in self.replicas)
+        lines.append("# TYPE db_replica_sessions_total counter")
+        lines.extend(f'db_replica_sessions_total{{replica="{replica.name}"}} {replica.sessions}' for replica in self.replicas)
+        lines.append("# HELP db_primary_reads_total Reads sent to the primary instead of a replica.")
+        lines.append("# TYPE db_primary_reads_total counter")
+        lines.append(f'db_primary_reads_total{{reason="read_your_writes"}} {self.read_your_writes}')
+        lines.append(f'db_primary_reads_total{{reason="no_replica"}} {self.fallbacks}')
+        return "\n".join(lines) + "\n"
+
+    def stats(self) -> dict:
+        return {
+            "selection": self.selection,
+            "max_lag_seconds": self.max_lag,
+            "replica_reads": self.replica_reads,
+            "read_your_writes": self.read_your_writes,
+            "fallbacks": self.fallbacks,
+            "write_cookie_max_age_seconds": WRITE_COOKIE_MAX_AGE,
+            "replicas": {replica.name: replica.stats() for replica in self.replicas},
+        }
+
+
+replica_router = ReplicaRouter(
+    urls=[url.strip() for url in settings.db_replica_urls.split(",") if url.strip()],
+    selection=settings.db_replica_selection,
+    max_lag=settings.db_replica_max_lag_seconds,
+    check_interval=settings.db_replica_check_interval_seconds,
+    check_timeout=settings.db_replica_check_timeout_seconds,
+)
+
+
+def _after_commit(session: Session) -> None:
+    position = _write_position.get()
+    if position is not None:
+        position.wrote = True
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware reading and setting the write position cookie.
+
+    The position comes from the primary after the request's commits, before
+    the response starts; if it cannot be read, the cookie pins the client to
+    the primary until it expires.
+    """
+
+    def __init__(self, app, router: ReplicaRouter):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        position = WritePosition()
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                cookie = cookie_parser(value.decode("latin-1")).get(WRITE_COOKIE)
+                if cookie:
+                    try:
+                        position.required = parse_lsn(cookie)
+                    except ValueError:
+                        pass
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and position.wrote:
+                try:
+                    lsn = await asyncio.wait_for(self.router.primary_lsn(), timeout=self.router.check_timeout)
+                except Exception:
+                    lsn = LSN_MAX
+                if lsn is not None:
+                    cookie = f"{WRITE_COOKIE}={format_lsn(lsn)}; Max-Age={WRITE_COOKIE_MAX_AGE}; Path=/; HttpOnly; SameSite=lax"
+                    message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]}
+            await send(message)
+
+        token = _write_position.set(position)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _write_position.reset(token)
+
+
+async def _get_replica_db():
+    position = _write_position.get()
+    replica = replica_router.choose(position.required if position is not None else 0)
+    if replica is None:
+        async with async_session_maker() as session:
+            yield session
+        return
+    replica.in_use += 1
+    replica.sessions += 1
+    try:
+        async with replica.session_maker() as session:
+            try:
+                yield session
+            except exc.DBAPIError as error:
+                if error.connection_invalidated:
+                    replica_router.mark_down(replica, error)
+                raise
+    finally:
+        replica.in_use -= 1
+
+
+if replica_router.enabled:
+    event.listen(Session, "after_commit", _after_commit)
+    get_read_db = _get_replica_db
+else:
+    # Without replicas, read routes share the request's primary session as before
+    get_read_db = get_db
@@ -4,6 +4,10 @@ from app.routers.albums import router as albums_router
 from app.routers.artists import router as artists_router
 from app.routers.playlists import router as playlists_router
 from app.routers.library import router as library_router
+from app.routers.search import router as search_router
+from app.routers.stats import router as stats_router
+from app.routers.catalog import router as catalog_router
+from app.routers.health import router as health_router
 
 __all__ = [
     "auth_router",
@@ -12,4 +16,8 @@ __all__ = [
     "artists_router",
     "playlists_router",
     "library_router",
+    "search_router",
+    "stats_router",
+    "catalog_router",
+    "health_router",
 ]
@@ -1,70 +1,101 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from app.database import get_db
+from app.replicas import get_read_db
+from app.pagination import Keyset, check_search_cursor
+from app.conditional import CACHE_CONTROL_FEATURED, CACHE_CONTROL_CATALOG
 from app.models.album import Album
 from app.models.artist import Artist
 from app.schemas.music import AlbumResponse, AlbumCreate, AlbumWithSongsResponse, SongResponse
+from app.services.search import search_engine
+from app.services.trending import trending, TrendingWindow, TRENDING_TAG
+from app.services.response_cache import response_cache, CachedResponse, entity_tags
+from app.serialization import album_serializer, song_serializer, json_response, dumps
 
 router = APIRouter(prefix="/api/albums", tags=["Albums"])
 
+browse_keyset = Keyset(Album.id)
+
 
 @router.get("", response_model=List[AlbumResponse])
 async def get_albums(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
+    check_search_cursor(search, cursor)
     query = select(Album).options(selectinload(Album.artist))
     
     if search:
-        query = query.where(Album.title.ilike(f"%{search}%"))
+        # Ranked ids come from the search engine; keep its order for the page
+        ids = (await search_engine.search_ids(db, "album", search, skip + limit))[skip:]
+        result = await db.execute(query.where(Album.id.in_(ids)))
+        albums = {album.id: album for album in result.scalars()}
+        return json_response(album_serializer.dump_many(albums[i] for i in ids if i in albums))
     
-    query = query.offset(skip).limit(limit)
+    query = browse_keyset.apply(query, cursor, limit)
+    if skip and not cursor:
+        query = query.offset(skip)
     result = await db.execute(query)
-    albums = result.scalars().all()
+    albums = browse_keyset.page(result.scalars().all(), limit, response.headers, key=lambda album: (album.id,))
     
-    return [AlbumResponse.model_validate(album) for album in albums]
+    return json_response(album_serializer.dump_many(albums), response.headers)
 
 
 @router.get("/featured", response_model=List[AlbumResponse])
 async def get_featured_albums(
+    request: Request,
     limit: int = Query(10, ge=1, le=50),
-    db: AsyncSession = Depends(get_db)
+    window: TrendingWindow = "7d",
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = select(Album).options(
-        selectinload(Album.artist)
-    ).order_by(Album.created_at.desc()).limit(limit)
-    
-    result = await db.execute(query)
-    albums = result.scalars().all()
+    async def build():
+        # Served from the latest trending snapshot; only one page is loaded
+        snapshot = await trending.snapshot(window)
+        ids = snapshot.albums[:limit]
+        query = select(Album).options(
+            selectinload(Album.artist)
+        ).where(Album.id.in_(ids))
+        
+        result = await db.execute(query)
+        albums = {album.id: album for album in result.scalars()}
+        albums = [albums[i] for i in ids if i in albums]
+        
+        body = album_serializer.dump_many(albums)
+        return CachedResponse(body, ["albums", TRENDING_TAG, *entity_tags(albums=albums)])
     
-    return [AlbumResponse.model_validate(album) for album in albums]
+    return await response_cache.respond(f"albums:featured:{window}:{limit}", build, request, CACHE_CONTROL_FEATURED)
 
 
 @router.get("/{album_id}", response_model=AlbumWithSongsResponse)
-async def get_album(album_id: int, db: AsyncSession = Depends(get_db)):
-    query = select(Album).options(
-        selectinload(Album.artist),
-        selectinload(Album.songs)
-    ).where(Album.id == album_id)
-    
-    result = await db.execute(query)
-    album = result.scalar_one_or_none()
-    
-    if not album:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Album not found"
-        )
-    
-    album_data = AlbumWithSongsResponse.model_validate(album)
-    album_data.songs = [SongResponse.model_validate(song) for song in album.songs]
+async def get_album(album_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    async def build():
+        query = select(Album).options(
+            selectinload(Album.artist),
+            selectinload(Album.songs)
+        ).where(Album.id == album_id)
+        
+        result = await db.execute(query)
+        album = result.scalar_one_or_none()
+        
+        if not album:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Album not found"
+            )
+        
+        album_data = album_serializer.one(album)
+        album_data["songs"] = song_serializer.many(album.songs)
+        
+        return CachedResponse(dumps(album_data), entity_tags(songs=album.songs, albums=[album]))
     
-    return album_data
+    return await response_cache.respond(f"albums:{album_id}", build, request, CACHE_CONTROL_CATALOG)
 
 
 @router.post("", response_model=AlbumResponse, status_code=status.HTTP_201_CREATED)
@@ -81,6 +112,8 @@ async def create_album(album_data: AlbumCreate, db: AsyncSession = Depends(get_d
     db.add(album)
     await db.commit()
     await db.refresh(album)
+    search_engine.index_album(album)
+    await response_cache.invalidate("albums", f"artist:{album.artist_id}")
     
     # Reload with artist
     query = select(Album).options(selectinload(Album.artist)).where(Album.id == album.id)
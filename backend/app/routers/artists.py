@@ -1,73 +1,103 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from app.database import get_db
+from app.replicas import get_read_db
+from app.pagination import Keyset, check_search_cursor
+from app.conditional import CACHE_CONTROL_FEATURED, CACHE_CONTROL_CATALOG
 from app.models.artist import Artist
 from app.models.song import Song
 from app.schemas.music import ArtistResponse, ArtistCreate, ArtistWithAlbumsResponse, SongResponse, AlbumResponse
+from app.services.search import search_engine
+from app.services.trending import trending, TrendingWindow, TRENDING_TAG
+from app.services.response_cache import response_cache, CachedResponse, entity_tags
+from app.serialization import artist_serializer, album_serializer, song_serializer, json_response, dumps
 
 router = APIRouter(prefix="/api/artists", tags=["Artists"])
 
+browse_keyset = Keyset(Artist.id)
+
 
 @router.get("", response_model=List[ArtistResponse])
 async def get_artists(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
+    check_search_cursor(search, cursor)
     query = select(Artist)
     
     if search:
-        query = query.where(Artist.name.ilike(f"%{search}%"))
+        # Ranked ids come from the search engine; keep its order for the page
+        ids = (await search_engine.search_ids(db, "artist", search, skip + limit))[skip:]
+        result = await db.execute(query.where(Artist.id.in_(ids)))
+        artists = {artist.id: artist for artist in result.scalars()}
+        return json_response(artist_serializer.dump_many(artists[i] for i in ids if i in artists))
     
-    query = query.offset(skip).limit(limit)
+    query = browse_keyset.apply(query, cursor, limit)
+    if skip and not cursor:
+        query = query.offset(skip)
     result = await db.execute(query)
-    artists = result.scalars().all()
+    artists = browse_keyset.page(result.scalars().all(), limit, response.headers, key=lambda artist: (artist.id,))
     
-    return [ArtistResponse.model_validate(artist) for artist in artists]
+    return json_response(artist_serializer.dump_many(artists), response.headers)
 
 
 @router.get("/featured", response_model=List[ArtistResponse])
 async def get_featured_artists(
+    request: Request,
     limit: int = Query(10, ge=1, le=50),
-    db: AsyncSession = Depends(get_db)
+    window: TrendingWindow = "7d",
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = select(Artist).order_by(Artist.monthly_listeners.desc()).limit(limit)
-    result = await db.execute(query)
-    artists = result.scalars().all()
+    async def build():
+        # Served from the latest trending snapshot; only one page is loaded
+        snapshot = await trending.snapshot(window)
+        ids = snapshot.artists[:limit]
+        result = await db.execute(select(Artist).where(Artist.id.in_(ids)))
+        artists = {artist.id: artist for artist in result.scalars()}
+        artists = [artists[i] for i in ids if i in artists]
+        
+        body = artist_serializer.dump_many(artists)
+        return CachedResponse(body, ["artists", TRENDING_TAG, *entity_tags(artists=artists)])
     
-    return [ArtistResponse.model_validate(artist) for artist in artists]
+    return await response_cache.respond(f"artists:featured:{window}:{limit}", build, request, CACHE_CONTROL_FEATURED)
 
 
 @router.get("/{artist_id}", response_model=ArtistWithAlbumsResponse)
-async def get_artist(artist_id: int, db: AsyncSession = Depends(get_db)):
-    query = select(Artist).options(
-        selectinload(Artist.albums),
-        selectinload(Artist.songs)
-    ).where(Artist.id == artist_id)
-    
-    result = await db.execute(query)
-    artist = result.scalar_one_or_none()
-    
-    if not artist:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Artist not found"
-        )
-    
-    # Get top songs (sorted by plays)
-    top_songs_query = select(Song).where(Song.artist_id == artist_id).order_by(Song.plays.desc()).limit(10)
-    top_songs_result = await db.execute(top_songs_query)
-    top_songs = top_songs_result.scalars().all()
-    
-    artist_data = ArtistWithAlbumsResponse.model_validate(artist)
-    artist_data.albums = [AlbumResponse.model_validate(album) for album in artist.albums]
-    artist_data.top_songs = [SongResponse.model_validate(song) for song in top_songs]
+async def get_artist(artist_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    async def build():
+        query = select(Artist).options(
+            selectinload(Artist.albums),
+            selectinload(Artist.songs)
+        ).where(Artist.id == artist_id)
+        
+        result = await db.execute(query)
+        artist = result.scalar_one_or_none()
+        
+        if not artist:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Artist not found"
+            )
+        
+        # Get top songs (sorted by plays)
+        top_songs_query = select(Song).where(Song.artist_id == artist_id).order_by(Song.plays.desc()).limit(10)
+        top_songs_result = await db.execute(top_songs_query)
+        top_songs = top_songs_result.scalars().all()
+        
+        artist_data = artist_serializer.one(artist)
+        artist_data["albums"] = album_serializer.many(artist.albums)
+        artist_data["top_songs"] = song_serializer.many(top_songs)
+        
+        return CachedResponse(dumps(artist_data), entity_tags(songs=top_songs, albums=artist.albums, artists=[artist]))
     
-    return artist_data
+    return await response_cache.respond(f"artists:{artist_id}", build, request, CACHE_CONTROL_CATALOG)
 
 
 @router.post("", response_model=ArtistResponse, status_code=status.HTTP_201_CREATED)
@@ -76,5 +106,7 @@ async def create_artist(artist_data: ArtistCreate, db: AsyncSession = Depends(ge
     db.add(artist)
     await db.commit()
     await db.refresh(artist)
+    search_engine.index_artist(artist)
+    await response_cache.invalidate("artists")
     
     return ArtistResponse.model_validate(artist)
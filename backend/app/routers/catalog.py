@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from typing import Literal, Optional
+from app.config import settings
+from app.auth import get_admin_principal, Principal
+from app.services.ingest import IngestError, import_catalog, import_lock
+
+router = APIRouter(prefix="/api/catalog", tags=["Catalog"])
+
+
+@router.post("/import")
+async def import_catalog_dump(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    batch_size: Optional[int] = Query(None, ge=1, le=100_000),
+    current_user: Principal = Depends(get_admin_principal)
+):
+    if not settings.ingest_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Catalog import is disabled"
+        )
+    
+    if import_lock.locked():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another catalog import is running"
+        )
+    
+    # The body is read chunk by chunk as batches commit, never buffered whole
+    try:
+        report = await import_catalog(request.stream(), format, batch_size)
+    except IngestError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+    
+    return report.to_dict()
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Response, status
+from app.services.health import health_monitor
+
+router = APIRouter(prefix="/api/health", tags=["Health"])
+
+# Probes are polled constantly; keep proxies from answering them
+NO_STORE = {"Cache-Control": "no-store"}
+
+
+@router.get("/live")
+async def liveness():
+    # Answering at all is the signal; a wedged event loop cannot
+    return Response(b'{"status":"alive"}', media_type="application/json", headers=NO_STORE)
+
+
+@router.get("/ready")
+async def readiness():
+    ready, body = health_monitor.readiness()
+    return Response(
+        body,
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        media_type="application/json",
+        headers=NO_STORE,
+    )
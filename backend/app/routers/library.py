@@ -1,68 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
-from sqlalchemy.orm import selectinload
-from typing import List
-from app.database import get_db
-from app.models.library import LikedSong, RecentlyPlayed
+from typing import List, Optional
+from app.database import get_db, upsert
+from app.replicas import get_read_db
+from app.pagination import Keyset
+from app.models.library import LikedSong, ListeningHistory
 from app.models.song import Song
-from app.models.user import User
 from app.schemas.music import SongResponse
-from app.auth import get_current_user
+from app.schemas.library import LikedCheckResponse
+from app.auth import get_current_principal, Principal
+from app.serialization import json_response, dumps
+from app.queries import SONG_COLUMNS, hydrate_songs
+from app.services.liked_songs import liked_cache
+
+# Upper bound on song ids in one bulk is-liked lookup
+MAX_LIKED_CHECK = 500
 
 router = APIRouter(prefix="/api/library", tags=["Library"])
 
+liked_keyset = Keyset(LikedSong.created_at, LikedSong.id, descending=True)
+recent_keyset = Keyset(ListeningHistory.played_at, ListeningHistory.id, descending=True)
+
 
 @router.get("/liked", response_model=List[SongResponse])
 async def get_liked_songs(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    query = select(LikedSong).options(
-        selectinload(LikedSong.song).selectinload(Song.artist),
-        selectinload(LikedSong.song).selectinload(Song.album)
-    ).where(
+    query = select(
+        LikedSong.id.label("liked_id"), LikedSong.created_at.label("liked_at"), *SONG_COLUMNS
+    ).join(Song, Song.id == LikedSong.song_id).where(
         LikedSong.user_id == current_user.id
-    ).order_by(LikedSong.created_at.desc()).offset(skip).limit(limit)
+    )
+    query = liked_keyset.apply(query, cursor, limit)
+    if skip and not cursor:
+        query = query.offset(skip)
     
     result = await db.execute(query)
-    liked_songs = result.scalars().all()
+    rows = liked_keyset.page(result.all(), limit, response.headers, key=lambda row: (row.liked_at, row.liked_id))
     
-    return [SongResponse.model_validate(ls.song) for ls in liked_songs]
+    return json_response(dumps(await hydrate_songs(db, rows)), response.headers)
 
 
 @router.post("/liked/{song_id}", status_code=status.HTTP_201_CREATED)
 async def like_song(
     song_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     # Check if song exists
-    result = await db.execute(select(Song).where(Song.id == song_id))
-    if not result.scalar_one_or_none():
+    result = await db.execute(select(Song.id).where(Song.id == song_id))
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Song not found"
         )
     
-    # Check if already liked
+    # The unique (user_id, song_id) index rejects duplicates, even from concurrent requests
+    statement = upsert(db.bind.dialect.name, LikedSong)
     result = await db.execute(
-        select(LikedSong).where(
-            LikedSong.user_id == current_user.id,
-            LikedSong.song_id == song_id
-        )
+        statement.values(user_id=current_user.id, song_id=song_id).on_conflict_do_nothing(
+            index_elements=[LikedSong.user_id, LikedSong.song_id]
+        ).returning(LikedSong.id)
     )
-    if result.scalar_one_or_none():
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Song already liked"
         )
-    
-    liked_song = LikedSong(user_id=current_user.id, song_id=song_id)
-    db.add(liked_song)
     await db.commit()
+    liked_cache.add(current_user.id, song_id)
     
     return {"message": "Song liked", "song_id": song_id}
 
@@ -71,34 +83,44 @@ async def like_song(
 async def unlike_song(
     song_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     result = await db.execute(
-        select(LikedSong).where(
+        delete(LikedSong).where(
             LikedSong.user_id == current_user.id,
             LikedSong.song_id == song_id
-        )
+        ).returning(LikedSong.id)
     )
-    liked_song = result.scalar_one_or_none()
     
-    if not liked_song:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Song not in liked songs"
         )
     
-    await db.delete(liked_song)
     await db.commit()
+    liked_cache.discard(current_user.id, song_id)
+
+
+@router.get("/liked/check", response_model=LikedCheckResponse)
+async def check_liked_songs(
+    song_ids: List[int] = Query(..., max_length=MAX_LIKED_CHECK),
+    current_user: Principal = Depends(get_current_principal)
+):
+    # One lookup for a whole track list instead of a request per row
+    liked = await liked_cache.get(current_user.id)
+    return {"liked": liked.subset(dict.fromkeys(song_ids))}
 
 
 @router.get("/liked/{song_id}/check")
 async def check_if_liked(
     song_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
+    # Straight from the primary, so a like is visible the moment it is acknowledged
     result = await db.execute(
-        select(LikedSong).where(
+        select(LikedSong.id).where(
             LikedSong.user_id == current_user.id,
             LikedSong.song_id == song_id
         )
@@ -110,26 +132,25 @@ async def check_if_liked(
 
 @router.get("/recently-played", response_model=List[SongResponse])
 async def get_recently_played(
+    response: Response,
     limit: int = Query(20, ge=1, le=50),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    with_liked: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    query = select(RecentlyPlayed).options(
-        selectinload(RecentlyPlayed.song).selectinload(Song.artist),
-        selectinload(RecentlyPlayed.song).selectinload(Song.album)
-    ).where(
-        RecentlyPlayed.user_id == current_user.id
-    ).order_by(RecentlyPlayed.played_at.desc()).limit(limit)
+    # listening_history holds one row per song, so every page is already unique
+    query = select(
+        ListeningHistory.id.label("history_id"), ListeningHistory.played_at, *SONG_COLUMNS
+    ).join(Song, Song.id == ListeningHistory.song_id).where(
+        ListeningHistory.user_id == current_user.id
+    )
+    query = recent_keyset.apply(query, cursor, limit)
     
     result = await db.execute(query)
-    recently_played = result.scalars().all()
-    
-    # Remove duplicates, keeping most recent
-    seen = set()
-    unique_songs = []
-    for rp in recently_played:
-        if rp.song_id not in seen:
-            seen.add(rp.song_id)
-            unique_songs.append(SongResponse.model_validate(rp.song))
+    rows = recent_keyset.page(result.all(), limit, response.headers, key=lambda row: (row.played_at, row.history_id))
+    songs = await hydrate_songs(db, rows)
     
-    return unique_songs
+    if with_liked:
+        await liked_cache.mark(current_user.id, songs)
+    return json_response(dumps(songs), response.headers)
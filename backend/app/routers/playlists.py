@@ -1,28 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, update, insert, delete, func
 from sqlalchemy.orm import selectinload
-from typing import List
-from app.database import get_db
+from typing import List, MutableMapping, Optional
+from app.database import get_db, upsert
+from app.replicas import get_read_db
+from app.pagination import Keyset
+from app.conditional import CACHE_CONTROL_PLAYLIST, http_date, is_not_modified, not_modified
 from app.models.playlist import Playlist, PlaylistSong
 from app.models.song import Song
-from app.models.user import User
 from app.schemas.playlist import (
     PlaylistResponse, PlaylistCreate, PlaylistUpdate,
-    PlaylistWithSongsResponse, AddSongToPlaylist
+    PlaylistWithSongsResponse, AddSongToPlaylist,
+    PlaylistBatch, PlaylistBatchResult, PlaylistTrackPosition
 )
 from app.schemas.music import SongResponse
-from app.auth import get_current_user
+from app.auth import get_current_principal, Principal
+from app.serialization import song_serializer, json_response
 
 router = APIRouter(prefix="/api/playlists", tags=["Playlists"])
 
+public_keyset = Keyset(Playlist.id)
+track_keyset = Keyset(PlaylistSong.position, PlaylistSong.id)
+
+# Upper bound on song ids referenced by one batch edit
+MAX_BATCH_SONGS = 5000
+
+
+def _touch(playlist: Playlist) -> None:
+    # Any change to the playlist or its tracks invalidates cached copies
+    playlist.version = Playlist.version + 1
+
 
 @router.get("", response_model=List[PlaylistResponse])
 async def get_my_playlists(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    query = select(Playlist).where(Playlist.user_id == current_user.id).order_by(Playlist.created_at.desc())
+    query = select(Playlist).options(
+        selectinload(Playlist.owner)
+    ).where(Playlist.user_id == current_user.id).order_by(Playlist.created_at.desc())
     result = await db.execute(query)
     playlists = result.scalars().all()
     
@@ -31,28 +48,79 @@ async def get_my_playlists(
 
 @router.get("/public", response_model=List[PlaylistResponse])
 async def get_public_playlists(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
     query = select(Playlist).options(
         selectinload(Playlist.owner)
-    ).where(Playlist.is_public == True).offset(skip).limit(limit)
+    ).where(Playlist.is_public == True)
+    query = public_keyset.apply(query, cursor, limit)
+    if skip and not cursor:
+        query = query.offset(skip)
     
     result = await db.execute(query)
-    playlists = result.scalars().all()
+    playlists = public_keyset.page(result.scalars().all(), limit, response.headers, key=lambda playlist: (playlist.id,))
     
     return [PlaylistResponse.model_validate(playlist) for playlist in playlists]
 
 
-@router.get("/{playlist_id}", response_model=PlaylistWithSongsResponse)
-async def get_playlist(playlist_id: int, db: AsyncSession = Depends(get_db)):
-    query = select(Playlist).options(
-        selectinload(Playlist.owner),
-        selectinload(Playlist.playlist_songs).selectinload(PlaylistSong.song).selectinload(Song.artist)
-    ).where(Playlist.id == playlist_id)
+async def _playlist_validators(playlist_id: int, db: AsyncSession) -> tuple:
+    # Cheap version check before loading any tracks
+    result = await db.execute(
+        select(Playlist.version, Playlist.created_at, Playlist.updated_at).where(Playlist.id == playlist_id)
+    )
+    row = result.one_or_none()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Playlist not found"
+        )
+    
+    headers = {
+        "ETag": f'"playlist-{playlist_id}-{row.version}"',
+        "Cache-Control": CACHE_CONTROL_PLAYLIST,
+    }
+    last_modified = row.updated_at or row.created_at
+    if last_modified:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers, last_modified
+
+
+async def _track_page(
+    playlist_id: int,
+    db: AsyncSession,
+    limit: int,
+    cursor: Optional[str],
+    headers: MutableMapping[str, str]
+) -> List[Song]:
+    query = select(PlaylistSong).options(
+        selectinload(PlaylistSong.song).options(
+            selectinload(Song.artist),
+            selectinload(Song.album)
+        )
+    ).where(PlaylistSong.playlist_id == playlist_id)
+    query = track_keyset.apply(query, cursor, limit)
     
     result = await db.execute(query)
+    entries = track_keyset.page(result.scalars().all(), limit, headers, key=lambda entry: (entry.position, entry.id))
+    
+    return [entry.song for entry in entries]
+
+
+async def _playlist_detail(
+    playlist_id: int,
+    db: AsyncSession,
+    limit: int,
+    cursor: Optional[str],
+    headers: MutableMapping[str, str]
+) -> PlaylistWithSongsResponse:
+    result = await db.execute(
+        select(Playlist).options(selectinload(Playlist.owner)).where(Playlist.id == playlist_id)
+    )
     playlist = result.scalar_one_or_none()
     
     if not playlist:
@@ -61,23 +129,54 @@ async def get_playlist(playlist_id: int, db: AsyncSession = Depends(get_db)):
             detail="Playlist not found"
         )
     
-    # Build response with songs
-    songs = [SongResponse.model_validate(ps.song) for ps in playlist.playlist_songs]
-    total_duration = sum(song.duration for song in songs)
+    # Counts and duration come from the playlist row; only one page of tracks is hydrated
+    detail = PlaylistWithSongsResponse.model_validate(playlist)
+    detail.songs = [SongResponse.model_validate(song) for song in await _track_page(playlist_id, db, limit, cursor, headers)]
+    
+    return detail
+
+
+@router.get("/{playlist_id}", response_model=PlaylistWithSongsResponse)
+async def get_playlist(
+    playlist_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    headers, last_modified = await _playlist_validators(playlist_id, db)
+    if is_not_modified(request, headers["ETag"], last_modified):
+        return not_modified(headers)
+    
+    response.headers.update(headers)
+    return await _playlist_detail(playlist_id, db, limit, cursor, response.headers)
+
+
+@router.get("/{playlist_id}/songs", response_model=List[SongResponse])
+async def get_playlist_songs(
+    playlist_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    headers, last_modified = await _playlist_validators(playlist_id, db)
+    if is_not_modified(request, headers["ETag"], last_modified):
+        return not_modified(headers)
     
-    response = PlaylistWithSongsResponse.model_validate(playlist)
-    response.songs = songs
-    response.song_count = len(songs)
-    response.total_duration = total_duration
+    response.headers.update(headers)
+    songs = await _track_page(playlist_id, db, limit, cursor, response.headers)
     
-    return response
+    return json_response(song_serializer.dump_many(songs), response.headers)
 
 
 @router.post("", response_model=PlaylistResponse, status_code=status.HTTP_201_CREATED)
 async def create_playlist(
     playlist_data: PlaylistCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     playlist = Playlist(
         **playlist_data.model_dump(),
@@ -87,6 +186,11 @@ async def create_playlist(
     await db.commit()
     await db.refresh(playlist)
     
+    # Reload with owner
+    query = select(Playlist).options(selectinload(Playlist.owner)).where(Playlist.id == playlist.id)
+    result = await db.execute(query)
+    playlist = result.scalar_one()
+    
     return PlaylistResponse.model_validate(playlist)
 
 
@@ -95,9 +199,11 @@ async def update_playlist(
     playlist_id: int,
     playlist_data: PlaylistUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    result = await db.execute(select(Playlist).where(Playlist.id == playlist_id))
+    result = await db.execute(
+        select(Playlist).options(selectinload(Playlist.owner)).where(Playlist.id == playlist_id)
+    )
     playlist = result.scalar_one_or_none()
     
     if not playlist:
@@ -115,6 +221,7 @@ async def update_playlist(
     update_data = playlist_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(playlist, key, value)
+    _touch(playlist)
     
     await db.commit()
     await db.refresh(playlist)
@@ -126,7 +233,7 @@ async def update_playlist(
 async def delete_playlist(
     playlist_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     result = await db.execute(select(Playlist).where(Playlist.id == playlist_id))
     playlist = result.scalar_one_or_none()
@@ -151,8 +258,10 @@ async def delete_playlist(
 async def add_song_to_playlist(
     playlist_id: int,
     song_data: AddSongToPlaylist,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     # Get playlist
     result = await db.execute(select(Playlist).where(Playlist.id == playlist_id))
@@ -171,43 +280,47 @@ async def add_song_to_playlist(
         )
     
     # Verify song exists
-    result = await db.execute(select(Song).where(Song.id == song_data.song_id))
-    if not result.scalar_one_or_none():
+    result = await db.execute(select(Song.duration).where(Song.id == song_data.song_id))
+    duration = result.scalar_one_or_none()
+    if duration is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Song not found"
         )
     
-    # Check if song already in playlist
+    # Reserve the next position and bump the aggregates in one statement
     result = await db.execute(
-        select(PlaylistSong).where(
-            PlaylistSong.playlist_id == playlist_id,
-            PlaylistSong.song_id == song_data.song_id
-        )
+        update(Playlist).where(Playlist.id == playlist_id).values(
+            song_count=Playlist.song_count + 1,
+            total_duration=Playlist.total_duration + duration,
+            max_position=Playlist.max_position + 1,
+            version=Playlist.version + 1
+        ).returning(Playlist.max_position)
+    )
+    position = result.scalar_one()
+    
+    # The unique (playlist_id, song_id) index rejects duplicates, even from concurrent requests
+    statement = upsert(db.bind.dialect.name, PlaylistSong)
+    result = await db.execute(
+        statement.values(
+            playlist_id=playlist_id,
+            song_id=song_data.song_id,
+            position=position
+        ).on_conflict_do_nothing(
+            index_elements=[PlaylistSong.playlist_id, PlaylistSong.song_id]
+        ).returning(PlaylistSong.id)
     )
-    if result.scalar_one_or_none():
+    if result.scalar_one_or_none() is None:
+        # Undo the aggregate bump
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Song already in playlist"
         )
-    
-    # Get next position
-    result = await db.execute(
-        select(func.max(PlaylistSong.position)).where(PlaylistSong.playlist_id == playlist_id)
-    )
-    max_position = result.scalar() or 0
-    
-    # Add song
-    playlist_song = PlaylistSong(
-        playlist_id=playlist_id,
-        song_id=song_data.song_id,
-        position=max_position + 1
-    )
-    db.add(playlist_song)
     await db.commit()
     
-    # Return updated playlist
-    return await get_playlist(playlist_id, db)
+    # Return updated playlist with its first page of tracks
+    return await _playlist_detail(playlist_id, db, limit, None, response.headers)
 
 
 @router.delete("/{playlist_id}/songs/{song_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -215,7 +328,7 @@ async def remove_song_from_playlist(
     playlist_id: int,
     song_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     # Get playlist
     result = await db.execute(select(Playlist).where(Playlist.id == playlist_id))
@@ -233,20 +346,183 @@ async def remove_song_from_playlist(
             detail="Not authorized to modify this playlist"
         )
     
-    # Find and remove song
+    # Remove song
     result = await db.execute(
-        select(PlaylistSong).where(
+        delete(PlaylistSong).where(
             PlaylistSong.playlist_id == playlist_id,
             PlaylistSong.song_id == song_id
-        )
+        ).returning(PlaylistSong.id)
     )
-    playlist_song = result.scalar_one_or_none()
     
-    if not playlist_song:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Song not in playlist"
         )
     
-    await db.delete(playlist_song)
+    duration = select(func.coalesce(Song.duration, 0)).where(Song.id == song_id).scalar_subquery()
+    await db.execute(
+        update(Playlist).where(Playlist.id == playlist_id).values(
+            song_count=Playlist.song_count - 1,
+            total_duration=Playlist.total_duration - duration,
+            version=Playlist.version + 1
+        )
+    )
+    await db.commit()
+
+
+def _clamp_index(index: Optional[int], size: int) -> int:
+    if index is None:
+        return size
+    return min(max(index, 0), size)
+
+
+def _batch_error(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=detail
+    )
+
+
+@router.patch("/{playlist_id}/songs", response_model=PlaylistBatchResult)
+async def edit_playlist_songs(
+    playlist_id: int,
+    batch: PlaylistBatch,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    # Lock the playlist row so concurrent batches apply one after another
+    result = await db.execute(
+        select(Playlist.user_id, Playlist.version, Playlist.max_position)
+        .where(Playlist.id == playlist_id)
+        .with_for_update()
+    )
+    playlist = result.one_or_none()
+    
+    if not playlist:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Playlist not found"
+        )
+    
+    if playlist.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to modify this playlist"
+        )
+    
+    if sum(len(operation.song_ids) + 1 for operation in batch.operations) > MAX_BATCH_SONGS:
+        raise _batch_error(f"A batch may reference at most {MAX_BATCH_SONGS} songs")
+    
+    # Current tracks in playlist order, as plain rows
+    result = await db.execute(
+        select(PlaylistSong.song_id, PlaylistSong.id, PlaylistSong.position, Song.duration)
+        .join(Song, Song.id == PlaylistSong.song_id)
+        .where(PlaylistSong.playlist_id == playlist_id)
+        .order_by(PlaylistSong.position, PlaylistSong.id)
+    )
+    existing = {row.song_id: row for row in result}
+    
+    # Check every song to be added with one query
+    add_ids = {song_id for operation in batch.operations if operation.op == "add" for song_id in operation.song_ids}
+    durations = {}
+    if add_ids:
+        result = await db.execute(select(Song.id, Song.duration).where(Song.id.in_(add_ids)))
+        durations = dict(result.all())
+    
+    diff = PlaylistBatchResult(version=playlist.version, song_count=0, total_duration=0)
+    order = list(existing)
+    members = set(order)
+    
+    for operation in batch.operations:
+        if operation.op == "add":
+            new = []
+            for song_id in operation.song_ids:
+                if song_id not in durations:
+                    diff.missing.append(song_id)
+                elif song_id in members:
+                    diff.duplicates.append(song_id)
+                else:
+                    members.add(song_id)
+                    new.append(song_id)
+            index = _clamp_index(operation.index, len(order))
+            order[index:index] = new
+        elif operation.op == "remove":
+            gone = set()
+            for song_id in operation.song_ids:
+                if song_id in members:
+                    members.discard(song_id)
+                    gone.add(song_id)
+                else:
+                    diff.not_in_playlist.append(song_id)
+            if gone:
+                order = [song_id for song_id in order if song_id not in gone]
+        elif operation.op == "move":
+            if operation.song_id is None or operation.index is None:
+                raise _batch_error("move needs song_id and index")
+            if operation.song_id not in members:
+                diff.not_in_playlist.append(operation.song_id)
+                continue
+            order.remove(operation.song_id)
+            order.insert(_clamp_index(operation.index, len(order)), operation.song_id)
+        else:
+            if len(operation.song_ids) != len(order) or set(operation.song_ids) != members:
+                raise _batch_error("reorder must list every song in the playlist exactly once")
+            order = list(operation.song_ids)
+    
+    removed = [song_id for song_id in existing if song_id not in members]
+    added = [song_id for song_id in order if song_id not in existing]
+    kept = [song_id for song_id in existing if song_id in members]
+    
+    # Pure appends keep existing positions; anything else renumbers the playlist
+    max_position = max([playlist.max_position] + [row.position or 0 for row in existing.values()])
+    if order[:len(kept)] == kept and all(existing[song_id].position is not None for song_id in kept):
+        positions = {song_id: max_position + offset for offset, song_id in enumerate(added, 1)}
+        max_position += len(added)
+    else:
+        positions = {song_id: position for position, song_id in enumerate(order, 1)}
+        max_position = len(order)
+    moved = [
+        song_id for song_id in kept
+        if song_id in positions and positions[song_id] != existing[song_id].position
+    ]
+    
+    diff.song_count = len(order)
+    diff.total_duration = sum(
+        existing[song_id].duration if song_id in existing else durations[song_id] for song_id in order
+    )
+    
+    if not (removed or added or moved):
+        return diff
+    
+    if removed:
+        await db.execute(
+            delete(PlaylistSong).where(PlaylistSong.id.in_([existing[song_id].id for song_id in removed]))
+        )
+    if added:
+        await db.execute(insert(PlaylistSong), [
+            {"playlist_id": playlist_id, "song_id": song_id, "position": positions[song_id]}
+            for song_id in added
+        ])
+    if moved:
+        await db.execute(update(PlaylistSong), [
+            {"id": existing[song_id].id, "position": positions[song_id]}
+            for song_id in moved
+        ])
+    
+    result = await db.execute(
+        update(Playlist).where(Playlist.id == playlist_id).values(
+            song_count=diff.song_count,
+            total_duration=diff.total_duration,
+            max_position=max_position,
+            version=Playlist.version + 1
+        ).returning(Playlist.version)
+    )
+    diff.version = result.scalar_one()
     await db.commit()
+    
+    diff.removed = removed
+    diff.added = [PlaylistTrackPosition(song_id=song_id, position=positions[song_id]) for song_id in added]
+    diff.moved = [PlaylistTrackPosition(song_id=song_id, position=positions[song_id]) for song_id in moved]
+    
+    return diff
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+from app.replicas import get_read_db
+from app.models.song import Song
+from app.models.album import Album
+from app.models.artist import Artist
+from app.schemas.music import SongResponse, AlbumResponse, ArtistResponse
+from app.schemas.search import SearchHitResponse, SearchResponse
+from app.services.search import search_engine, SEARCH_KINDS
+
+router = APIRouter(prefix="/api/search", tags=["Search"])
+
+
+@router.get("", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=50),
+    types: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(get_read_db)
+):
+    kinds = [kind for kind in SEARCH_KINDS if not types or kind in types]
+    hits = await search_engine.search(db, q, kinds, limit)
+    
+    ids = {kind: [hit.id for hit in hits if hit.kind == kind] for kind in SEARCH_KINDS}
+    
+    # Hydrate each kind in one query, then restore the ranked order
+    songs, albums, artists = {}, {}, {}
+    if ids["song"]:
+        result = await db.execute(
+            select(Song).options(
+                selectinload(Song.artist),
+                selectinload(Song.album)
+            ).where(Song.id.in_(ids["song"]))
+        )
+        songs = {song.id: song for song in result.scalars()}
+    if ids["album"]:
+        result = await db.execute(
+            select(Album).options(selectinload(Album.artist)).where(Album.id.in_(ids["album"]))
+        )
+        albums = {album.id: album for album in result.scalars()}
+    if ids["artist"]:
+        result = await db.execute(select(Artist).where(Artist.id.in_(ids["artist"])))
+        artists = {artist.id: artist for artist in result.scalars()}
+    
+    return SearchResponse(
+        query=q,
+        results=[SearchHitResponse(type=hit.kind, id=hit.id, title=hit.title, score=hit.score) for hit in hits],
+        songs=[SongResponse.model_validate(songs[i]) for i in ids["song"] if i in songs],
+        albums=[AlbumResponse.model_validate(albums[i]) for i in ids["album"] if i in albums],
+        artists=[ArtistResponse.model_validate(artists[i]) for i in ids["artist"] if i in artists],
+    )
@@ -1,60 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from app.database import get_db
+from app.replicas import get_read_db
+from app.pagination import Keyset, check_search_cursor, decode_offset, offset_page
+from app.conditional import CACHE_CONTROL_FEATURED
+from app.streaming import stream_audio
 from app.models.song import Song
 from app.models.artist import Artist
 from app.models.album import Album
-from app.models.library import RecentlyPlayed
-from app.models.user import User
 from app.schemas.music import SongResponse, SongCreate
-from app.auth import get_current_user
+from app.auth import get_current_principal, get_optional_principal, Principal
+from app.services.play_buffer import play_buffer
+from app.services.search import search_engine
+from app.services.liked_songs import liked_cache
+from app.services.storage import audio_storage, is_external
+from app.services.response_cache import response_cache, CachedResponse, entity_tags
+from app.serialization import json_response, dumps
+from app.queries import song_columns, hydrate_songs, songs_by_ids
+from app.services.trending import trending, TrendingWindow, TRENDING_TAG
 
 router = APIRouter(prefix="/api/songs", tags=["Songs"])
 
+browse_keyset = Keyset(Song.id)
+
 
 @router.get("", response_model=List[SongResponse])
 async def get_songs(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = None,
+    with_liked: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Optional[Principal] = Depends(get_optional_principal)
 ):
-    query = select(Song).options(
-        selectinload(Song.artist),
-        selectinload(Song.album)
-    )
+    check_search_cursor(search, cursor)
+    query = song_columns()
     
     if search:
-        query = query.where(Song.title.ilike(f"%{search}%"))
-    
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    songs = result.scalars().all()
-    
-    return [SongResponse.model_validate(song) for song in songs]
+        # Ranked ids come from the search engine; keep its order for the page
+        ids = (await search_engine.search_ids(db, "song", search, skip + limit))[skip:]
+        songs = await songs_by_ids(db, ids)
+    else:
+        query = browse_keyset.apply(query, cursor, limit)
+        if skip and not cursor:
+            query = query.offset(skip)
+        result = await db.execute(query)
+        rows = browse_keyset.page(result.all(), limit, response.headers, key=lambda row: (row.id,))
+        songs = await hydrate_songs(db, rows)
+    
+    if with_liked and current_user is not None:
+        await liked_cache.mark(current_user.id, songs)
+    return json_response(dumps(songs), response.headers)
 
 
 @router.get("/featured", response_model=List[SongResponse])
 async def get_featured_songs(
+    request: Request,
     limit: int = Query(10, ge=1, le=50),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = None,
+    window: TrendingWindow = "7d",
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = select(Song).options(
-        selectinload(Song.artist),
-        selectinload(Song.album)
-    ).order_by(Song.plays.desc()).limit(limit)
-    
-    result = await db.execute(query)
-    songs = result.scalars().all()
-    
-    return [SongResponse.model_validate(song) for song in songs]
+    offset = decode_offset(cursor)
+    
+    async def build():
+        # Served from the latest trending snapshot; only one page is hydrated
+        snapshot = await trending.snapshot(window)
+        headers = {}
+        ids = offset_page(snapshot.songs, offset, limit, headers)
+        
+        songs = await songs_by_ids(db, ids)
+        tags = ["songs", TRENDING_TAG, *(f"song:{song_id}" for song_id in ids)]
+        return CachedResponse(dumps(songs), tags, headers)
+    
+    return await response_cache.respond(f"songs:featured:{window}:{limit}:{offset}", build, request, CACHE_CONTROL_FEATURED)
 
 
 @router.get("/{song_id}", response_model=SongResponse)
-async def get_song(song_id: int, db: AsyncSession = Depends(get_db)):
+async def get_song(song_id: int, db: AsyncSession = Depends(get_read_db)):
     query = select(Song).options(
         selectinload(Song.artist),
         selectinload(Song.album)
@@ -72,15 +101,40 @@ async def get_song(song_id: int, db: AsyncSession = Depends(get_db)):
     return SongResponse.model_validate(song)
 
 
+@router.api_route("/{song_id}/stream", methods=["GET", "HEAD"])
+async def stream_song(song_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    result = await db.execute(select(Song.audio_url).where(Song.id == song_id))
+    audio_url = result.scalar_one_or_none()
+    
+    if audio_url is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Song not found"
+        )
+    
+    # Audio still hosted elsewhere is handed off, so players can always use this URL
+    if is_external(audio_url):
+        return RedirectResponse(audio_url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+    
+    obj = await audio_storage.stat(audio_url)
+    if obj is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Audio not found"
+        )
+    
+    return stream_audio(request, audio_storage, obj)
+
+
 @router.post("/{song_id}/play")
 async def record_play(
     song_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    # Get song
-    result = await db.execute(select(Song).where(Song.id == song_id))
-    song = result.scalar_one_or_none()
+    # Verify song exists
+    result = await db.execute(select(Song.id, Song.plays).where(Song.id == song_id))
+    song = result.first()
     
     if not song:
         raise HTTPException(
@@ -88,16 +142,10 @@ async def record_play(
             detail="Song not found"
         )
     
-    # Increment play count
-    song.plays += 1
-    
-    # Record in recently played
-    recently_played = RecentlyPlayed(user_id=current_user.id, song_id=song_id)
-    db.add(recently_played)
-    
-    await db.commit()
+    # Play count and recently played are written in batches by the play buffer
+    play_buffer.record(current_user.id, song_id)
     
-    return {"message": "Play recorded", "plays": song.plays}
+    return {"message": "Play recorded", "plays": (song.plays or 0) + play_buffer.pending(song_id)}
 
 
 @router.post("", response_model=SongResponse, status_code=status.HTTP_201_CREATED)
@@ -123,6 +171,8 @@ async def create_song(song_data: SongCreate, db: AsyncSession = Depends(get_db))
     db.add(song)
     await db.commit()
     await db.refresh(song)
+    search_engine.index_song(song)
+    await response_cache.invalidate("songs", *entity_tags(songs=[song]))
     
     # Reload with relationships
     query = select(Song).options(
@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Depends
+from app.config import settings
+from app.auth import get_admin_principal
+from app.auth.hashing import password_hasher
+from app.auth.principal_cache import principal_cache
+from app.database import get_pool_stats
+from app.startup import startup_timer
+from app.metrics import request_metrics
+from app.services.play_buffer import play_buffer
+from app.services.response_cache import response_cache
+from app.services.trending import trending
+from app.services.listeners import listener_rollup
+from app.services.history import history_compactor
+from app.services.liked_songs import liked_cache
+from app.services.storage import audio_storage
+from app.services.health import health_monitor
+from app.services.loop_monitor import loop_monitor
+from app.replicas import replica_router
+
+# Stats expose internal topology and load; operators only unless explicitly opened up
+router = APIRouter(
+    prefix="/api/stats",
+    tags=["Stats"],
+    dependencies=[] if settings.stats_public else [Depends(get_admin_principal)],
+)
+
+
+@router.get("/plays")
+async def get_play_buffer_stats():
+    return play_buffer.stats()
+
+
+@router.get("/pool")
+async def get_connection_pool_stats():
+    return get_pool_stats()
+
+
+@router.get("/auth-cache")
+async def get_auth_cache_stats():
+    return principal_cache.stats()
+
+
+@router.get("/password-hasher")
+async def get_password_hasher_stats():
+    return password_hasher.stats()
+
+
+@router.get("/response-cache")
+async def get_response_cache_stats():
+    return response_cache.stats()
+
+
+@router.get("/trending")
+async def get_trending_stats():
+    return trending.stats()
+
+
+@router.get("/listeners")
+async def get_listener_rollup_stats():
+    return listener_rollup.stats()
+
+
+@router.get("/history")
+async def get_history_compaction_stats():
+    return history_compactor.stats()
+
+
+@router.get("/liked-cache")
+async def get_liked_cache_stats():
+    return liked_cache.stats()
+
+
+@router.get("/startup")
+async def get_startup_stats():
+    return startup_timer.stats()
+
+
+@router.get("/audio-storage")
+async def get_audio_storage_stats():
+    return audio_storage.stats()
+
+
+@router.get("/slow-queries")
+async def get_slow_query_samples():
+    return request_metrics.samples()
+
+
+@router.get("/health")
+async def get_health_monitor_stats():
+    return health_monitor.stats()
+
+
+@router.get("/event-loop")
+async def get_event_loop_stats():
+    return loop_monitor.stats()
+
+
+@router.get("/replicas")
+async def get_replica_stats():
+    return replica_router.stats()
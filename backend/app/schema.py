@@ -0,0 +1,62 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+# Serializes concurrent `upgrade` runs on Postgres (e.g. several workers with auto-migrate on)
+MIGRATION_LOCK_ID = 247_001
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+def alembic_config() -> Config:
+    return Config(str(ALEMBIC_INI))
+
+
+@lru_cache()
+def expected_revision() -> Optional[str]:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+async def current_revision(engine: AsyncEngine) -> Optional[str]:
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        except DBAPIError:
+            return None
+        return result.scalar_one_or_none()
+
+
+async def check_schema(engine: AsyncEngine) -> str:
+    """One-row read of alembic_version; raises unless the database is at the code's head."""
+    expected = expected_revision()
+    current = await current_revision(engine)
+    if current != expected:
+        raise SchemaVersionError(
+            f"Database schema is at {current or 'no revision'}, this build expects {expected}. "
+            "Run `alembic upgrade head` (or `python -m app.cli migrate`) before starting the API. "
+            "A database created by create_all needs `alembic stamp 0001` first."
+        )
+    return current
+
+
+def _upgrade(connection, revision: str) -> None:
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+    config = alembic_config()
+    config.attributes["connection"] = connection
+    command.upgrade(config, revision)
+
+
+async def upgrade(engine: AsyncEngine, revision: str = "head") -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade, revision)
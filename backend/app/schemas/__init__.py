@@ -4,9 +4,12 @@ from app.schemas.music import (
     AlbumBase, AlbumCreate, AlbumResponse, AlbumWithSongsResponse,
     SongBase, SongCreate, SongResponse
 )
+from app.schemas.search import SearchHitResponse, SearchResponse
+from app.schemas.library import LikedCheckResponse
 from app.schemas.playlist import (
     PlaylistBase, PlaylistCreate, PlaylistUpdate, PlaylistResponse,
-    PlaylistWithSongsResponse, AddSongToPlaylist
+    PlaylistWithSongsResponse, AddSongToPlaylist,
+    PlaylistOperation, PlaylistBatch, PlaylistTrackPosition, PlaylistBatchResult
 )
 
 __all__ = [
@@ -15,5 +18,8 @@ __all__ = [
     "AlbumBase", "AlbumCreate", "AlbumResponse", "AlbumWithSongsResponse",
     "SongBase", "SongCreate", "SongResponse",
     "PlaylistBase", "PlaylistCreate", "PlaylistUpdate", "PlaylistResponse",
-    "PlaylistWithSongsResponse", "AddSongToPlaylist"
+    "PlaylistWithSongsResponse", "AddSongToPlaylist",
+    "PlaylistOperation", "PlaylistBatch", "PlaylistTrackPosition", "PlaylistBatchResult",
+    "SearchHitResponse", "SearchResponse",
+    "LikedCheckResponse"
 ]
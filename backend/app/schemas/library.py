@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class LikedCheckResponse(BaseModel):
+    liked: List[int]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 from app.schemas.music import SongResponse
 from app.schemas.user import UserResponse
@@ -30,15 +30,16 @@ class PlaylistResponse(PlaylistBase):
     owner: Optional[UserResponse] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    song_count: int = 0
+    total_duration: int = 0
 
     class Config:
         from_attributes = True
 
 
 class PlaylistWithSongsResponse(PlaylistResponse):
+    # First page of tracks; the rest is read from /api/playlists/{id}/songs
     songs: List[SongResponse] = []
-    song_count: int = 0
-    total_duration: int = 0
 
     class Config:
         from_attributes = True
@@ -46,3 +47,38 @@ class PlaylistWithSongsResponse(PlaylistResponse):
 
 class AddSongToPlaylist(BaseModel):
     song_id: int
+
+
+class PlaylistOperation(BaseModel):
+    """One step of a batch edit, applied in order.
+
+    ``add`` and ``remove`` take ``song_ids``; ``add`` inserts at ``index`` (0-based)
+    or appends. ``move`` puts ``song_id`` at ``index``. ``reorder`` takes every
+    song in the playlist exactly once, in the new order.
+    """
+    op: Literal["add", "remove", "move", "reorder"]
+    song_ids: List[int] = []
+    song_id: Optional[int] = None
+    index: Optional[int] = None
+
+
+class PlaylistBatch(BaseModel):
+    operations: List[PlaylistOperation]
+
+
+class PlaylistTrackPosition(BaseModel):
+    song_id: int
+    position: int
+
+
+class PlaylistBatchResult(BaseModel):
+    version: int
+    song_count: int
+    total_duration: int
+    added: List[PlaylistTrackPosition] = []
+    moved: List[PlaylistTrackPosition] = []
+    removed: List[int] = []
+    # Song ids that were skipped: unknown songs, songs already present, or not in the playlist
+    missing: List[int] = []
+    duplicates: List[int] = []
+    not_in_playlist: List[int] = []
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import List
+from app.schemas.music import SongResponse, AlbumResponse, ArtistResponse
+
+
+# Search Schemas
+class SearchHitResponse(BaseModel):
+    type: str
+    id: int
+    title: str
+    score: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchHitResponse] = []
+    songs: List[SongResponse] = []
+    albums: List[AlbumResponse] = []
+    artists: List[ArtistResponse] = []
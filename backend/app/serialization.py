@@ -0,0 +1,106 @@
+import json
+import typing
+from datetime import date, datetime
+from typing import Any, Iterable, List, Mapping, Optional, Type
+from fastapi import Response
+from pydantic import BaseModel
+from app.schemas.music import ArtistResponse, AlbumResponse, SongResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+_MISSING = object()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        # Match pydantic, which writes UTC offsets as "Z"
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_json_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _nested(annotation: Any) -> tuple:
+    """Return (model, is_list) when a field holds another response model."""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return _nested(args[0]) if len(args) == 1 else (None, False)
+    if origin in (list, List):
+        model, _ = _nested(typing.get_args(annotation)[0])
+        return model, model is not None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+
+class Serializer:
+    """Builds JSON-ready dicts for a response model straight from ORM objects or rows.
+
+    Field names, defaults and nesting come from the model, but values are taken as
+    they are: the database is trusted, so nothing is validated or coerced. Use it on
+    hot read paths together with :func:`json_response`, which also skips FastAPI's
+    ``response_model`` pass.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self._fields = []
+        for name, info in model.model_fields.items():
+            nested, many = _nested(info.annotation)
+            default = _MISSING if info.is_required() else info.get_default(call_default_factory=True)
+            self._fields.append((name, default, Serializer(nested) if nested else None, many))
+
+    def one(self, obj: Any) -> Optional[dict]:
+        if obj is None:
+            return None
+        # ORM instances keep loaded attributes in __dict__; reading it skips the
+        # instrumented descriptors, and anything unloaded still goes through getattr.
+        # Result rows carry every selected column, so absent fields take their default.
+        loaded = getattr(obj, "__dict__", None)
+        complete = loaded is None and hasattr(obj, "_asdict")
+        if complete:
+            loaded = obj._asdict()
+        elif loaded is None:
+            loaded = {}
+        data = {}
+        for name, default, nested, many in self._fields:
+            value = loaded.get(name, _MISSING)
+            if value is _MISSING:
+                if complete and default is not _MISSING:
+                    value = default
+                else:
+                    value = getattr(obj, name) if default is _MISSING else getattr(obj, name, default)
+            if nested is not None and value is not None:
+                value = nested.many(value) if many else nested.one(value)
+            data[name] = value
+        return data
+
+    def many(self, objs: Iterable[Any]) -> List[dict]:
+        one = self.one
+        return [one(obj) for obj in objs]
+
+    def dump(self, obj: Any) -> bytes:
+        return dumps(self.one(obj))
+
+    def dump_many(self, objs: Iterable[Any]) -> bytes:
+        return dumps(self.many(objs))
+
+
+def json_response(body: bytes, headers: Optional[Mapping[str, str]] = None, status_code: int = 200) -> Response:
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=dict(headers or {}))
+
+
+artist_serializer = Serializer(ArtistResponse)
+album_serializer = Serializer(AlbumResponse)
+song_serializer = Serializer(SongResponse)
@@ -0,0 +1,36 @@
+from app.services.play_buffer import PlayBuffer, play_buffer
+from app.services.search import SearchEngine, InMemorySearchIndex, SearchHit, search_engine
+from app.services.response_cache import ResponseCache, CachedResponse, response_cache
+from app.services.trending import TrendingRankings, TrendingSnapshot, trending
+from app.services.hyperloglog import HyperLogLog
+from app.services.listeners import ListenerRollup, listener_rollup
+from app.services.history import HistoryCompactor, history_compactor
+from app.services.liked_songs import LikedSet, LikedSongCache, liked_cache
+from app.services.storage import AudioObject, AudioStorage, LocalAudioStorage, audio_storage
+
+__all__ = [
+    "PlayBuffer",
+    "play_buffer",
+    "SearchEngine",
+    "InMemorySearchIndex",
+    "SearchHit",
+    "search_engine",
+    "ResponseCache",
+    "CachedResponse",
+    "response_cache",
+    "TrendingRankings",
+    "TrendingSnapshot",
+    "trending",
+    "HyperLogLog",
+    "ListenerRollup",
+    "listener_rollup",
+    "HistoryCompactor",
+    "history_compactor",
+    "LikedSet",
+    "LikedSongCache",
+    "liked_cache",
+    "AudioObject",
+    "AudioStorage",
+    "LocalAudioStorage",
+    "audio_storage",
+]
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from sqlalchemy import text
+from app.config import settings
+from app.database import engine, get_pool_stats
+from app.serialization import dumps
+from app.services.loop_monitor import loop_monitor
+from app.services.search import search_engine
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+DEGRADED = "degraded"
+DOWN = "down"
+_SEVERITY = {OK: 0, DEGRADED: 1, DOWN: 2}
+
+
+def _worst(*statuses: str) -> str:
+    return max(statuses, key=_SEVERITY.__getitem__, default=OK)
+
+
+class HealthMonitor:
+    """Runs the readiness checks in the background and keeps the last verdict.
+
+    Probes only read the cached, pre-serialized result, so load balancers can
+    poll as often as they like without touching the database. The checks:
+
+    - database: a ``SELECT 1`` through the normal pool, so an exhausted pool
+      shows up as a timeout rather than a fast answer from a spare connection
+    - pool: checked-out connections against pool_size + max_overflow, and any
+      checkout timeouts since the previous check
+    - background_tasks: every registered background loop is still running
+    - event_loop: worst lag the loop monitor saw since the last check
+    - search: whether the in-process index is still ``warming``; searches are
+      answered from the database meanwhile, so it never costs readiness
+
+    Any check crossing its threshold makes the worker ``degraded``; a database
+    that does not answer, or a verdict older than three intervals, is ``down``.
+    Only ``ok`` is ready.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        db_timeout: float,
+        db_latency_degraded_ms: float,
+        pool_utilization_degraded: float,
+        loop_lag_degraded_ms: float,
+    ):
+        self.interval = interval
+        self.db_timeout = db_timeout
+        self.db_latency_degraded_ms = db_latency_degraded_ms
+        self.pool_utilization_degraded = pool_utilization_degraded
+        self.loop_lag_degraded_ms = loop_lag_degraded_ms
+        self._services: Dict[str, object] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._pool_timeouts = 0
+        self._checked_at = 0.0
+        self._status = DOWN
+        self._body = dumps({"status": DOWN, "reason": "not started"})
+        self.checks = 0
+        self.transitions = 0
+
+    def register(self, name: str, service) -> None:
+        """Watch a background service; anything with a ``running`` property will do."""
+        self._services[name] = service
+
+    async def _select_one(self) -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def _check_database(self) -> dict:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._select_one(), timeout=self.db_timeout)
+        except asyncio.TimeoutError:
+            return {"status": DOWN, "error": f"no answer within {self.db_timeout:g}s"}
+        except Exception as exc:
+            return {"status": DOWN, "error": type(exc).__name__}
+        latency_ms = (time.perf_counter() - started) * 1000
+        status = DEGRADED if latency_ms > self.db_latency_degraded_ms else OK
+        return {"status": status, "latency_ms": round(latency_ms, 3)}
+
+    def _check_pool(self) -> dict:
+        pool = get_pool_stats()
+        timeouts = pool["timeouts"] - self._pool_timeouts
+        self._pool_timeouts = pool["timeouts"]
+        result = {"status": DEGRADED if timeouts else OK, "timeouts_since_last_check": timeouts}
+        if "pool_size" in pool:
+            capacity = pool["pool_size"] + pool["max_overflow"]
+            utilization = pool["checked_out"] / capacity if capacity else 0.0
+            if utilization >= self.pool_utilization_degraded:
+                result["status"] = DEGRADED
+            result.update(checked_out=pool["checked_out"], capacity=capacity, utilization=round(utilization, 3))
+        return result
+
+    def _check_tasks(self) -> dict:
+        tasks = {name: service.running for name, service in self._services.items()}
+        return {"status": OK if all(tasks.values()) else DEGRADED, "tasks": tasks}
+
+    def _check_loop(self) -> dict:
+        if not loop_monitor.running:
+            return {"status": DEGRADED, "error": "loop monitor is not running"}
+        max_lag_ms = loop_monitor.take_max_lag_ms()
+        status = DEGRADED if max_lag_ms > self.loop_lag_degraded_ms else OK
+        return {"status": status, "lag_ms": round(loop_monitor.lag_ms, 3), "max_lag_ms": round(max_lag_ms, 3)}
+
+    async def check(self) -> str:
+        checks = {
+            "database": await self._check_database(),
+            "pool": self._check_pool(),
+            "background_tasks": self._check_tasks(),
+            "event_loop": self._check_loop(),
+            "search": {"status": OK, "index": search_engine.state},
+        }
+        status = _worst(*(check["status"] for check in checks.values()))
+        if status != self._status:
+            self.transitions += 1
+            failing = [name for name, check in checks.items() if check["status"] != OK]
+            log = logger.info if status == OK else logger.warning
+            log("Readiness changed from %s to %s (%s)", self._status, status, ", ".join(failing) or "all checks ok")
+        self._status = status
+        self._checked_at = time.monotonic()
+        self._body = dumps({
+            "status": status,
+            "checked_at": datetime.now(timezone.utc),
+            "checks": checks,
+        })
+        self.checks += 1
+        return status
+
+    def readiness(self) -> tuple:
+        """(ready, serialized body) from the last check."""
+        if self._task is not None and time.monotonic() - self._checked_at > self.interval * 3:
+            # The monitor itself is stuck, which says the same about the worker
+            return False, dumps({"status": DOWN, "reason": "health check is stale"})
+        return self._status == OK, self._body
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception:
+                logger.exception("Failed to run readiness checks")
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self._task is None:
+            await self.check()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # Fail readiness first so load balancers drain the worker while it shuts down
+        self._status = DOWN
+        self._body = dumps({"status": DOWN, "reason": "shutting down"})
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "status": self._status,
+            "interval_seconds": self.interval,
+            "checks": self.checks,
+            "transitions": self.transitions,
+            "seconds_since_check": round(time.monotonic() - self._checked_at, 3) if self._checked_at else None,
+            "registered_tasks": sorted(self._services),
+        }
+
+
+health_monitor = HealthMonitor(
+    interval=settings.health_check_interval_seconds,
+    db_timeout=settings.health_db_timeout_seconds,
+    db_latency_degraded_ms=settings.health_db_latency_degraded_ms,
+    pool_utilization_degraded=settings.health_pool_utilization_degraded,
+    loop_lag_degraded_ms=settings.health_loop_lag_degraded_ms,
+)
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, delete, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import async_session_maker, engine, upsert
+from app.models.library import RecentlyPlayed, ListeningHistory
+from app.models.listeners import RollupWatermark
+from app.services.listeners import WATERMARK_NAME
+from app.services.trending import WINDOWS
+
+logger = logging.getLogger(__name__)
+
+# One compactor at a time across workers on Postgres, after the trending lock
+COMPACTION_LOCK_ID = 247_003
+
+
+async def record_history(db: AsyncSession, events: List[dict]) -> None:
+    """Upsert the latest play of each (user, song) pair in ``events``."""
+    latest: Dict[Tuple[int, int], datetime] = {}
+    for event in events:
+        key = (event["user_id"], event["song_id"])
+        if key not in latest or event["played_at"] > latest[key]:
+            latest[key] = event["played_at"]
+    if not latest:
+        return
+
+    statement = upsert(db.bind.dialect.name, ListeningHistory)
+    statement = statement.on_conflict_do_update(
+        index_elements=[ListeningHistory.user_id, ListeningHistory.song_id],
+        set_={"played_at": statement.excluded.played_at},
+        where=statement.excluded.played_at > ListeningHistory.played_at,
+    )
+    await db.execute(statement, [
+        {"user_id": user_id, "song_id": song_id, "played_at": played_at}
+        for (user_id, song_id), played_at in latest.items()
+    ])
+
+
+class HistoryCompactor:
+    """Background pruning of listening history and the raw play log.
+
+    Keeps at most ``max_per_user`` history rows per user and drops play
+    events older than the retention window once the listener rollup has
+    folded them. Deletes run in short batches, each in its own transaction,
+    so they never hold long locks.
+
+    The cap is only enforced when a run comes round, once per ``interval``;
+    in between a heavy listener's history can grow past it.
+
+    Every worker runs the timer, but on Postgres a run only goes ahead in the
+    worker that wins a non-blocking advisory lock; the others count a skipped
+    run and try again next interval.
+    """
+
+    def __init__(self, interval: float, max_per_user: int, batch_rows: int, retention_days: int):
+        self.interval = interval
+        self.max_per_user = max_per_user
+        self.batch_rows = batch_rows
+        # Trending windows and the listener rollup both read the play log
+        self.retention = max(
+            timedelta(days=retention_days),
+            timedelta(days=settings.listener_rollup_window_days),
+            *WINDOWS.values(),
+        )
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.failed_runs = 0
+        self.skipped_runs = 0
+        self.history_pruned = 0
+        self.events_pruned = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_run_ms = 0.0
+
+    async def _prune_history(self, db: AsyncSession) -> int:
+        result = await db.execute(
+            select(ListeningHistory.user_id)
+            .group_by(ListeningHistory.user_id)
+            .having(func.count() > self.max_per_user)
+        )
+        over_cap = result.scalars().all()
+        await db.commit()
+        total = 0
+        for user_id in over_cap:
+            # Walks the user's (user_id, played_at, id) index past the newest max_per_user rows
+            overflow = (
+                select(ListeningHistory.id)
+                .where(ListeningHistory.user_id == user_id)
+                .order_by(ListeningHistory.played_at.desc(), ListeningHistory.id.desc())
+                .offset(self.max_per_user)
+                .limit(self.batch_rows)
+            )
+            total += await self._delete_batches(db, ListeningHistory, overflow)
+        return total
+
+    async def _prune_events(self, db: AsyncSession) -> int:
+        folded = await db.scalar(select(RollupWatermark.last_id).where(RollupWatermark.name == WATERMARK_NAME))
+        if not folded:
+            return 0
+        cutoff = datetime.now(timezone.utc) - self.retention
+        expired = select(RecentlyPlayed.id).where(
+            RecentlyPlayed.played_at < cutoff,
+            RecentlyPlayed.id <= folded,
+        ).order_by(RecentlyPlayed.id).limit(self.batch_rows)
+        return await self._delete_batches(db, RecentlyPlayed, expired)
+
+    async def _delete_batches(self, db: AsyncSession, model, ids) -> int:
+        total = 0
+        while True:
+            result = await db.execute(
+                delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            deleted = max(result.rowcount or 0, 0)
+            total += deleted
+            if deleted < self.batch_rows:
+                return total
+            # Let request handlers in between batches
+            await asyncio.sleep(0)
+
+    @asynccontextmanager
+    async def _leader(self):
+        """Yield whether this worker holds the compaction lock.
+
+        The batches commit as they go, so the session-level lock lives on a
+        connection of its own, in autocommit so it does not idle in a transaction.
+        """
+        if engine.dialect.name != "postgresql":
+            yield True
+            return
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            acquired = await conn.scalar(text("SELECT pg_try_advisory_lock(:id)"), {"id": COMPACTION_LOCK_ID})
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    await conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": COMPACTION_LOCK_ID})
+
+    async def run(self) -> dict:
+        async with self._lock:
+            started = time.perf_counter()
+            try:
+                async with self._leader() as leader:
+                    if not leader:
+                        self.skipped_runs += 1
+                        return {"skipped": True, "history_pruned": 0, "events_pruned": 0}
+                    async with async_session_maker() as db:
+                        history = await self._prune_history(db)
+                        events = await self._prune_events(db)
+            except Exception:
+                self.failed_runs += 1
+                raise
+
+            self.runs += 1
+            self.history_pruned += history
+            self.events_pruned += events
+            self.last_run_at = datetime.now(timezone.utc)
+            self.last_run_ms = (time.perf_counter() - started) * 1000
+            return {"history_pruned": history, "events_pruned": events}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run()
+            except Exception:
+                logger.exception("Failed to compact listening history")
+            await asyncio.sleep(self.interval)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "max_per_user": self.max_per_user,
+            "retention_days": self.retention.days,
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "skipped_runs": self.skipped_runs,
+            "history_pruned": self.history_pruned,
+            "events_pruned": self.events_pruned,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_run_ms": round(self.last_run_ms, 3),
+        }
+
+
+history_compactor = HistoryCompactor(
+    interval=settings.history_compaction_interval_seconds,
+    max_per_user=settings.history_max_per_user,
+    batch_rows=settings.history_compaction_batch_rows,
+    retention_days=settings.play_event_retention_days,
+)
@@ -0,0 +1,80 @@
+import hashlib
+import math
+from typing import Iterable, Optional
+
+_HASH_BITS = 64
+
+
+def _hash(value: int) -> int:
+    return int.from_bytes(hashlib.blake2b(value.to_bytes(8, "little", signed=True), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """Approximate distinct counter over integer ids.
+
+    ``2 ** precision`` one-byte registers give a standard error of about
+    ``1.04 / sqrt(2 ** precision)``; precision 11 is 2 KiB and roughly 2.3%.
+    Sketches with the same precision merge losslessly, which is what lets
+    per-day buckets roll up into any window.
+    """
+
+    def __init__(self, precision: int = 11, registers: Optional[bytes] = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.size = 1 << precision
+        if registers is not None and len(registers) != self.size:
+            raise ValueError("register count does not match precision")
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.size)
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "HyperLogLog":
+        # First byte is the precision, the rest are the registers
+        return cls(raw[0], raw[1:])
+
+    def to_bytes(self) -> bytes:
+        return bytes((self.precision,)) + bytes(self.registers)
+
+    def add(self, value: int) -> None:
+        hashed = _hash(value)
+        index = hashed >> (_HASH_BITS - self.precision)
+        rest = hashed & ((1 << (_HASH_BITS - self.precision)) - 1)
+        rank = _HASH_BITS - self.precision - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values: Iterable[int]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def reduce(self, precision: int) -> "HyperLogLog":
+        """The same sketch at a lower precision, exactly as if built at that precision."""
+        if precision > self.precision:
+            raise ValueError("cannot raise the precision of a sketch")
+        shift = self.precision - precision
+        low_mask = (1 << shift) - 1
+        registers = bytearray(1 << precision)
+        for index, rank in enumerate(self.registers):
+            if not rank:
+                continue
+            # The dropped index bits become the top of the rank's bit string
+            low = index & low_mask
+            rank = shift - low.bit_length() + 1 if low else rank + shift
+            if rank > registers[index >> shift]:
+                registers[index >> shift] = rank
+        return HyperLogLog(precision, bytes(registers))
+
+    def count(self) -> int:
+        size = self.size
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            # Linear counting is far more accurate while most registers are empty
+            estimate = size * math.log(size / zeros)
+        return int(round(estimate))
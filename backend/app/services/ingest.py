@@ -0,0 +1,399 @@
+import asyncio
+import codecs
+import csv
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date
+from typing import AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import async_session_maker
+from app.models.artist import Artist
+from app.models.album import Album
+from app.models.song import Song
+from app.services.response_cache import response_cache, CATALOG_TAG
+from app.services.search import search_engine
+from app.serialization import orjson
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv")
+
+Record = Tuple[int, dict]
+
+SONG_COLUMNS = ("title", "album_id", "artist_id", "duration", "audio_url", "track_number", "plays")
+
+# Titles per existing-song lookup, well under driver bind parameter limits
+TITLE_CHUNK = 1000
+
+
+class IngestError(ValueError):
+    pass
+
+
+async def ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """One JSON object per line; blank lines are skipped."""
+    line_no = 0
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield line_no, _parse_json(line_no, line)
+    if buffer.strip():
+        yield line_no + 1, _parse_json(line_no + 1, buffer)
+
+
+def _parse_json(line_no: int, line: bytes) -> dict:
+    try:
+        record = orjson.loads(line) if orjson is not None else json.loads(line)
+    except ValueError as exc:
+        return {"__error__": f"invalid JSON: {exc}"}
+    return record if isinstance(record, dict) else {"__error__": "expected a JSON object"}
+
+
+class _Lines:
+    """Line source for a long-lived ``csv.reader`` that is refilled chunk by chunk.
+
+    Notes whether the reader ran dry while asking for a line, and which lines
+    it took, so a record cut off at the end of a chunk can be handed back.
+    """
+
+    def __init__(self):
+        self.pending: Deque[str] = deque()
+        self.taken: List[str] = []
+        self.ran_dry = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.pending:
+            self.ran_dry = True
+            raise StopIteration
+        line = self.pending.popleft()
+        self.taken.append(line)
+        return line
+
+    def give_back(self) -> None:
+        self.pending.extendleft(reversed(self.taken))
+
+
+async def csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """CSV with a header row and a ``type`` column; empty cells are null.
+
+    Quoted cells may span lines; ``csv.reader`` sees the input line by line
+    and decides where a record ends. Records are numbered by the line they
+    start on.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    lines = _Lines()
+    reader = csv.reader(lines)
+    header: Optional[List[str]] = None
+    line_no = 0
+    buffer = ""
+
+    def records(final: bool):
+        nonlocal header, line_no
+        while lines.pending:
+            lines.taken, lines.ran_dry = [], False
+            try:
+                values = next(reader)
+            except StopIteration:
+                return
+            if lines.ran_dry:
+                # The reader hit the end of the input inside a quoted cell
+                if not final:
+                    lines.give_back()
+                    return
+                yield line_no + 1, {"__error__": "unterminated quoted cell"}
+                return
+            start, line_no = line_no + 1, line_no + len(lines.taken)
+            if header is None:
+                header = [name.strip() for name in values]
+            elif values:
+                yield start, {name: value for name, value in zip(header, values) if value != ""}
+
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *complete, buffer = buffer.split("\n")
+        lines.pending.extend(line + "\n" for line in complete)
+        for record in records(final=False):
+            yield record
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        lines.pending.append(buffer)
+    for record in records(final=True):
+        yield record
+
+
+def _int(record: dict, name: str, required: bool = False) -> Optional[int]:
+    value = record.get(name)
+    if value is None:
+        if required:
+            raise IngestError(f"missing {name}")
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise IngestError(f"{name} must be an integer")
+
+
+def _str(record: dict, name: str, required: bool = False) -> Optional[str]:
+    value = record.get(name)
+    if value is None or value == "":
+        if required:
+            raise IngestError(f"missing {name}")
+        return None
+    return str(value)
+
+
+def _date(record: dict, name: str) -> Optional[date]:
+    value = record.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        raise IngestError(f"{name} must be an ISO date")
+
+
+@dataclass
+class IngestReport:
+    inserted: Dict[str, int] = field(default_factory=lambda: {"artists": 0, "albums": 0, "songs": 0})
+    existing: Dict[str, int] = field(default_factory=lambda: {"artists": 0, "albums": 0, "songs": 0})
+    rejected: int = 0
+    errors: List[dict] = field(default_factory=list)
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return sum(self.inserted.values())
+
+    def to_dict(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "existing": self.existing,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "batches": self.batches,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "rows_per_second": round(self.rows / self.elapsed_seconds, 1) if self.elapsed_seconds else 0.0,
+        }
+
+
+class CatalogImporter:
+    """Streams artist, album and song records into the catalog in batches.
+
+    Records reference each other by name: albums by ``artist``, songs by
+    ``artist`` and optional ``album`` title. Names resolve through in-memory
+    maps preloaded from the database and extended as batches are written, so
+    existing artists and albums are reused rather than duplicated. Songs are
+    too many to preload; each batch looks its titles up instead, and a song
+    whose artist, album and title already exist is skipped. Artists and
+    albums are inserted with ``INSERT ... RETURNING`` to learn their ids; songs
+    go through COPY on asyncpg and a multi-row INSERT elsewhere. The next input
+    is only read once a batch is committed, which is the backpressure on the
+    upload or file being read.
+    """
+
+    def __init__(self, batch_size: int, use_copy: bool = True, max_errors: int = 100):
+        self.batch_size = batch_size
+        self.use_copy = use_copy
+        self.max_errors = max_errors
+        self._artist_ids: Dict[str, int] = {}
+        self._album_ids: Dict[Tuple[int, str], int] = {}
+        self._artists: Dict[str, dict] = {}
+        self._albums: Dict[Tuple[str, str], Tuple[int, dict]] = {}
+        self._songs: List[Tuple[int, str, Optional[str], dict]] = []
+        self.report = IngestReport()
+
+    async def _load_keys(self, db: AsyncSession) -> None:
+        result = await db.stream(select(Artist.id, Artist.name).execution_options(yield_per=10000))
+        async for artist_id, name in result:
+            self._artist_ids.setdefault(name, artist_id)
+        result = await db.stream(select(Album.id, Album.artist_id, Album.title).execution_options(yield_per=10000))
+        async for album_id, artist_id, title in result:
+            self._album_ids.setdefault((artist_id, title), album_id)
+
+    def _reject(self, line_no: int, message: str) -> None:
+        self.report.rejected += 1
+        if len(self.report.errors) < self.max_errors:
+            self.report.errors.append({"line": line_no, "error": message})
+
+    def _pending(self) -> int:
+        return len(self._artists) + len(self._albums) + len(self._songs)
+
+    def add(self, line_no: int, record: dict) -> None:
+        if "__error__" in record:
+            self._reject(line_no, record["__error__"])
+            return
+        try:
+            kind = record.get("type")
+            if kind == "artist":
+                name = _str(record, "name", required=True)
+                if name in self._artist_ids or name in self._artists:
+                    self.report.existing["artists"] += 1
+                    return
+                self._artists[name] = {
+                    "name": name,
+                    "bio": _str(record, "bio"),
+                    "image_url": _str(record, "image_url"),
+                    "monthly_listeners": _int(record, "monthly_listeners") or 0,
+                }
+            elif kind == "album":
+                key = (_str(record, "artist", required=True), _str(record, "title", required=True))
+                artist_id = self._artist_ids.get(key[0])
+                if key in self._albums or (artist_id is not None and (artist_id, key[1]) in self._album_ids):
+                    self.report.existing["albums"] += 1
+                    return
+                self._albums[key] = (line_no, {
+                    "title": key[1],
+                    "cover_url": _str(record, "cover_url"),
+                    "release_date": _date(record, "release_date"),
+                    "album_type": _str(record, "album_type") or "album",
+                })
+            elif kind == "song":
+                self._songs.append((line_no, _str(record, "artist", required=True), _str(record, "album"), {
+                    "title": _str(record, "title", required=True),
+                    "duration": _int(record, "duration", required=True),
+                    "audio_url": _str(record, "audio_url", required=True),
+                    "track_number": _int(record, "track_number"),
+                    "plays": _int(record, "plays") or 0,
+                }))
+            else:
+                raise IngestError("type must be artist, album or song")
+        except IngestError as exc:
+            self._reject(line_no, str(exc))
+
+    async def _insert_returning(self, db: AsyncSession, model, rows: List[dict]) -> List[int]:
+        result = await db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows)
+        return list(result.scalars())
+
+    async def _existing_songs(self, db: AsyncSession, titles: Set[str]) -> Set[Tuple[int, Optional[int], str]]:
+        keys = set()
+        ordered = sorted(titles)
+        for start in range(0, len(ordered), TITLE_CHUNK):
+            chunk = ordered[start:start + TITLE_CHUNK]
+            result = await db.execute(select(Song.artist_id, Song.album_id, Song.title).where(Song.title.in_(chunk)))
+            keys.update(tuple(row) for row in result)
+        return keys
+
+    async def _insert_songs(self, db: AsyncSession, rows: List[dict]) -> None:
+        if self.use_copy and db.bind.dialect.driver == "asyncpg":
+            connection = await db.connection()
+            raw = await connection.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                Song.__tablename__,
+                records=[tuple(row[column] for column in SONG_COLUMNS) for row in rows],
+                columns=SONG_COLUMNS,
+            )
+        else:
+            await db.execute(insert(Song), rows)
+
+    async def flush(self, db: AsyncSession) -> None:
+        if not self._pending():
+            return
+        # Parents first, so children in the same batch can resolve them
+        if self._artists:
+            names = list(self._artists)
+            ids = await self._insert_returning(db, Artist, list(self._artists.values()))
+            self._artist_ids.update(zip(names, ids))
+            self.report.inserted["artists"] += len(ids)
+            self._artists = {}
+
+        if self._albums:
+            keys, rows = [], []
+            for (artist, title), (line_no, row) in self._albums.items():
+                artist_id = self._artist_ids.get(artist)
+                if artist_id is None:
+                    self._reject(line_no, f"unknown artist {artist!r}")
+                    continue
+                keys.append((artist_id, title))
+                rows.append({**row, "artist_id": artist_id})
+            if rows:
+                ids = await self._insert_returning(db, Album, rows)
+                self._album_ids.update(zip(keys, ids))
+                self.report.inserted["albums"] += len(ids)
+            self._albums = {}
+
+        if self._songs:
+            rows = []
+            # Re-importing a dump, or a song listed twice, must not duplicate it
+            seen = await self._existing_songs(db, {row["title"] for _, _, _, row in self._songs})
+            for line_no, artist, album, row in self._songs:
+                artist_id = self._artist_ids.get(artist)
+                if artist_id is None:
+                    self._reject(line_no, f"unknown artist {artist!r}")
+                    continue
+                album_id = None
+                if album is not None:
+                    album_id = self._album_ids.get((artist_id, album))
+                    if album_id is None:
+                        self._reject(line_no, f"unknown album {album!r} for artist {artist!r}")
+                        continue
+                key = (artist_id, album_id, row["title"])
+                if key in seen:
+                    self.report.existing["songs"] += 1
+                    continue
+                seen.add(key)
+                rows.append({**row, "artist_id": artist_id, "album_id": album_id})
+            if rows:
+                await self._insert_songs(db, rows)
+                self.report.inserted["songs"] += len(rows)
+            self._songs = []
+
+        await db.commit()
+        self.report.batches += 1
+
+    async def run(self, records: AsyncIterator[Record]) -> IngestReport:
+        started = time.perf_counter()
+        async with async_session_maker() as db:
+            await self._load_keys(db)
+            async for line_no, record in records:
+                self.add(line_no, record)
+                if self._pending() >= self.batch_size:
+                    await self.flush(db)
+                    if self.report.batches % 20 == 0:
+                        elapsed = time.perf_counter() - started
+                        logger.info("Imported %d rows (%.0f rows/s)", self.report.rows, self.report.rows / elapsed)
+            await self.flush(db)
+
+            self.report.elapsed_seconds = time.perf_counter() - started
+            if self.report.rows:
+                await response_cache.invalidate(CATALOG_TAG)
+                # Songs written by COPY carry no ids back, so rebuild rather than index row by row
+                search_engine.rewarm()
+        return self.report
+
+
+# One import at a time per process; concurrent imports would race on the name maps
+import_lock = asyncio.Lock()
+
+
+async def import_catalog(chunks: AsyncIterator[bytes], fmt: str, batch_size: Optional[int] = None) -> IngestReport:
+    if fmt not in FORMATS:
+        raise IngestError(f"format must be one of {', '.join(FORMATS)}")
+    records = ndjson_records(chunks) if fmt == "ndjson" else csv_records(chunks)
+    importer = CatalogImporter(
+        batch_size=batch_size or settings.ingest_batch_size,
+        use_copy=settings.ingest_use_copy,
+    )
+    async with import_lock:
+        return await importer.run(records)
+
+
+async def read_file(path: str, chunk_size: int = 1 << 20) -> AsyncIterator[bytes]:
+    with open(path, "rb") as handle:
+        while True:
+            chunk = await asyncio.to_thread(handle.read, chunk_size)
+            if not chunk:
+                return
+            yield chunk
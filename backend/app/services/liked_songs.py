@@ -0,0 +1,118 @@
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+from sqlalchemy import select
+from app.config import settings
+from app.database import async_session_maker
+from app.models.library import LikedSong
+
+
+class LikedSet:
+    """A user's liked song ids as a sorted int array; 4 bytes per like."""
+
+    __slots__ = ("ids",)
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self.ids = array("i", sorted(ids))
+
+    def __contains__(self, song_id: int) -> bool:
+        index = bisect_left(self.ids, song_id)
+        return index < len(self.ids) and self.ids[index] == song_id
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, song_id: int) -> None:
+        if song_id not in self:
+            insort(self.ids, song_id)
+
+    def discard(self, song_id: int) -> None:
+        index = bisect_left(self.ids, song_id)
+        if index < len(self.ids) and self.ids[index] == song_id:
+            del self.ids[index]
+
+    def subset(self, song_ids: Iterable[int]) -> List[int]:
+        return [song_id for song_id in song_ids if song_id in self]
+
+
+class LikedSongCache:
+    """Size-bounded LRU of per-user liked sets, with a per-entry TTL.
+
+    Like and unlike update the cached set in place. The TTL bounds how long
+    another worker's writes can go unseen, so it is kept to seconds. Misses
+    always load from the primary, never a replica that may lag behind.
+    """
+
+    def __init__(self, max_users: int, ttl: float):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, tuple[float, LikedSet]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _cached(self, user_id: int) -> Optional[LikedSet]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return entry[1]
+
+    async def get(self, user_id: int) -> LikedSet:
+        liked = self._cached(user_id)
+        if liked is not None:
+            self.hits += 1
+            return liked
+        self.misses += 1
+        async with async_session_maker() as db:
+            result = await db.execute(select(LikedSong.song_id).where(LikedSong.user_id == user_id))
+            liked = LikedSet(result.scalars())
+        if self.max_users > 0:
+            self._entries[user_id] = (time.monotonic() + self.ttl, liked)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return liked
+
+    def add(self, user_id: int, song_id: int) -> None:
+        liked = self._cached(user_id)
+        if liked is not None:
+            liked.add(song_id)
+
+    def discard(self, user_id: int, song_id: int) -> None:
+        liked = self._cached(user_id)
+        if liked is not None:
+            liked.discard(song_id)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    async def mark(self, user_id: int, songs: List[dict]) -> List[dict]:
+        """Set ``is_liked`` on serialized songs; no query once the user's set is cached."""
+        liked = await self.get(user_id)
+        for song in songs:
+            song["is_liked"] = song["id"] in liked
+        return songs
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "users": len(self._entries),
+            "max_users": self.max_users,
+            "ttl_seconds": self.ttl,
+            "song_ids": sum(len(entry[1]) for entry in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+liked_cache = LikedSongCache(
+    max_users=settings.liked_cache_max_users,
+    ttl=settings.liked_cache_ttl_seconds,
+)
@@ -0,0 +1,400 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import func, select, update, insert, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import async_session_maker
+from app.models.artist import Artist
+from app.models.song import Song
+from app.models.library import RecentlyPlayed
+from app.models.listeners import ArtistDailyListeners, RollupWatermark
+from app.services.hyperloglog import HyperLogLog
+from app.services.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = "artist_monthly_listeners"
+
+# Keeps IN lists and the sketches held in memory at once bounded
+ARTIST_CHUNK = 500
+
+
+def _utc_day(value: datetime) -> date:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands timestamps back without a timezone
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _chunks(items: List[int], size: int) -> Iterable[List[int]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class ListenerRollup:
+    """Keeps ``Artist.monthly_listeners`` in step with play history.
+
+    New ``recently_played`` rows past a watermark are folded into one
+    HyperLogLog sketch per artist and UTC day. Monthly listeners are the
+    estimate of the union of an artist's sketches inside the window, so each
+    run only reads new plays plus the sketches of artists it touched, and
+    buckets that age out are dropped once a day. A new watermark starts at
+    the first play inside the window rather than at the start of the log.
+
+    Play buffers flush in their own transactions, so a lower id can commit
+    after the watermark has passed it. Each run therefore also re-reads the
+    plays behind the watermark since the previous run started, less
+    ``grace`` seconds for flush delay and clock skew; adding a user to a
+    sketch twice changes nothing. The play log is kept far longer than that
+    window, so late rows are folded before they are pruned.
+
+    Sketches stored at another precision are brought to the configured one:
+    finer ones are reduced losslessly, coarser ones rebuilt from the play log.
+    """
+
+    def __init__(self, interval: float, window_days: int, batch_rows: int, precision: int, grace: float):
+        self.interval = interval
+        self.window_days = window_days
+        self.batch_rows = batch_rows
+        self.precision = precision
+        self.grace = grace
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._resized = False
+        self.runs = 0
+        self.failed_runs = 0
+        self.rows_folded = 0
+        self.rows_rescanned = 0
+        self.sketches_resized = 0
+        self.artists_updated = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_run_ms = 0.0
+        self.last_rows = 0
+        self.last_artists = 0
+        self.watermark = 0
+
+    async def _watermark(self, db: AsyncSession) -> RollupWatermark:
+        # Row lock so concurrent workers take turns instead of folding the same batch
+        result = await db.execute(
+            select(RollupWatermark)
+            .where(RollupWatermark.name == WATERMARK_NAME)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        watermark = result.scalar_one_or_none()
+        if watermark is None:
+            watermark = RollupWatermark(name=WATERMARK_NAME, last_id=0)
+            db.add(watermark)
+            await db.flush()
+        return watermark
+
+    async def _seed(self, db: AsyncSession, watermark: RollupWatermark, first_day: date) -> None:
+        """Start a fresh watermark at the window instead of the beginning of the play log."""
+        first = datetime.combine(first_day, datetime.min.time(), tzinfo=timezone.utc)
+        oldest = await db.scalar(select(func.min(RecentlyPlayed.id)).where(RecentlyPlayed.played_at >= first))
+        if oldest is None:
+            oldest = (await db.scalar(select(func.max(RecentlyPlayed.id))) or 0) + 1
+        watermark.last_id = oldest - 1
+
+    async def _rebuild(self, db: AsyncSession, keys: Set[Tuple[int, date]]) -> Dict[Tuple[int, date], HyperLogLog]:
+        """Sketches for these buckets built afresh from the play log."""
+        sketches = {key: HyperLogLog(self.precision) for key in keys}
+        first = datetime.combine(min(day for _, day in keys), datetime.min.time(), tzinfo=timezone.utc)
+        for chunk in _chunks(sorted({artist_id for artist_id, _ in keys}), ARTIST_CHUNK):
+            result = await db.execute(
+                select(RecentlyPlayed.user_id, RecentlyPlayed.played_at, Song.artist_id)
+                .join(Song, Song.id == RecentlyPlayed.song_id)
+                .where(Song.artist_id.in_(chunk), RecentlyPlayed.played_at >= first)
+            )
+            for row in result:
+                sketch = sketches.get((row.artist_id, _utc_day(row.played_at)))
+                if sketch is not None:
+                    sketch.add(row.user_id)
+        return sketches
+
+    async def _resize(self, db: AsyncSession) -> int:
+        """Bring every stored sketch to the configured precision."""
+        await self._watermark(db)
+        result = await db.execute(
+            select(ArtistDailyListeners.artist_id, ArtistDailyListeners.day, ArtistDailyListeners.sketch)
+            .where(func.length(ArtistDailyListeners.sketch) != 1 + (1 << self.precision))
+        )
+        updates, coarse = [], set()
+        for artist_id, day, raw in result:
+            sketch = HyperLogLog.from_bytes(raw)
+            if sketch.precision > self.precision:
+                updates.append({"artist_id": artist_id, "day": day, "sketch": sketch.reduce(self.precision).to_bytes()})
+            else:
+                coarse.add((artist_id, day))
+        if coarse:
+            rebuilt = await self._rebuild(db, coarse)
+            updates.extend(
+                {"artist_id": artist_id, "day": day, "sketch": sketch.to_bytes()}
+                for (artist_id, day), sketch in rebuilt.items()
+            )
+        if updates:
+            await db.execute(update(ArtistDailyListeners), updates)
+        return len(updates)
+
+    async def _fold(self, db: AsyncSession, buckets: Dict[Tuple[int, date], Set[int]]) -> Set[int]:
+        """Add the buckets' users to their sketches; returns the artists whose sketches changed."""
+        artist_ids = {artist_id for artist_id, _ in buckets}
+        days = {day for _, day in buckets}
+        result = await db.execute(
+            select(ArtistDailyListeners)
+            .where(ArtistDailyListeners.artist_id.in_(artist_ids), ArtistDailyListeners.day.in_(days))
+        )
+        existing = {(row.artist_id, row.day): row.sketch for row in result.scalars()}
+
+        # A worker still on an older precision can have written these since startup
+        sketches: Dict[Tuple[int, date], HyperLogLog] = {}
+        coarse = set()
+        for key in buckets:
+            raw = existing.get(key)
+            if raw is None:
+                sketches[key] = HyperLogLog(self.precision)
+                continue
+            sketch = HyperLogLog.from_bytes(raw)
+            if sketch.precision > self.precision:
+                sketches[key] = sketch.reduce(self.precision)
+            elif sketch.precision < self.precision:
+                coarse.add(key)
+            else:
+                sketches[key] = sketch
+        if coarse:
+            sketches.update(await self._rebuild(db, coarse))
+
+        inserts, updates, changed = [], [], set()
+        for key, user_ids in buckets.items():
+            sketch = sketches[key]
+            sketch.update(user_ids)
+            raw = sketch.to_bytes()
+            if raw == existing.get(key):
+                continue
+            row = {"artist_id": key[0], "day": key[1], "sketch": raw}
+            (updates if key in existing else inserts).append(row)
+            changed.add(key[0])
+        if inserts:
+            await db.execute(insert(ArtistDailyListeners), inserts)
+        if updates:
+            await db.execute(update(ArtistDailyListeners), updates)
+        return changed
+
+    def _bucket(self, rows, first_day: date) -> Dict[Tuple[int, date], Set[int]]:
+        buckets: Dict[Tuple[int, date], Set[int]] = defaultdict(set)
+        for row in rows:
+            day = _utc_day(row.played_at)
+            if day >= first_day:
+                buckets[(row.artist_id, day)].add(row.user_id)
+        return buckets
+
+    async def _rescan(self, db: AsyncSession, since: datetime, first_day: date) -> Tuple[int, Set[int]]:
+        """Fold plays behind the watermark that committed after an earlier run read past them."""
+        rows_read, touched, cursor = 0, set(), 0
+        while True:
+            watermark = await self._watermark(db)
+            result = await db.execute(
+                select(RecentlyPlayed.id, RecentlyPlayed.user_id, RecentlyPlayed.played_at, Song.artist_id)
+                .join(Song, Song.id == RecentlyPlayed.song_id)
+                .where(
+                    RecentlyPlayed.played_at >= since,
+                    RecentlyPlayed.id > cursor,
+                    RecentlyPlayed.id <= watermark.last_id,
+                )
+                .order_by(RecentlyPlayed.id)
+                .limit(self.batch_rows)
+            )
+            rows = result.all()
+            if not rows:
+                await db.commit()
+                return rows_read, touched
+            buckets = self._bucket(rows, first_day)
+            if buckets:
+                touched.update(await self._fold(db, buckets))
+            await db.commit()
+            rows_read += len(rows)
+            cursor = rows[-1].id
+            if len(rows) < self.batch_rows:
+                return rows_read, touched
+
+    async def _estimate(self, db: AsyncSession, artist_ids: Iterable[int], first_day: date) -> Dict[int, int]:
+        counts = {}
+        for chunk in _chunks(sorted(artist_ids), ARTIST_CHUNK):
+            merged: Dict[int, HyperLogLog] = {}
+            result = await db.execute(
+                select(ArtistDailyListeners.artist_id, ArtistDailyListeners.sketch)
+                .where(ArtistDailyListeners.artist_id.in_(chunk), ArtistDailyListeners.day >= first_day)
+            )
+            for artist_id, raw in result:
+                sketch = HyperLogLog.from_bytes(raw)
+                current = merged.get(artist_id)
+                if current is None:
+                    merged[artist_id] = sketch
+                    continue
+                # Mixed precisions only meet while a precision change rolls out
+                if sketch.precision < current.precision:
+                    current = merged[artist_id] = current.reduce(sketch.precision)
+                elif sketch.precision > current.precision:
+                    sketch = sketch.reduce(current.precision)
+                current.merge(sketch)
+            for artist_id in chunk:
+                counts[artist_id] = merged[artist_id].count() if artist_id in merged else 0
+        return counts
+
+    async def _write_back(self, db: AsyncSession, counts: Dict[int, int]) -> List[int]:
+        changed = []
+        for chunk in _chunks(sorted(counts), ARTIST_CHUNK):
+            result = await db.execute(select(Artist.id, Artist.monthly_listeners).where(Artist.id.in_(chunk)))
+            changed.extend(artist_id for artist_id, current in result if current != counts[artist_id])
+        if changed:
+            await db.execute(
+                update(Artist),
+                [{"id": artist_id, "monthly_listeners": counts[artist_id]} for artist_id in changed],
+            )
+        return changed
+
+    async def run(self) -> dict:
+        async with self._lock:
+            started = time.perf_counter()
+            started_at = datetime.now(timezone.utc)
+            today = started_at.date()
+            first_day = today - timedelta(days=self.window_days - 1)
+            touched: Set[int] = set()
+            rows_read = 0
+            resized = 0
+            try:
+                async with async_session_maker() as db:
+                    if not self._resized:
+                        # Precision only changes with configuration, so once per process
+                        resized = await self._resize(db)
+                        await db.commit()
+                        self._resized = True
+
+                    watermark = await self._watermark(db)
+                    if not watermark.last_id:
+                        await self._seed(db, watermark, first_day)
+                    rescan_from = _utc(watermark.rescanned_at) if watermark.rescanned_at else started_at - timedelta(seconds=self.interval)
+                    rescanned, late = await self._rescan(db, rescan_from - timedelta(seconds=self.grace), first_day)
+                    touched.update(late)
+
+                    while True:
+                        watermark = await self._watermark(db)
+                        result = await db.execute(
+                            select(RecentlyPlayed.id, RecentlyPlayed.user_id, RecentlyPlayed.played_at, Song.artist_id)
+                            .join(Song, Song.id == RecentlyPlayed.song_id)
+                            .where(RecentlyPlayed.id > watermark.last_id)
+                            .order_by(RecentlyPlayed.id)
+                            .limit(self.batch_rows)
+                        )
+                        rows = result.all()
+                        if not rows:
+                            break
+
+                        buckets = self._bucket(rows, first_day)
+                        if buckets:
+                            touched.update(await self._fold(db, buckets))
+
+                        # Sketches and watermark move together, so a crash never double counts
+                        watermark.last_id = rows[-1].id
+                        await db.commit()
+                        rows_read += len(rows)
+                        if len(rows) < self.batch_rows:
+                            break
+
+                    watermark = await self._watermark(db)
+                    expire = watermark.last_full_day != today
+                    if expire:
+                        # Artists losing a bucket to the sliding window need a fresh estimate too
+                        result = await db.execute(
+                            select(ArtistDailyListeners.artist_id)
+                            .where(ArtistDailyListeners.day < first_day)
+                            .distinct()
+                        )
+                        touched.update(result.scalars())
+                        await db.execute(delete(ArtistDailyListeners).where(ArtistDailyListeners.day < first_day))
+                        watermark.last_full_day = today
+                    # Plays from before this run started are behind the watermark now
+                    if watermark.rescanned_at is None or _utc(watermark.rescanned_at) < started_at:
+                        watermark.rescanned_at = started_at
+
+                    counts = await self._estimate(db, touched, first_day)
+                    changed = await self._write_back(db, counts)
+                    self.watermark = watermark.last_id
+                    await db.commit()
+            except Exception:
+                self.failed_runs += 1
+                raise
+
+            if changed:
+                await response_cache.invalidate(*(f"artist:{artist_id}" for artist_id in changed))
+
+            self.runs += 1
+            self.rows_folded += rows_read
+            self.rows_rescanned += rescanned
+            self.sketches_resized += resized
+            self.artists_updated += len(changed)
+            self.last_run_at = datetime.now(timezone.utc)
+            self.last_run_ms = (time.perf_counter() - started) * 1000
+            self.last_rows = rows_read
+            self.last_artists = len(changed)
+            return {"rows": rows_read, "rescanned": rescanned, "artists_updated": len(changed), "expired": expire}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run()
+            except Exception:
+                logger.exception("Failed to roll up monthly listeners")
+            await asyncio.sleep(self.interval)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "window_days": self.window_days,
+            "sketch_precision": self.precision,
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "watermark": self.watermark,
+            "rows_folded": self.rows_folded,
+            "rows_rescanned": self.rows_rescanned,
+            "sketches_resized": self.sketches_resized,
+            "artists_updated": self.artists_updated,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_run_ms": round(self.last_run_ms, 3),
+            "last_rows": self.last_rows,
+            "last_artists_updated": self.last_artists,
+        }
+
+
+listener_rollup = ListenerRollup(
+    interval=settings.listener_rollup_interval_seconds,
+    window_days=settings.listener_rollup_window_days,
+    batch_rows=settings.listener_rollup_batch_rows,
+    precision=settings.listener_sketch_precision,
+    grace=settings.listener_rollup_grace_seconds,
+)
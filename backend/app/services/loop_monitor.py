@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from typing import List, Optional
+from app.config import settings
+from app.metrics import BACKGROUND_ROUTE, Histogram, MetricCounter, MetricsMiddleware, route_label
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_MIDDLEWARE_CODE = MetricsMiddleware.__call__.__code__
+
+
+def _route_for(frame) -> str:
+    """The route whose request is on the stack, found through the metrics middleware's frame."""
+    while frame is not None:
+        if frame.f_code is _MIDDLEWARE_CODE:
+            scope = frame.f_locals.get("scope")
+            if scope is not None:
+                return route_label(scope)
+        frame = frame.f_back
+    return BACKGROUND_ROUTE
+
+
+class LoopMonitor:
+    """Measures event-loop lag and, optionally, catches the code that blocks the loop.
+
+    A task sleeps ``tick`` seconds at a time; how late it wakes up is the lag,
+    recorded in a histogram and read by the readiness check. With blocking
+    detection on, a watchdog thread checks the task's heartbeat every half
+    threshold. Once the loop has been stuck for longer than the threshold it
+    grabs the loop thread's stack with ``sys._current_frames``, works out the
+    route from the request on that stack, and logs and samples it, once per
+    stall. The stack shows what is blocking, not just that something did.
+    """
+
+    def __init__(self, tick: float, detect_blocking: bool, block_threshold: float, stack_depth: int, max_samples: int):
+        self.tick = tick
+        self.detect_blocking = detect_blocking
+        self.block_threshold = block_threshold
+        self.stack_depth = stack_depth
+        self.lag = Histogram("event_loop_lag_seconds", "How late the event loop ran a timer.", (), LAG_BUCKETS)
+        self.blocked_total = MetricCounter(
+            "event_loop_blocked_total", "Stalls longer than the blocking threshold, by route.", ("route",),
+        )
+        self.samples: deque = deque(maxlen=max_samples)
+        self.lag_ms = 0.0
+        self._max_lag_ms = 0.0
+        self._heartbeat = time.perf_counter()
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop_thread_id: Optional[int] = None
+        self._stopping = threading.Event()
+        # The watchdog thread writes samples and counters while the loop renders them
+        self._lock = threading.Lock()
+
+    def take_max_lag_ms(self) -> float:
+        """Worst lag since the previous call."""
+        max_lag_ms, self._max_lag_ms = self._max_lag_ms, self.lag_ms
+        return max_lag_ms
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.tick)
+            now = time.perf_counter()
+            self._heartbeat = now
+            lag = max(now - started - self.tick, 0.0)
+            self.lag.observe((), lag)
+            self.lag_ms = lag * 1000
+            self._max_lag_ms = max(self._max_lag_ms, self.lag_ms)
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stopping.wait(self.block_threshold / 2):
+            heartbeat = self._heartbeat
+            blocked = time.perf_counter() - heartbeat - self.tick
+            if blocked < self.block_threshold or heartbeat == reported:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            reported = heartbeat
+            self._record_block(frame, blocked)
+
+    def _record_block(self, frame, blocked: float) -> None:
+        route = _route_for(frame)
+        stack = [line.rstrip() for line in traceback.format_stack(frame, limit=self.stack_depth)]
+        with self._lock:
+            self.blocked_total.inc((route,))
+            self.samples.append({
+                "route": route,
+                "blocked_ms": round(blocked * 1000, 1),
+                "stack": stack,
+                "at": datetime.now(timezone.utc).isoformat(),
+            })
+        logger.warning("Event loop blocked for %.0f ms+ on %s:\n%s", blocked * 1000, route, "\n".join(stack))
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._heartbeat = time.perf_counter()
+        self._task = asyncio.create_task(self._run())
+        if self.detect_blocking:
+            self._loop_thread_id = threading.get_ident()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._thread.start()
+
+    async def stop(self) -> None:
+        if self._thread is not None:
+            self._stopping.set()
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def render(self) -> str:
+        with self._lock:
+            lines: List[str] = [*self.lag.render(), *self.blocked_total.render()]
+        return "\n".join(lines) + "\n"
+
+    def stats(self) -> dict:
+        with self._lock:
+            samples = list(self.samples)
+        return {
+            "tick_seconds": self.tick,
+            "lag_ms": round(self.lag_ms, 3),
+            "blocking_detection": self.detect_blocking,
+            "block_threshold_ms": self.block_threshold * 1000,
+            "stalls": len(samples),
+            "samples": samples,
+        }
+
+
+loop_monitor = LoopMonitor(
+    tick=settings.loop_lag_tick_seconds,
+    detect_blocking=settings.loop_block_detection,
+    block_threshold=settings.loop_block_threshold_ms / 1000,
+    stack_depth=settings.loop_block_stack_depth,
+    max_samples=settings.loop_block_max_samples,
+)
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Iterable, List, Optional
+from sqlalchemy import exc, update, insert, case
+from app.config import settings
+from app.database import async_session_maker
+from app.models.song import Song
+from app.models.library import RecentlyPlayed
+from app.services.history import record_history
+
+logger = logging.getLogger(__name__)
+
+# The database being unreachable says nothing about the batch, so these never quarantine it
+UNAVAILABLE_ERRORS = (exc.OperationalError, exc.InterfaceError, exc.TimeoutError, OSError, asyncio.TimeoutError)
+
+
+class PlayBuffer:
+    """Write-behind buffer that merges play events and flushes them in batches.
+
+    A failed flush puts its events back for the next one. While the database
+    stays unreachable the buffer holds at most ``max_buffered`` events and
+    drops the oldest past that. A batch the database rejects ``max_retries``
+    times in a row is quarantined (logged, counted and set aside) so that one
+    bad event, such as a play of a since-deleted song, cannot stall every
+    later flush.
+    """
+
+    def __init__(self, flush_interval: float, max_events: int, max_buffered: int, max_retries: int):
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+        self.max_buffered = max_buffered
+        self.max_retries = max_retries
+        self._counts: Dict[int, int] = defaultdict(int)
+        self._events: Deque[dict] = deque()
+        self._flush_requested = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # Consecutive failed flushes of the events at the head of the buffer
+        self._attempts = 0
+        # The most recent quarantined events, for inspection
+        self.quarantined: Deque[dict] = deque(maxlen=max_buffered)
+        self.flushes = 0
+        self.flushed_events = 0
+        self.failed_flushes = 0
+        self.dropped_events = 0
+        self.quarantined_events = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    def record(self, user_id: int, song_id: int) -> None:
+        self._counts[song_id] += 1
+        self._events.append({
+            "user_id": user_id,
+            "song_id": song_id,
+            "played_at": datetime.now(timezone.utc),
+        })
+        self._trim()
+        if len(self._events) >= self.max_events:
+            self._flush_requested.set()
+
+    def _uncount(self, events: Iterable[dict]) -> None:
+        for event in events:
+            song_id = event["song_id"]
+            self._counts[song_id] -= 1
+            if self._counts[song_id] <= 0:
+                del self._counts[song_id]
+
+    def _trim(self) -> None:
+        overflow = len(self._events) - self.max_buffered
+        if overflow > 0:
+            self._uncount(self._events.popleft() for _ in range(overflow))
+            self.dropped_events += overflow
+
+    def pending(self, song_id: int) -> int:
+        return self._counts.get(song_id, 0)
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._events:
+                return 0
+
+            # Swap buffers so new plays keep accumulating while we write
+            counts, self._counts = self._counts, defaultdict(int)
+            events, self._events = self._events, deque()
+
+            started = time.perf_counter()
+            try:
+                async with async_session_maker() as db:
+                    await db.execute(
+                        update(Song)
+                        .where(Song.id.in_(list(counts)))
+                        .values(plays=Song.plays + case(counts, value=Song.id, else_=0))
+                        .execution_options(synchronize_session=False)
+                    )
+                    await db.execute(insert(RecentlyPlayed), list(events))
+                    await record_history(db, events)
+                    await db.commit()
+            except Exception as error:
+                self.failed_flushes += 1
+                if not isinstance(error, UNAVAILABLE_ERRORS):
+                    self._attempts += 1
+                if self._attempts >= self.max_retries:
+                    self._attempts = 0
+                    self.quarantined.extend(events)
+                    self.quarantined_events += len(events)
+                    logger.error("Quarantined %d play events after %d failed flushes", len(events), self.max_retries)
+                    raise
+                # Put the events back so the next flush retries them
+                for song_id, n in counts.items():
+                    self._counts[song_id] += n
+                self._events.extendleft(reversed(events))
+                self._trim()
+                raise
+
+            self._attempts = 0
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.flushes += 1
+            self.flushed_events += len(events)
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            return len(events)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush play events")
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Drain whatever is still buffered
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Failed to drain play events on shutdown")
+
+    def stats(self) -> dict:
+        return {
+            "buffered_events": len(self._events),
+            "buffered_songs": len(self._counts),
+            "flushes": self.flushes,
+            "flushed_events": self.flushed_events,
+            "failed_flushes": self.failed_flushes,
+            "dropped_events": self.dropped_events,
+            "quarantined_events": self.quarantined_events,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+        }
+
+
+play_buffer = PlayBuffer(
+    flush_interval=settings.play_flush_interval_seconds,
+    max_events=settings.play_flush_max_events,
+    max_buffered=settings.play_buffer_max_events,
+    max_retries=settings.play_flush_max_retries,
+)
@@ -0,0 +1,333 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+from fastapi import Request, Response
+from app.config import settings
+from app.conditional import make_etag, is_not_modified, not_modified
+
+CACHE_STATUS_HEADER = "X-Cache"
+
+# Every entry carries this tag so bulk catalog changes (e.g. seeding) can drop everything
+CATALOG_TAG = "catalog"
+
+# How long an invalidation keeps fencing builds that started before it
+FENCE_SECONDS = 3600
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    tags: Iterable[str] = ()
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def dump(self) -> bytes:
+        return json.dumps(self.headers).encode() + b"\n" + self.body
+
+    @classmethod
+    def load(cls, raw: bytes) -> "CachedResponse":
+        headers, _, body = raw.partition(b"\n")
+        return cls(body=body, headers=json.loads(headers))
+
+    def to_response(self, status: str, request: Optional[Request] = None, cache_control: Optional[str] = None) -> Response:
+        headers = {**self.headers, CACHE_STATUS_HEADER: status}
+        if cache_control:
+            headers["Cache-Control"] = cache_control
+        if request is not None and is_not_modified(request, self.headers.get("ETag")):
+            return not_modified(headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+class MemoryCacheBackend:
+    """LRU of serialized responses with a tag -> keys index for invalidation.
+
+    Entries and invalidations are local to the worker: a write handled by
+    another worker does not reach this cache, which then serves the old body
+    until the TTL. Run with the Redis backend when there is more than one worker.
+
+    Every invalidation bumps a generation and stamps it on the tags it
+    dropped. A build stores its result only if none of its tags were stamped
+    after the build started, so a slow build cannot put back what an
+    invalidation removed while it ran.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, bytes, tuple]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._generation = 0
+        self._tag_generations: "OrderedDict[str, int]" = OrderedDict()
+        # Builds older than a forgotten stamp cannot be checked, so they are not stored
+        self._fence_floor = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def generation(self) -> int:
+        return self._generation
+
+    async def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str], since: int) -> bool:
+        tags = tuple(tags)
+        if since < self._fence_floor or any(self._tag_generations.get(tag, 0) > since for tag in tags):
+            return False
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + ttl, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+        return True
+
+    def _stamp(self, tags: Iterable[str]) -> None:
+        self._generation += 1
+        for tag in tags:
+            self._tag_generations[tag] = self._generation
+            self._tag_generations.move_to_end(tag)
+        while len(self._tag_generations) > self.max_entries * 4:
+            _, generation = self._tag_generations.popitem(last=False)
+            self._fence_floor = max(self._fence_floor, generation)
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        tags = tuple(tags)
+        self._stamp(tags)
+        keys = set()
+        for tag in tags:
+            keys |= self._tags.pop(tag, set())
+        for key in keys:
+            self._drop(key)
+        return len(keys)
+
+    async def clear(self) -> None:
+        self._stamp((CATALOG_TAG,))
+        self._entries.clear()
+        self._tags.clear()
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Stores an entry and its tag memberships unless one of its tags was
+# invalidated after the build started; runs atomically on the server.
+# ARGV: prefix, value, ttl, since, key, tags...
+_STORE_IF_FRESH = """
+local prefix, value, ttl, since, key = ARGV[1], ARGV[2], tonumber(ARGV[3]), tonumber(ARGV[4]), ARGV[5]
+for i = 6, #ARGV do
+    local stamp = redis.call('GET', prefix .. 'gen:' .. ARGV[i])
+    if stamp and tonumber(stamp) > since then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], value, 'EX', ttl)
+for i = 6, #ARGV do
+    local tag_key = prefix .. 'tag:' .. ARGV[i]
+    redis.call('SADD', tag_key, key)
+    redis.call('EXPIRE', tag_key, ttl * 2)
+end
+return 1
+"""
+
+
+class RedisCacheBackend:
+    """Shares cached responses and invalidations between workers; tags are Redis sets of cache keys.
+
+    Generations work as in MemoryCacheBackend, kept in Redis so an
+    invalidation on one worker also fences builds running on the others.
+    """
+
+    def __init__(self, url: str, prefix: str = "music247:cache:"):
+        try:
+            from redis import asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the 'redis' package") from exc
+        self._redis = redis.from_url(url)
+        self.prefix = prefix
+        self._store_if_fresh = self._redis.register_script(_STORE_IF_FRESH)
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.prefix}entry:{key}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(self._entry_key(key))
+
+    async def generation(self) -> int:
+        return int(await self._redis.get(self.prefix + "generation") or 0)
+
+    async def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str], since: int) -> bool:
+        stored = await self._store_if_fresh(
+            keys=[self._entry_key(key)],
+            args=[self.prefix, value, max(int(ttl), 1), since, key, *tags],
+        )
+        return bool(stored)
+
+    async def _stamp(self, tags: Iterable[str]) -> None:
+        generation = await self._redis.incr(self.prefix + "generation")
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.set(f"{self.prefix}gen:{tag}", generation, ex=FENCE_SECONDS)
+            await pipe.execute()
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        tags = tuple(tags)
+        await self._stamp(tags)
+        tag_keys = [f"{self.prefix}tag:{tag}" for tag in tags]
+        keys = set()
+        for tag_key in tag_keys:
+            keys |= {member.decode() if isinstance(member, bytes) else member for member in await self._redis.smembers(tag_key)}
+        if keys or tag_keys:
+            await self._redis.delete(*[self._entry_key(key) for key in keys], *tag_keys)
+        return len(keys)
+
+    async def clear(self) -> None:
+        await self._stamp((CATALOG_TAG,))
+        # Entries and tag sets go; generation stamps stay to keep fencing running builds
+        for pattern in ("entry:*", "tag:*"):
+            async for key in self._redis.scan_iter(match=self.prefix + pattern):
+                await self._redis.delete(key)
+
+
+class ResponseCache:
+    """Caches serialized JSON responses per route and params, invalidated by tag."""
+
+    def __init__(self, backend, ttl: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.fenced = 0
+        self.invalidations = 0
+
+    async def respond(
+        self,
+        key: str,
+        build: Callable[[], Awaitable[CachedResponse]],
+        request: Optional[Request] = None,
+        cache_control: Optional[str] = None,
+    ) -> Response:
+        """Serve ``key`` from the cache, building it on a miss.
+
+        With ``request`` given, a matching If-None-Match is answered with 304 straight
+        from the cached ETag, without touching the database.
+        """
+        if not self.enabled:
+            entry = await build()
+            entry.headers.setdefault("ETag", make_etag(entry.body))
+            return entry.to_response("BYPASS", request, cache_control)
+
+        while True:
+            raw = await self.backend.get(key)
+            if raw is not None:
+                self.hits += 1
+                return CachedResponse.load(raw).to_response("HIT", request, cache_control)
+
+            # Single flight: concurrent misses for the same key wait for one build
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            self.coalesced += 1
+            try:
+                entry = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The leader was cancelled (e.g. its client went away); one waiter takes over
+                continue
+            return entry.to_response("HIT", request, cache_control)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            since = await self.backend.generation()
+            entry = await build()
+            entry.headers.setdefault("ETag", make_etag(entry.body))
+            if not await self.backend.set(key, entry.dump(), self.ttl, (*entry.tags, CATALOG_TAG), since):
+                # Invalidated while building: serve this body once, but do not keep it
+                self.fenced += 1
+            future.set_result(entry)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Nobody may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        return entry.to_response("MISS", request, cache_control)
+
+    async def invalidate(self, *tags: str) -> int:
+        self.invalidations += 1
+        return await self.backend.invalidate_tags(tags)
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        stats = {
+            "backend": type(self.backend).__name__,
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            "fenced": self.fenced,
+            "invalidations": self.invalidations,
+        }
+        # Only the local backend can count its entries cheaply
+        if isinstance(self.backend, MemoryCacheBackend):
+            stats["entries"] = len(self.backend)
+        return stats
+
+
+def entity_tags(songs: List = (), albums: List = (), artists: List = ()) -> List[str]:
+    """Tags for every catalog entity that appears in a response."""
+    tags = set()
+    for song in songs:
+        tags.add(f"song:{song.id}")
+        tags.add(f"artist:{song.artist_id}")
+        if song.album_id:
+            tags.add(f"album:{song.album_id}")
+    for album in albums:
+        tags.add(f"album:{album.id}")
+        tags.add(f"artist:{album.artist_id}")
+    for artist in artists:
+        tags.add(f"artist:{artist.id}")
+    return sorted(tags)
+
+
+def _build_backend():
+    if settings.response_cache_backend == "redis":
+        return RedisCacheBackend(settings.response_cache_url)
+    return MemoryCacheBackend(settings.response_cache_max_entries)
+
+
+response_cache = ResponseCache(
+    _build_backend(),
+    ttl=settings.response_cache_ttl_seconds,
+    enabled=settings.response_cache_backend != "none",
+)
@@ -0,0 +1,393 @@
+import asyncio
+import heapq
+import logging
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set
+from sqlalchemy import select, func, case, or_, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import async_session_maker, engine
+from app.models.song import Song
+from app.models.album import Album
+from app.models.artist import Artist
+
+logger = logging.getLogger(__name__)
+
+SEARCH_KINDS = ("song", "album", "artist")
+
+_KIND_CODES = {"song": 0, "album": 1, "artist": 2}
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Cap how many vocabulary terms a single prefix or fuzzy query token may expand to
+_MAX_EXPANSIONS = 256
+
+# Multi-word queries verify at most this many candidates from their most selective word
+_MAX_CANDIDATES = 20000
+
+
+class SearchHit(NamedTuple):
+    kind: str
+    id: int
+    title: str
+    score: float
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def _trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _within_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """Levenshtein distance between a and b, or None if it exceeds max_distance.
+
+    Only the diagonal band of width 2 * max_distance + 1 is evaluated.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    big = max_distance + 1
+    previous = {j: j for j in range(min(len(b), max_distance) + 1)}
+    for i, ca in enumerate(a, 1):
+        low, high = max(0, i - max_distance), min(len(b), i + max_distance)
+        current = {}
+        row_min = big
+        for j in range(low, high + 1):
+            if j == 0:
+                value = i
+            else:
+                value = min(
+                    previous.get(j, big) + 1,
+                    current.get(j - 1, big) + 1,
+                    previous.get(j - 1, big) + (a[i - 1] != b[j - 1]),
+                )
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return None
+        previous = current
+    distance = previous.get(len(b), big)
+    return distance if distance <= max_distance else None
+
+
+def _max_edits(token: str) -> int:
+    if len(token) <= 3:
+        return 0
+    return 1 if len(token) <= 6 else 2
+
+
+class InMemorySearchIndex:
+    """Inverted index over catalog titles used when Postgres trigram search is unavailable.
+
+    Documents are keyed by ``id << 2 | kind`` so postings stay plain ints, with one
+    posting map per kind. Query tokens match vocabulary terms exactly, by prefix
+    (through a sorted vocabulary) or within a small edit distance (through a trigram
+    index of the vocabulary). Posting lists are kept ordered by each document's static
+    prior, so single-word queries only read the head of every matching list.
+    """
+
+    def __init__(self):
+        self._postings: Dict[int, Dict[str, List[int]]] = {code: defaultdict(list) for code in _KIND_CODES.values()}
+        self._docs: Dict[int, tuple] = {}
+        self._terms: Set[str] = set()
+        self._term_trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self._unsorted: Set[tuple] = set()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, kind: str, doc_id: int, text: str, popularity: int = 0) -> None:
+        code = _KIND_CODES[kind]
+        key = doc_id << 2 | code
+        if key in self._docs:
+            self.remove(kind, doc_id)
+        tokens = tuple(set(tokenize(text)))
+        # Ranking bonus for a one-word query: short titles and popular entries first
+        prior = 0.1 / max(len(tokens), 1) + 0.01 * math.log10((popularity or 0) + 1)
+        self._docs[key] = (text, tokens, popularity or 0, prior)
+        for token in tokens:
+            if token not in self._terms:
+                self._terms.add(token)
+                self._vocabulary_dirty = True
+                for gram in _trigrams(token):
+                    self._term_trigrams[gram].add(token)
+            self._postings[code][token].append(key)
+            self._unsorted.add((code, token))
+
+    def remove(self, kind: str, doc_id: int) -> None:
+        code = _KIND_CODES[kind]
+        key = doc_id << 2 | code
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        for token in doc[1]:
+            postings = self._postings[code].get(token)
+            if postings and key in postings:
+                postings.remove(key)
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def _sorted_vocabulary(self) -> List[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._terms)
+            self._vocabulary_dirty = False
+        return self._vocabulary
+
+    def optimize(self) -> None:
+        """Order every posting list by prior; called after bulk loads so queries don't pay for it."""
+        for code, term in self._unsorted:
+            self._postings[code][term].sort(key=lambda key: self._docs[key][3], reverse=True)
+        self._unsorted.clear()
+        self._sorted_vocabulary()
+
+    def _ranked_postings(self, code: int, term: str) -> List[int]:
+        postings = self._postings[code].get(term, [])
+        if (code, term) in self._unsorted:
+            postings.sort(key=lambda key: self._docs[key][3], reverse=True)
+            self._unsorted.discard((code, term))
+        return postings
+
+    def _expand(self, token: str) -> Dict[str, float]:
+        """Map vocabulary terms matching a query token to a match weight."""
+        matches: Dict[str, float] = {}
+        vocabulary = self._sorted_vocabulary()
+        start = bisect_left(vocabulary, token)
+        for term in vocabulary[start:start + _MAX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            # Shorter completions are closer to what was typed
+            matches[term] = 1.0 if term == token else 0.6 + 0.3 * len(token) / len(term)
+
+        max_edits = _max_edits(token)
+        if max_edits:
+            grams = _trigrams(token)
+            shared = Counter(chain.from_iterable(self._term_trigrams.get(gram, ()) for gram in grams))
+            # Each edit destroys at most three trigrams, so weaker overlaps can't be within reach
+            min_shared = len(grams) - 3 * max_edits
+            candidates = [
+                term for term, count in shared.most_common(_MAX_EXPANSIONS)
+                if count >= min_shared and term not in matches
+            ]
+            for term in candidates:
+                distance = _within_distance(token, term, max_edits)
+                if distance is not None:
+                    matches[term] = 0.5 - 0.1 * distance
+        return matches
+
+    def _match(self, expansion: Dict[str, float], codes: List[int], head: Optional[int] = None) -> Dict[int, float]:
+        """Best match weight per document for one expanded query token."""
+        scores: Dict[int, float] = {}
+        # Apply weakest matches first so dict.update leaves each doc with its best weight
+        for term, weight in sorted(expansion.items(), key=lambda item: item[1]):
+            for code in codes:
+                if head is None:
+                    postings = self._postings[code].get(term)
+                else:
+                    postings = self._ranked_postings(code, term)[:head]
+                if postings:
+                    scores.update(dict.fromkeys(postings, weight))
+        return scores
+
+    def search(self, query: str, kinds: Iterable[str] = SEARCH_KINDS, limit: int = 20) -> List[SearchHit]:
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens:
+            return []
+        codes = [_KIND_CODES[kind] for kind in kinds]
+        expansions = [self._expand(token) for token in query_tokens]
+
+        if len(expansions) == 1:
+            # Anything past the first `limit` postings of a term is outranked within that term
+            scores = self._match(expansions[0], codes, head=limit)
+        else:
+            # Start from the most selective word and check the others against each candidate
+            sizes = [
+                sum(len(self._postings[code].get(term, ())) for term in expansion for code in codes)
+                for expansion in expansions
+            ]
+            pivot = min(range(len(expansions)), key=sizes.__getitem__)
+            head = None
+            if sizes[pivot] > _MAX_CANDIDATES:
+                head = max(_MAX_CANDIDATES // max(len(expansions[pivot]), 1), limit)
+            scores = {}
+            others = [expansion for i, expansion in enumerate(expansions) if i != pivot]
+            for key, score in self._match(expansions[pivot], codes, head).items():
+                doc_tokens = self._docs[key][1]
+                for expansion in others:
+                    best = max([expansion.get(token, 0.0) for token in doc_tokens])
+                    if not best:
+                        break
+                    score += best
+                else:
+                    scores[key] = score
+
+        kinds_by_code = {code: kind for kind, code in _KIND_CODES.items()}
+        ranked = []
+        for key, score in scores.items():
+            text, doc_tokens, popularity, _ = self._docs[key]
+            score = score / len(query_tokens)
+            # Prefer titles the query covers more of, then more popular entries
+            score += 0.1 * len(query_tokens) / max(len(doc_tokens), 1)
+            score += 0.01 * math.log10(popularity + 1)
+            ranked.append((score, key, text))
+
+        return [
+            SearchHit(kinds_by_code[key & 3], key >> 2, text, round(score, 4))
+            for score, key, text in heapq.nlargest(limit, ranked)
+        ]
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+_TARGETS = {
+    "song": (Song, Song.title, Song.plays),
+    "album": (Album, Album.title, literal(0)),
+    "artist": (Artist, Artist.name, Artist.monthly_listeners),
+}
+
+
+class SearchEngine:
+    """Ranked catalog search backed by pg_trgm on Postgres and an in-process index elsewhere.
+
+    The in-process index is built in the background after startup; until it
+    is ready, searches run as ILIKE queries against the database.
+    """
+
+    def __init__(self, backend: str):
+        if backend == "auto":
+            backend = "postgres" if engine.dialect.name == "postgresql" else "memory"
+        self.backend = backend
+        self.index = InMemorySearchIndex()
+        self.ready = False
+        # Index being rebuilt; single-row adds go to it as well so the swap loses none
+        self._building: Optional[InMemorySearchIndex] = None
+        self._rebuild: Optional[asyncio.Task] = None
+        self._rebuild_again = False
+
+    async def warm(self, db: AsyncSession) -> None:
+        if self.backend != "memory":
+            self.ready = True
+            return
+        # Built aside and swapped in, so searches keep answering from the old index
+        index = self._building = InMemorySearchIndex()
+        try:
+            for kind, (model, column, popularity) in _TARGETS.items():
+                result = await db.stream(select(model.id, column, popularity).execution_options(yield_per=10000))
+                async for row in result:
+                    index.add(kind, row[0], row[1], row[2] or 0)
+            index.optimize()
+        finally:
+            self._building = None
+        self.index = index
+        self.ready = True
+
+    @property
+    def state(self) -> str:
+        if self.backend != "memory":
+            return "database"
+        return "ready" if self.ready else "warming"
+
+    def rewarm(self) -> None:
+        """Rebuild the index in the background; calls during a rebuild queue one more."""
+        if self.backend != "memory":
+            return
+        if self._rebuild is not None and not self._rebuild.done():
+            self._rebuild_again = True
+            return
+        self._rebuild = asyncio.create_task(self._run_rewarm())
+
+    async def _run_rewarm(self) -> None:
+        while True:
+            self._rebuild_again = False
+            try:
+                async with async_session_maker() as db:
+                    await self.warm(db)
+            except Exception:
+                logger.exception("Failed to rebuild the search index")
+            if not self._rebuild_again:
+                return
+
+    async def stop(self) -> None:
+        if self._rebuild is not None:
+            self._rebuild.cancel()
+            try:
+                await self._rebuild
+            except asyncio.CancelledError:
+                pass
+            self._rebuild = None
+
+    def _add(self, kind: str, doc_id: int, text: str, popularity: int = 0) -> None:
+        for index in (self.index, self._building):
+            if index is not None:
+                index.add(kind, doc_id, text, popularity)
+
+    def index_song(self, song: Song) -> None:
+        if self.backend == "memory":
+            self._add("song", song.id, song.title, song.plays or 0)
+
+    def index_album(self, album: Album) -> None:
+        if self.backend == "memory":
+            self._add("album", album.id, album.title)
+
+    def index_artist(self, artist: Artist) -> None:
+        if self.backend == "memory":
+            self._add("artist", artist.id, artist.name, artist.monthly_listeners or 0)
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        kinds: Sequence[str] = SEARCH_KINDS,
+        limit: int = 20,
+    ) -> List[SearchHit]:
+        query = query.strip()
+        if not query:
+            return []
+        if self.backend == "memory" and self.ready:
+            return self.index.search(query, kinds, limit)
+
+        trigram = self.backend != "memory"
+        hits: List[SearchHit] = []
+        for kind in kinds:
+            model, column, popularity = _TARGETS[kind]
+            prefix = _escape_like(query) + "%"
+            score = case((column.ilike(prefix, escape="\\"), 0.5), else_=0.0)
+            contains = column.ilike("%" + _escape_like(query) + "%", escape="\\")
+            if trigram:
+                # Both the %> operator and ILIKE are served by the gin_trgm_ops indexes
+                score = func.word_similarity(query, column) + score
+                match = or_(column.op("%>")(query), contains)
+            else:
+                # Stand-in while the in-process index warms: substring matches, prefixes first
+                score = score + 0.5
+                match = contains
+            stmt = select(model.id, column, score.label("score")).where(match).order_by(
+                score.desc(), popularity.desc()
+            ).limit(limit)
+            result = await db.execute(stmt)
+            hits.extend(SearchHit(kind, row[0], row[1], round(float(row[2]), 4)) for row in result)
+
+        return heapq.nlargest(limit, hits, key=lambda hit: hit.score)
+
+    async def search_ids(self, db: AsyncSession, kind: str, query: str, limit: int) -> List[int]:
+        return [hit.id for hit in await self.search(db, query, (kind,), limit)]
+
+
+search_engine = SearchEngine(settings.search_backend)
@@ -0,0 +1,114 @@
+import abc
+import asyncio
+import mimetypes
+import os
+import stat
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+from urllib.parse import urlsplit
+from app.config import settings
+
+
+def is_external(audio_url: str) -> bool:
+    """``Song.audio_url`` is either an absolute URL (a CDN) or a key in our own audio storage."""
+    return urlsplit(audio_url).scheme in ("http", "https")
+
+
+@dataclass(frozen=True)
+class AudioObject:
+    key: str
+    size: int
+    modified: datetime
+    etag: str
+    media_type: str
+    # Set by backends that keep objects on the local filesystem, for servers offering zero-copy sends
+    path: Optional[str] = None
+
+
+class AudioStorage(abc.ABC):
+    """Where licensed audio lives. Backends answer ``stat`` and stream byte ranges."""
+
+    @abc.abstractmethod
+    async def stat(self, key: str) -> Optional[AudioObject]:
+        ...
+
+    @abc.abstractmethod
+    def read(self, obj: AudioObject, start: int, length: int) -> AsyncIterator[bytes]:
+        ...
+
+    @abc.abstractmethod
+    def stats(self) -> dict:
+        ...
+
+
+class LocalAudioStorage(AudioStorage):
+    """Audio files under a root directory; keys are paths relative to it."""
+
+    def __init__(self, root: str, chunk_size: int):
+        self.root = os.path.realpath(root)
+        self.chunk_size = chunk_size
+        self.reads = 0
+        self.bytes_read = 0
+        self.missing = 0
+
+    def _resolve(self, key: str) -> Optional[str]:
+        path = os.path.realpath(os.path.join(self.root, key.lstrip("/")))
+        # Keys must not escape the root through "..", absolute paths or symlinks
+        if os.path.commonpath((self.root, path)) != self.root:
+            return None
+        return path
+
+    async def stat(self, key: str) -> Optional[AudioObject]:
+        path = self._resolve(key)
+        try:
+            result = await asyncio.to_thread(os.stat, path) if path else None
+        except OSError:
+            result = None
+        if result is None or not stat.S_ISREG(result.st_mode):
+            self.missing += 1
+            return None
+        return AudioObject(
+            key=key,
+            size=result.st_size,
+            modified=datetime.fromtimestamp(result.st_mtime, timezone.utc),
+            # Strong validator: any rewrite of the file changes size or mtime
+            etag=f'"{result.st_size:x}-{result.st_mtime_ns:x}"',
+            media_type=mimetypes.guess_type(path)[0] or "application/octet-stream",
+            path=path,
+        )
+
+    async def read(self, obj: AudioObject, start: int, length: int) -> AsyncIterator[bytes]:
+        self.reads += 1
+        fd = await asyncio.to_thread(os.open, obj.path, os.O_RDONLY)
+        try:
+            end = start + length
+            while start < end:
+                # pread keeps no file position, so one thread hop per chunk is all a read costs
+                chunk = await asyncio.to_thread(os.pread, fd, min(self.chunk_size, end - start), start)
+                if not chunk:
+                    return
+                start += len(chunk)
+                self.bytes_read += len(chunk)
+                yield chunk
+        finally:
+            os.close(fd)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "local",
+            "root": self.root,
+            "chunk_size": self.chunk_size,
+            "reads": self.reads,
+            "bytes_read": self.bytes_read,
+            "missing": self.missing,
+        }
+
+
+def _build_storage() -> AudioStorage:
+    if settings.audio_storage_backend != "local":
+        raise ValueError(f"Unknown audio storage backend {settings.audio_storage_backend!r}")
+    return LocalAudioStorage(settings.audio_storage_root, settings.audio_stream_chunk_bytes)
+
+
+audio_storage = _build_storage()
@@ -0,0 +1,280 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Literal, Optional, Tuple
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import async_session_maker, upsert
+from app.models.song import Song
+from app.models.artist import Artist
+from app.models.library import RecentlyPlayed
+from app.models.trending import TrendingSnapshotRow
+from app.services.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+TrendingWindow = Literal["24h", "7d", "30d"]
+
+WINDOWS: Dict[str, timedelta] = {
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+}
+
+TRENDING_TAG = "trending"
+
+# Serializes refreshes across workers on Postgres, next to the migration lock
+REFRESH_LOCK_ID = 247_002
+
+
+@dataclass(frozen=True)
+class TrendingSnapshot:
+    window: str
+    computed_at: datetime
+    songs: Tuple[int, ...]
+    albums: Tuple[int, ...]
+    artists: Tuple[int, ...]
+    refresh_ms: float
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands timestamps back without a timezone
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _pad(ranked: List[int], fallback: List[int], size: int) -> Tuple[int, ...]:
+    # Windows with few plays are topped up from all-time popularity
+    seen = set(ranked)
+    return tuple(ranked + [item for item in fallback if item not in seen])[:size]
+
+
+class TrendingRankings:
+    """Periodically ranks songs, albums and artists by plays over sliding windows.
+
+    Each refresh aggregates ``recently_played`` per window and swaps in immutable
+    snapshots of ranked ids, so featured endpoints only read a slice of a tuple.
+
+    The nine GROUP BYs behind a refresh are the expensive part, so they run
+    once per interval for the whole deployment rather than once per worker:
+    the result goes to ``trending_snapshots``, and a worker whose turn comes
+    first takes the stored snapshots if they are less than half an interval
+    old. On Postgres an advisory lock makes workers that tick together wait
+    for the one computing and then take its result. Timers are jittered so
+    workers do not tick together to begin with.
+    """
+
+    def __init__(self, refresh_interval: float, size: int):
+        self.refresh_interval = refresh_interval
+        self.size = size
+        self._snapshots: Dict[str, TrendingSnapshot] = {}
+        self._refresh_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.adopted = 0
+        self.failed_refreshes = 0
+
+    async def _rank(self, db: AsyncSession, key, since: datetime) -> List[int]:
+        plays = func.count().label("plays")
+        query = select(key, plays).select_from(RecentlyPlayed).where(RecentlyPlayed.played_at >= since)
+        if key is not RecentlyPlayed.song_id:
+            query = query.join(Song, Song.id == RecentlyPlayed.song_id).where(key.is_not(None))
+        query = query.group_by(key).order_by(plays.desc(), key).limit(self.size)
+        result = await db.execute(query)
+        return [row[0] for row in result]
+
+    async def _all_time(self, db: AsyncSession) -> Dict[str, List[int]]:
+        songs = await db.execute(select(Song.id).order_by(Song.plays.desc(), Song.id.desc()).limit(self.size))
+        album_plays = func.sum(Song.plays)
+        albums = await db.execute(
+            select(Song.album_id).where(Song.album_id.is_not(None)).group_by(Song.album_id)
+            .order_by(album_plays.desc(), Song.album_id.desc()).limit(self.size)
+        )
+        artists = await db.execute(
+            select(Artist.id).order_by(Artist.monthly_listeners.desc(), Artist.id.desc()).limit(self.size)
+        )
+        return {
+            "songs": list(songs.scalars()),
+            "albums": list(albums.scalars()),
+            "artists": list(artists.scalars()),
+        }
+
+    async def _compute(self, db: AsyncSession, now: datetime) -> Dict[str, TrendingSnapshot]:
+        snapshots = {}
+        fallback = await self._all_time(db)
+        for window, span in WINDOWS.items():
+            started = time.perf_counter()
+            since = now - span
+            songs = await self._rank(db, RecentlyPlayed.song_id, since)
+            albums = await self._rank(db, Song.album_id, since)
+            artists = await self._rank(db, Song.artist_id, since)
+            snapshots[window] = TrendingSnapshot(
+                window=window,
+                computed_at=now,
+                songs=_pad(songs, fallback["songs"], self.size),
+                albums=_pad(albums, fallback["albums"], self.size),
+                artists=_pad(artists, fallback["artists"], self.size),
+                refresh_ms=(time.perf_counter() - started) * 1000,
+            )
+        return snapshots
+
+    async def _load(self, db: AsyncSession) -> Dict[str, TrendingSnapshot]:
+        result = await db.execute(select(TrendingSnapshotRow))
+        return {
+            row.name: TrendingSnapshot(
+                window=row.name,
+                computed_at=_utc(row.computed_at),
+                songs=tuple(row.songs),
+                albums=tuple(row.albums),
+                artists=tuple(row.artists),
+                refresh_ms=row.refresh_ms,
+            )
+            for row in result.scalars()
+            if row.name in WINDOWS
+        }
+
+    async def _store(self, db: AsyncSession, snapshots: Dict[str, TrendingSnapshot]) -> None:
+        statement = upsert(db.bind.dialect.name, TrendingSnapshotRow.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=[TrendingSnapshotRow.name],
+            set_={
+                column: statement.excluded[column]
+                for column in ("computed_at", "songs", "albums", "artists", "refresh_ms")
+            },
+        )
+        await db.execute(statement, [
+            {
+                "name": snapshot.window,
+                "computed_at": snapshot.computed_at,
+                "songs": list(snapshot.songs),
+                "albums": list(snapshot.albums),
+                "artists": list(snapshot.artists),
+                "refresh_ms": snapshot.refresh_ms,
+            }
+            for snapshot in snapshots.values()
+        ])
+
+    def _fresh(self, snapshots: Dict[str, TrendingSnapshot], now: datetime) -> bool:
+        max_age = timedelta(seconds=self.refresh_interval / 2)
+        return len(snapshots) == len(WINDOWS) and all(
+            now - snapshot.computed_at < max_age for snapshot in snapshots.values()
+        )
+
+    async def refresh(self, force: bool = True) -> None:
+        async with self._refresh_lock:
+            if not force and self._snapshots:
+                # Another caller refreshed while we waited for the lock
+                return
+            try:
+                async with async_session_maker() as db:
+                    if db.bind.dialect.name == "postgresql":
+                        await db.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": REFRESH_LOCK_ID})
+                    stored = await self._load(db)
+                    now = datetime.now(timezone.utc)
+                    computed = not self._fresh(stored, now)
+                    if computed:
+                        snapshots = await self._compute(db, now)
+                        await self._store(db, snapshots)
+                    else:
+                        snapshots = stored
+                    await db.commit()
+            except Exception:
+                self.failed_refreshes += 1
+                raise
+
+            changed = {window: snapshot.computed_at for window, snapshot in snapshots.items()} != {
+                window: snapshot.computed_at for window, snapshot in self._snapshots.items()
+            }
+            # Swap all windows at once; readers keep whatever snapshot they already hold
+            self._snapshots = snapshots
+            if computed:
+                self.refreshes += 1
+            else:
+                self.adopted += 1
+        if changed:
+            await response_cache.invalidate(TRENDING_TAG)
+
+    async def load(self) -> None:
+        """Adopt the stored snapshots, whatever their age, without computing anything.
+
+        Used at startup; stale or missing windows are recomputed by the first
+        background refresh, which comes early when they are.
+        """
+        try:
+            async with async_session_maker() as db:
+                stored = await self._load(db)
+        except Exception:
+            self.failed_refreshes += 1
+            raise
+        if len(stored) == len(WINDOWS):
+            self._snapshots = stored
+            self.adopted += 1
+
+    def _first_delay(self) -> float:
+        if not self._snapshots:
+            return self.refresh_interval * random.uniform(0.0, 0.1)
+        oldest = min(snapshot.computed_at for snapshot in self._snapshots.values())
+        age = (datetime.now(timezone.utc) - oldest).total_seconds()
+        return max(self.refresh_interval - age, 0.0) + self.refresh_interval * random.uniform(0.0, 0.1)
+
+    async def snapshot(self, window: str) -> TrendingSnapshot:
+        if window not in self._snapshots:
+            await self.refresh(force=False)
+        return self._snapshots[window]
+
+    async def _run(self) -> None:
+        delay = self._first_delay()
+        while True:
+            await asyncio.sleep(delay)
+            delay = self.refresh_interval * random.uniform(0.9, 1.1)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh trending rankings")
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        now = datetime.now(timezone.utc)
+        return {
+            "refresh_interval_seconds": self.refresh_interval,
+            "refreshes": self.refreshes,
+            "adopted": self.adopted,
+            "failed_refreshes": self.failed_refreshes,
+            "windows": {
+                window: {
+                    "computed_at": snapshot.computed_at.isoformat(),
+                    "age_seconds": round((now - snapshot.computed_at).total_seconds(), 3),
+                    "stale": (now - snapshot.computed_at).total_seconds() > 2 * self.refresh_interval,
+                    "refresh_ms": round(snapshot.refresh_ms, 3),
+                    "songs": len(snapshot.songs),
+                    "albums": len(snapshot.albums),
+                    "artists": len(snapshot.artists),
+                }
+                for window, snapshot in self._snapshots.items()
+            },
+        }
+
+
+trending = TrendingRankings(
+    refresh_interval=settings.trending_refresh_seconds,
+    size=settings.trending_max_items,
+)
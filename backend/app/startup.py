@@ -0,0 +1,68 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Times each startup phase and the first request served, from app import on."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.ready_at: Optional[float] = None
+        self.first_request_at: Optional[float] = None
+        self.schema_revision: Optional[str] = None
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = (time.perf_counter() - started) * 1000
+
+    def ready(self) -> None:
+        self.ready_at = time.perf_counter()
+        logger.info("Startup finished in %.1f ms (%s)", self._ms(self.ready_at), self._phase_summary())
+
+    def first_request(self) -> None:
+        self.first_request_at = time.perf_counter()
+        logger.info("First request served %.1f ms after import", self._ms(self.first_request_at))
+
+    def _ms(self, at: Optional[float]) -> Optional[float]:
+        return round((at - self.started) * 1000, 3) if at is not None else None
+
+    def _phase_summary(self) -> str:
+        return ", ".join(f"{name} {ms:.1f} ms" for name, ms in self.phases.items())
+
+    def stats(self) -> dict:
+        return {
+            "schema_revision": self.schema_revision,
+            "phases_ms": {name: round(ms, 3) for name, ms in self.phases.items()},
+            "startup_ms": self._ms(self.ready_at),
+            "time_to_first_request_ms": self._ms(self.first_request_at),
+        }
+
+
+class FirstRequestTimer:
+    """ASGI middleware that marks the end of the first HTTP request, then gets out of the way."""
+
+    def __init__(self, app, timer: StartupTimer):
+        self.app = app
+        self.timer = timer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.timer.first_request_at is not None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if self.timer.first_request_at is None:
+                self.timer.first_request()
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,146 @@
+from contextlib import aclosing
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple
+import anyio
+from fastapi import Request, Response, status
+from app.conditional import http_date, is_not_modified, not_modified, CACHE_CONTROL_AUDIO
+from app.services.storage import AudioObject, AudioStorage
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range into (start, end) inclusive.
+
+    Returns None when the header should be ignored, which RFC 9110 allows for
+    syntax errors and for multiple ranges; the full body is served instead.
+    Players only ever ask for one range when seeking.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if first == "":
+            # Suffix range: the last N bytes
+            suffix = int(last)
+            if suffix <= 0 or size == 0:
+                raise RangeNotSatisfiable()
+            return max(size - suffix, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+def if_range_matches(if_range: str, obj: AudioObject) -> bool:
+    """If-Range uses the strong comparison: a weak ETag or a changed date means send it all."""
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == obj.etag
+    try:
+        since = parsedate_to_datetime(if_range)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return obj.modified.replace(microsecond=0) == since
+
+
+class AudioResponse(Response):
+    """Streams all or one range of an audio object.
+
+    Local files go out through the ASGI zero-copy extension when the server
+    offers it (sendfile from the file descriptor). Uvicorn does not, so under
+    the default server the storage backend's chunked reader is always used.
+    Client disconnects stop the read.
+    """
+
+    def __init__(self, storage: AudioStorage, obj: AudioObject, byte_range: Optional[Tuple[int, int]] = None, head: bool = False):
+        self.storage = storage
+        self.obj = obj
+        self.head = head
+        if byte_range is None:
+            self.start, self.length = 0, obj.size
+            status_code = status.HTTP_200_OK
+        else:
+            self.start, self.length = byte_range[0], byte_range[1] - byte_range[0] + 1
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+        super().__init__(status_code=status_code, media_type=obj.media_type, headers=audio_headers(obj))
+        self.headers["Content-Length"] = str(self.length)
+        if byte_range is not None:
+            self.headers["Content-Range"] = f"bytes {byte_range[0]}-{byte_range[1]}/{obj.size}"
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.head or not self.length:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if self.obj.path is not None and "http.response.zerocopysend" in extensions:
+            # Opening can block on slow disks, so it runs in a worker thread
+            async with await anyio.open_file(self.obj.path, "rb") as handle:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": handle.wrapped,
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False,
+                })
+            return
+
+        async with anyio.create_task_group() as task_group:
+
+            async def stream() -> None:
+                async with aclosing(self.storage.read(self.obj, self.start, self.length)) as chunks:
+                    async for chunk in chunks:
+                        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+                task_group.cancel_scope.cancel()
+
+            async def watch_disconnect() -> None:
+                while (await receive())["type"] != "http.disconnect":
+                    pass
+                task_group.cancel_scope.cancel()
+
+            task_group.start_soon(stream)
+            task_group.start_soon(watch_disconnect)
+
+
+def audio_headers(obj: AudioObject) -> dict:
+    return {
+        "Accept-Ranges": "bytes",
+        "ETag": obj.etag,
+        "Last-Modified": http_date(obj.modified),
+        "Cache-Control": CACHE_CONTROL_AUDIO,
+    }
+
+
+def stream_audio(request: Request, storage: AudioStorage, obj: AudioObject) -> Response:
+    """Pick 304, 416, 206 or 200 for a GET or HEAD of ``obj``."""
+    if is_not_modified(request, obj.etag, obj.modified):
+        return not_modified(audio_headers(obj))
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header is not None and (if_range is None or if_range_matches(if_range, obj)):
+        try:
+            byte_range = parse_range(range_header, obj.size)
+        except RangeNotSatisfiable:
+            return Response(
+                status_code=416,
+                headers={"Content-Range": f"bytes */{obj.size}", "Accept-Ranges": "bytes"},
+            )
+    return AudioResponse(storage, obj, byte_range, head=request.method == "HEAD")
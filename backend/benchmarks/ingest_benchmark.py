@@ -0,0 +1,123 @@
+"""Bulk catalog import throughput.
+
+Generates a synthetic NDJSON catalog dump and loads it with
+``app.services.ingest`` into a throwaway database, then loads a slice of the
+same catalog the way ``seed.py`` used to (ORM objects, ``refresh`` per
+artist and album) for comparison. Reports rows per second for both.
+
+    python -m benchmarks.ingest_benchmark --songs 200000
+    python -m benchmarks.ingest_benchmark --url postgresql+asyncpg://... --songs 5000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+from app.config import settings
+
+
+def write_dump(path: str, songs: int, artists: int, albums_per_artist: int, rng: random.Random) -> None:
+    with open(path, "w") as handle:
+        for a in range(artists):
+            handle.write(json.dumps({"type": "artist", "name": f"Artist {a}", "monthly_listeners": rng.randrange(10**6)}) + "\n")
+            for b in range(albums_per_artist):
+                handle.write(json.dumps({"type": "album", "artist": f"Artist {a}", "title": f"Album {a}-{b}"}) + "\n")
+        for s in range(songs):
+            a = rng.randrange(artists)
+            handle.write(json.dumps({
+                "type": "song", "artist": f"Artist {a}", "album": f"Album {a}-{rng.randrange(albums_per_artist)}",
+                "title": f"Song {s}", "duration": rng.randint(120, 360), "audio_url": f"https://audio/{s}.mp3",
+                "track_number": s % 12 + 1, "plays": rng.randrange(10**6),
+            }) + "\n")
+
+
+async def orm_rows(session_maker, path: str, limit: int) -> int:
+    # Row-at-a-time ORM inserts with a refresh per parent, as the old seeder did
+    from app.models import Album, Artist, Song
+    artist_ids, album_ids, rows = {}, {}, 0
+    async with session_maker() as db:
+        with open(path) as handle:
+            for line in handle:
+                record = json.loads(line)
+                if record["type"] == "artist":
+                    artist = Artist(name=record["name"] + " (orm)", monthly_listeners=record["monthly_listeners"])
+                    db.add(artist)
+                    await db.commit()
+                    await db.refresh(artist)
+                    artist_ids[record["name"]] = artist.id
+                elif record["type"] == "album":
+                    album = Album(title=record["title"], artist_id=artist_ids[record["artist"]])
+                    db.add(album)
+                    await db.commit()
+                    await db.refresh(album)
+                    album_ids[record["title"]] = album.id
+                else:
+                    db.add(Song(
+                        title=record["title"], artist_id=artist_ids[record["artist"]], album_id=album_ids[record["album"]],
+                        duration=record["duration"], audio_url=record["audio_url"],
+                        track_number=record["track_number"], plays=record["plays"],
+                    ))
+                    await db.commit()
+                rows += 1
+                if rows >= limit:
+                    break
+    return rows
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--songs", type=int, default=200_000)
+    parser.add_argument("--artists", type=int, default=2_000)
+    parser.add_argument("--albums-per-artist", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=settings.ingest_batch_size)
+    parser.add_argument("--orm-rows", type=int, default=5_000, help="rows loaded the old way for comparison")
+    parser.add_argument("--seed", type=int, default=247)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    url = args.url or f"sqlite+aiosqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+    # The app's engine and session maker are built from settings at import time
+    os.environ["DATABASE_URL"] = url
+    settings.database_url = url
+
+    from sqlalchemy import text
+    from app.database import Base, async_session_maker, engine
+    from app.services.ingest import import_catalog, read_file
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    dump = os.path.join(tmpdir.name, "catalog.ndjson")
+    write_dump(dump, args.songs, args.artists, args.albums_per_artist, random.Random(args.seed))
+    dump_mb = os.path.getsize(dump) / 2**20
+
+    report = await import_catalog(read_file(dump), "ndjson", args.batch_size)
+    bulk = report.to_dict()
+
+    started = time.perf_counter()
+    rows = await orm_rows(async_session_maker, dump, args.orm_rows)
+    orm_elapsed = time.perf_counter() - started
+
+    async with engine.connect() as conn:
+        songs = (await conn.execute(text("SELECT COUNT(*) FROM songs"))).scalar_one()
+    await engine.dispose()
+    tmpdir.cleanup()
+
+    print(json.dumps({
+        "dialect": engine.dialect.name,
+        "dump_mb": round(dump_mb, 1),
+        "batch_size": args.batch_size,
+        "bulk": bulk,
+        "orm": {"rows": rows, "elapsed_seconds": round(orm_elapsed, 3), "rows_per_second": round(rows / orm_elapsed, 1)},
+        "speedup": round(bulk["rows_per_second"] / (rows / orm_elapsed), 1),
+        "songs_in_database": songs,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
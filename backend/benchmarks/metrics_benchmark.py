@@ -0,0 +1,122 @@
+"""Overhead of request metrics and SQL query counters.
+
+Drives the app in-process (no sockets, so the numbers are not drowned in
+network noise) against a seeded temporary database and times the same
+requests with ``request_metrics`` switched on and off. Rounds alternate
+between the two modes so drift affects both equally. Also times
+``/metrics`` rendering once every route has series.
+
+    python -m benchmarks.metrics_benchmark --requests 2000 --rounds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+ROUTES = ("/api/health", "/api/songs/1", "/api/albums/1", "/api/playlists/{playlist_id}")
+
+
+async def timed_requests(client, path: str, count: int) -> list:
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = await client.get(path)
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == 200, (path, response.status_code)
+    return samples
+
+
+def bookkeeping_us(metrics, count: int = 100_000) -> dict:
+    # The instrumentation's own cost, without the request around it
+    class Context:
+        pass
+
+    context, scope = Context(), {"method": "GET"}
+    started = time.perf_counter()
+    for _ in range(count):
+        metrics._before_cursor_execute(None, None, "SELECT 1", None, context, False)
+        metrics._after_cursor_execute(None, None, "SELECT 1", None, context, False)
+    per_query = (time.perf_counter() - started) / count
+    started = time.perf_counter()
+    for _ in range(count):
+        request, token = metrics.start_request(scope)
+        metrics.finish_request(request, token, "GET", 200, 0.001)
+    per_request = (time.perf_counter() - started) / count
+    return {"per_query_us": round(per_query * 1e6, 2), "per_request_us": round(per_request * 1e6, 2)}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="per route, mode and round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--n-plus-one", action="store_true", help="also keep per-request statement counts")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+    os.environ["DB_AUTO_MIGRATE"] = "true"
+    os.environ["SEED_SAMPLE_DATA"] = "true"
+    os.environ["METRICS_DETECT_N_PLUS_ONE"] = "true" if args.n_plus_one else "false"
+    # Nothing should count as slow; sampling is not what is being measured
+    os.environ["METRICS_SLOW_QUERY_MS"] = "60000"
+
+    import httpx
+    from app.main import app
+    from app.metrics import request_metrics
+    from benchmarks.search_benchmark import percentiles
+
+    results = {route: {"on": [], "off": []} for route in ROUTES}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            token = (await client.post(
+                "/api/auth/register", json={"email": "bench@example.com", "username": "bench", "password": "bench"},
+            )).json()["access_token"]
+            playlist = (await client.post(
+                "/api/playlists", json={"name": "bench"}, headers={"Authorization": f"Bearer {token}"},
+            )).json()
+            for song_id in range(1, 6):
+                await client.post(
+                    f"/api/playlists/{playlist['id']}/songs", json={"song_id": song_id},
+                    headers={"Authorization": f"Bearer {token}"},
+                )
+
+            for route in ROUTES:
+                await timed_requests(client, route.format(playlist_id=playlist["id"]), 50)
+            for round_no in range(args.rounds):
+                for route in ROUTES:
+                    path = route.format(playlist_id=playlist["id"])
+                    for mode in (("off", "on") if round_no % 2 == 0 else ("on", "off")):
+                        request_metrics.enabled = mode == "on"
+                        results[route][mode].extend(await timed_requests(client, path, args.requests))
+            request_metrics.enabled = True
+
+            bookkeeping = bookkeeping_us(request_metrics)
+            started = time.perf_counter()
+            body = request_metrics.render()
+            render_ms = (time.perf_counter() - started) * 1000
+
+    tmpdir.cleanup()
+    report = {}
+    for route, modes in results.items():
+        off, on = percentiles(modes["off"]), percentiles(modes["on"])
+        report[route] = {
+            "off": off,
+            "on": on,
+            "overhead_us_mean": round((on["mean_ms"] - off["mean_ms"]) * 1000, 1),
+            "overhead_pct_mean": round((on["mean_ms"] / off["mean_ms"] - 1) * 100, 2),
+        }
+    print(json.dumps({
+        "requests_per_mode": args.requests * args.rounds,
+        "n_plus_one_detection": args.n_plus_one,
+        "routes": report,
+        "bookkeeping": bookkeeping,
+        "render_ms": round(render_ms, 3),
+        "render_bytes": len(body),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
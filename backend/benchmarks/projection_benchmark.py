@@ -0,0 +1,188 @@
+"""Entity loads vs column projection for song list endpoints.
+
+Seeds a throwaway database and runs the browse, featured and liked-songs queries
+both ways: full ORM entities through ``selectinload``, as the routers used to, and
+``app.queries`` column projection with shared artists and albums. Reports latency,
+peak Python memory per request, statements and rows read per request.
+
+    python -m benchmarks.projection_benchmark --songs 20000 --limit 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from app.database import Base
+from app.models import Album, Artist, LikedSong, Song, User
+from app.queries import SONG_COLUMNS, hydrate_songs, song_columns
+from app.serialization import dumps, song_serializer
+from benchmarks.search_benchmark import percentiles
+
+
+async def seed(session_maker, songs: int, artists: int, liked: int, rng: random.Random) -> None:
+    now = datetime.now(timezone.utc)
+    async with session_maker() as db:
+        await db.execute(insert(User), [{"email": "bench@example.com", "username": "bench", "hashed_password": "x"}])
+        await db.execute(insert(Artist), [
+            {"name": f"Artist {i}", "bio": "An artist biography. " * 40, "image_url": f"https://img/{i}", "monthly_listeners": rng.randrange(10**6)}
+            for i in range(1, artists + 1)
+        ])
+        await db.execute(insert(Album), [
+            {"title": f"Album {i}", "artist_id": (i - 1) % artists + 1, "cover_url": f"https://cover/{i}", "album_type": "album"}
+            for i in range(1, artists * 3 + 1)
+        ])
+        rows = []
+        for i in range(1, songs + 1):
+            album_id = rng.randrange(artists * 3) + 1
+            rows.append({
+                "title": f"Song {i}", "album_id": album_id, "artist_id": (album_id - 1) % artists + 1,
+                "duration": rng.randint(120, 360), "audio_url": f"https://audio/{i}.mp3",
+                "plays": rng.randrange(10**7), "track_number": i % 12 + 1,
+            })
+        await db.execute(insert(Song), rows)
+        await db.execute(insert(LikedSong), [
+            {"user_id": 1, "song_id": song_id, "created_at": now - timedelta(seconds=n)}
+            for n, song_id in enumerate(rng.sample(range(1, songs + 1), liked))
+        ])
+        await db.commit()
+
+
+def entity_queries(limit: int) -> dict:
+    song_options = (selectinload(Song.artist), selectinload(Song.album))
+    return {
+        "browse": select(Song).options(*song_options).order_by(Song.id).limit(limit),
+        "featured": select(Song).options(*song_options).order_by(Song.plays.desc(), Song.id.desc()).limit(limit),
+        "liked": select(LikedSong).options(
+            selectinload(LikedSong.song).selectinload(Song.artist),
+            selectinload(LikedSong.song).selectinload(Song.album),
+        ).where(LikedSong.user_id == 1).order_by(LikedSong.created_at.desc(), LikedSong.id.desc()).limit(limit),
+    }
+
+
+def projected_queries(limit: int) -> dict:
+    return {
+        "browse": song_columns().order_by(Song.id).limit(limit),
+        "featured": song_columns().order_by(Song.plays.desc(), Song.id.desc()).limit(limit),
+        "liked": select(LikedSong.id.label("liked_id"), LikedSong.created_at.label("liked_at"), *SONG_COLUMNS)
+        .join(Song, Song.id == LikedSong.song_id)
+        .where(LikedSong.user_id == 1)
+        .order_by(LikedSong.created_at.desc(), LikedSong.id.desc()).limit(limit),
+    }
+
+
+async def run_entity(db: AsyncSession, name: str, query) -> bytes:
+    result = await db.execute(query)
+    objs = result.scalars().all()
+    if name == "liked":
+        objs = [liked.song for liked in objs]
+    return song_serializer.dump_many(objs)
+
+
+async def run_projected(db: AsyncSession, name: str, query) -> bytes:
+    result = await db.execute(query)
+    return dumps(await hydrate_songs(db, result.all()))
+
+
+async def measure(session_maker, counter: dict, run, name: str, query, iterations: int) -> dict:
+    async with session_maker() as db:
+        body = await run(db, name, query)
+
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        async with session_maker() as db:
+            await run(db, name, query)
+        samples.append(time.perf_counter() - started)
+
+    # Memory and row counts on a separate pass so tracing doesn't skew the timings
+    peaks = []
+    for _ in range(max(iterations // 10, 1)):
+        counter["statements"] = counter["rows"] = 0
+        tracemalloc.start()
+        async with session_maker() as db:
+            await run(db, name, query)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    statements, rows = counter["statements"], counter["rows"]
+    return {
+        **percentiles(samples),
+        "peak_kb": round(sorted(peaks)[len(peaks) // 2] / 1024, 1),
+        "statements": statements,
+        "rows_read": rows,
+        "body_bytes": len(body),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--songs", type=int, default=20_000)
+    parser.add_argument("--artists", type=int, default=500)
+    parser.add_argument("--liked", type=int, default=2_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=247)
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+
+    engine = create_async_engine(url)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    await seed(session_maker, args.songs, args.artists, args.liked, random.Random(args.seed))
+
+    counter = {"statements": 0, "rows": 0}
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        counter["statements"] += 1
+
+    # Count rows as the result layer hands them over
+    from sqlalchemy.engine import cursor as cursor_module
+    fetchall = cursor_module.CursorResult._fetchall_impl
+
+    def counting_fetchall(self):
+        rows = fetchall(self)
+        counter["rows"] += len(rows)
+        return rows
+
+    cursor_module.CursorResult._fetchall_impl = counting_fetchall
+
+    results = {}
+    entity, projected = entity_queries(args.limit), projected_queries(args.limit)
+    for name in ("browse", "featured", "liked"):
+        results[name] = {
+            "entities": await measure(session_maker, counter, run_entity, name, entity[name], args.iterations),
+            "projected": await measure(session_maker, counter, run_projected, name, projected[name], args.iterations),
+        }
+
+    cursor_module.CursorResult._fetchall_impl = fetchall
+    await engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+    print(json.dumps({
+        "dialect": engine.dialect.name,
+        "songs": args.songs,
+        "limit": args.limit,
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
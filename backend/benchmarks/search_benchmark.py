@@ -0,0 +1,151 @@
+"""Search latency benchmark.
+
+Builds a synthetic catalog of song titles and measures query latency for exact,
+prefix, typo and multi-word queries. The in-process index is always measured;
+when DATABASE_URL points at Postgres the pg_trgm backend is measured too.
+
+    python -m benchmarks.search_benchmark --songs 1000000
+"""
+import argparse
+import asyncio
+import json
+import random
+import resource
+import statistics
+import time
+from typing import List
+
+from sqlalchemy import text
+
+from app.database import engine, async_session_maker
+from app.schema import upgrade
+from app.services.search import InMemorySearchIndex, SearchEngine
+
+SYLLABLES = [
+    "ka", "lo", "mi", "ra", "ne", "so", "tu", "vi", "da", "el", "fa", "go", "ha", "in",
+    "jo", "lu", "ma", "no", "or", "pe", "qui", "re", "sa", "ti", "un", "ve", "wa", "yo", "ze",
+]
+
+
+def make_vocabulary(size: int, rng: random.Random) -> List[str]:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def make_titles(count: int, vocabulary: List[str], rng: random.Random) -> List[str]:
+    # Zipf-ish word popularity so some terms have very long posting lists
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    words = rng.choices(vocabulary, weights=weights, k=count * 4)
+    titles = []
+    for i in range(count):
+        n = rng.randint(1, 4)
+        titles.append(" ".join(words[i * 4:i * 4 + n]).title())
+    return titles
+
+
+def make_queries(titles: List[str], rng: random.Random, count: int) -> List[str]:
+    queries = []
+    for _ in range(count):
+        title = rng.choice(titles).lower()
+        word = rng.choice(title.split())
+        kind = rng.randrange(4)
+        if kind == 0:
+            queries.append(word)
+        elif kind == 1:
+            queries.append(word[:max(2, len(word) // 2)])
+        elif kind == 2 and len(word) > 4:
+            i = rng.randrange(len(word))
+            queries.append(word[:i] + word[i + 1:])
+        else:
+            queries.append(" ".join(title.split()[:2]))
+    return queries
+
+
+def percentiles(samples: List[float]) -> dict:
+    samples = sorted(samples)
+    pick = lambda p: samples[min(len(samples) - 1, int(len(samples) * p))]
+    return {
+        "p50_ms": round(pick(0.50) * 1000, 3),
+        "p95_ms": round(pick(0.95) * 1000, 3),
+        "p99_ms": round(pick(0.99) * 1000, 3),
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+    }
+
+
+def bench_memory(titles: List[str], queries: List[str], limit: int) -> dict:
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    index = InMemorySearchIndex()
+    for i, title in enumerate(titles, 1):
+        index.add("song", i, title, popularity=len(titles) - i)
+    index.optimize()
+    build_seconds = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, limit=limit)
+        samples.append(time.perf_counter() - started)
+    return {
+        "backend": "memory",
+        "build_seconds": round(build_seconds, 2),
+        "index_memory_mb": round((rss_after - rss_before) / 1024, 1),
+        **percentiles(samples),
+    }
+
+
+async def bench_postgres(titles: List[str], queries: List[str], limit: int) -> dict:
+    await upgrade(engine)
+    async with engine.begin() as conn:
+        await conn.execute(text("TRUNCATE songs, albums, artists RESTART IDENTITY CASCADE"))
+        await conn.execute(text("INSERT INTO artists (name, monthly_listeners) VALUES ('Benchmark', 0)"))
+        started = time.perf_counter()
+        # unnest keeps this to one round trip per chunk instead of one per song
+        for offset in range(0, len(titles), 50000):
+            await conn.execute(
+                text(
+                    "INSERT INTO songs (title, artist_id, duration, audio_url, plays) "
+                    "SELECT t, 1, 200, '', 0 FROM unnest(CAST(:titles AS text[])) AS t"
+                ),
+                {"titles": titles[offset:offset + 50000]},
+            )
+        load_seconds = time.perf_counter() - started
+        await conn.execute(text("ANALYZE songs"))
+
+    search = SearchEngine("postgres")
+    samples = []
+    async with async_session_maker() as db:
+        await search.search(db, queries[0], ("song",), limit)
+        for query in queries:
+            started = time.perf_counter()
+            await search.search(db, query, ("song",), limit)
+            samples.append(time.perf_counter() - started)
+    return {"backend": "postgres", "load_seconds": round(load_seconds, 2), **percentiles(samples)}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--songs", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=247)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(args.vocabulary, rng)
+    titles = make_titles(args.songs, vocabulary, rng)
+    queries = make_queries(titles, rng, args.queries)
+
+    results = [bench_memory(titles, queries, args.limit)]
+    if engine.dialect.name == "postgresql":
+        results.append(await bench_postgres(titles, queries, args.limit))
+
+    print(json.dumps({"songs": args.songs, "queries": args.queries, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
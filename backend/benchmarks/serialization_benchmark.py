@@ -0,0 +1,126 @@
+"""Response serialization benchmark.
+
+Compares the per-row ``SongResponse.model_validate`` path, followed by FastAPI's
+``response_model`` validation and dump, against ``app.serialization`` building
+JSON bytes straight from ORM objects. Both are measured as plain function calls
+and as full requests through the ASGI app.
+
+    python -m benchmarks.serialization_benchmark --rows 100
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import date, datetime, timezone
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+from pydantic import TypeAdapter
+
+from app.models.album import Album
+from app.models.artist import Artist
+from app.models.song import Song
+from app.schemas.music import SongResponse
+from app.serialization import json_response, orjson, song_serializer
+from benchmarks.search_benchmark import percentiles
+
+
+def make_songs(count: int, rng: random.Random) -> List[Song]:
+    now = datetime.now(timezone.utc)
+    artists = [
+        Artist(id=i, name=f"Artist {i}", bio="Bio " * 20, image_url=f"https://img/{i}", monthly_listeners=rng.randrange(10**6), created_at=now)
+        for i in range(1, 11)
+    ]
+    albums = [
+        Album(id=i, title=f"Album {i}", artist_id=artist.id, artist=artist, cover_url=f"https://cover/{i}", release_date=date(2020, 1, 1), album_type="album", created_at=now)
+        for i, artist in enumerate(artists * 2, 1)
+    ]
+    songs = []
+    for i in range(1, count + 1):
+        album = rng.choice(albums)
+        songs.append(Song(
+            id=i, title=f"Song {i}", album_id=album.id, album=album, artist_id=album.artist_id, artist=album.artist,
+            duration=rng.randint(120, 360), audio_url=f"https://audio/{i}.mp3", plays=rng.randrange(10**7),
+            track_number=i % 12 + 1, created_at=now,
+        ))
+    return songs
+
+
+def time_calls(fn, iterations: int) -> dict:
+    fn()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+
+async def time_requests(client: httpx.AsyncClient, path: str, iterations: int) -> dict:
+    await client.get(path)
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = await client.get(path)
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == 200
+    return percentiles(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=247)
+    args = parser.parse_args()
+
+    songs = make_songs(args.rows, random.Random(args.seed))
+    adapter = TypeAdapter(List[SongResponse])
+
+    def validated() -> bytes:
+        # What a router returning model instances pays: per-row validation, then
+        # FastAPI validating the list against response_model and dumping it
+        models = [SongResponse.model_validate(song) for song in songs]
+        return adapter.dump_json(adapter.validate_python(models, from_attributes=True))
+
+    def fast() -> bytes:
+        return song_serializer.dump_many(songs)
+
+    assert json.loads(validated()) == json.loads(fast()), "serializers disagree"
+
+    app = FastAPI()
+
+    @app.get("/validated", response_model=List[SongResponse])
+    async def validated_endpoint():
+        return [SongResponse.model_validate(song) for song in songs]
+
+    @app.get("/fast", response_model=List[SongResponse])
+    async def fast_endpoint():
+        return json_response(song_serializer.dump_many(songs))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        endpoint_validated = await time_requests(client, "/validated", args.iterations)
+        endpoint_fast = await time_requests(client, "/fast", args.iterations)
+
+    results = {
+        "validated": time_calls(validated, args.iterations),
+        "fast": time_calls(fast, args.iterations),
+        "endpoint_validated": endpoint_validated,
+        "endpoint_fast": endpoint_fast,
+    }
+    results["speedup"] = round(results["validated"]["p50_ms"] / results["fast"]["p50_ms"], 1)
+    results["endpoint_speedup"] = round(endpoint_validated["p50_ms"] / endpoint_fast["p50_ms"], 1)
+
+    print(json.dumps({
+        "rows": args.rows,
+        "iterations": args.iterations,
+        "encoder": "orjson" if orjson is not None else "json",
+        "body_bytes": len(fast()),
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""Time-to-first-request for a freshly started API process.
+
+Starts uvicorn repeatedly and measures wall time from spawn until
+``/api/health`` first answers 200, for two startup modes:
+
+- ``check``: the default, a one-row alembic_version read against a migrated database
+- ``migrate+seed``: DB_AUTO_MIGRATE and SEED_SAMPLE_DATA on, close to the old
+  create_all + seed on every boot
+
+Also reports the per-phase breakdown from /api/stats/startup.
+
+    python -m benchmarks.startup_benchmark --runs 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.search_benchmark import percentiles
+
+MODES = {
+    "check": {},
+    "migrate+seed": {"DB_AUTO_MIGRATE": "true", "SEED_SAMPLE_DATA": "true"},
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def boot_once(env: dict, timeout: float) -> tuple:
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f"server exited with {process.returncode}")
+                if time.perf_counter() - started > timeout:
+                    raise TimeoutError("server did not answer in time")
+                try:
+                    response = await client.get("/api/health")
+                    if response.status_code == 200:
+                        elapsed = time.perf_counter() - started
+                        phases = (await client.get("/api/stats/startup")).json()
+                        return elapsed, phases
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.01)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+
+    base_env = {**os.environ, "DATABASE_URL": url, "STATS_PUBLIC": "true"}
+    # Migrate and seed once, out of band, as a deploy would
+    subprocess.run([sys.executable, "-m", "app.cli", "migrate"], env=base_env, check=True, capture_output=True)
+    subprocess.run([sys.executable, "-m", "app.cli", "seed"], env=base_env, check=True, capture_output=True)
+
+    results = {}
+    for mode, overrides in MODES.items():
+        samples, last_phases = [], None
+        for _ in range(args.runs):
+            elapsed, last_phases = await boot_once({**base_env, **overrides}, args.timeout)
+            samples.append(elapsed)
+        results[mode] = {**percentiles(samples), "phases_ms": last_phases["phases_ms"]}
+
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+    print(json.dumps({"runs": args.runs, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
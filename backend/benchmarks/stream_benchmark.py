@@ -0,0 +1,164 @@
+"""Audio streaming throughput under concurrent streams.
+
+Writes a set of synthetic audio files, points songs at them, starts uvicorn
+and runs concurrent clients against /api/songs/{id}/stream in two patterns:
+
+- ``full``: every client downloads whole files back to back
+- ``seek``: every client issues random ``Range`` requests, as a player does
+  when the user scrubs through a track
+
+Each pattern runs once per storage chunk size, so the effect of the read size
+on throughput and time to first byte is visible.
+
+    python -m benchmarks.stream_benchmark --streams 50 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.search_benchmark import percentiles
+from benchmarks.startup_benchmark import free_port
+
+
+def write_files(root: str, count: int, size: int) -> list:
+    keys = []
+    block = os.urandom(1 << 20)
+    for index in range(count):
+        key = f"bench/{index}.mp3"
+        os.makedirs(os.path.dirname(os.path.join(root, key)), exist_ok=True)
+        with open(os.path.join(root, key), "wb") as handle:
+            for offset in range(0, size, len(block)):
+                handle.write(block[: min(len(block), size - offset)])
+        keys.append(key)
+    return keys
+
+
+async def point_songs(url: str, keys: list) -> list:
+    from sqlalchemy import select, update
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.models.song import Song
+
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        ids = list((await conn.execute(select(Song.id).order_by(Song.id).limit(len(keys)))).scalars())
+        for song_id, key in zip(ids, keys):
+            await conn.execute(update(Song).where(Song.id == song_id).values(audio_url=key))
+    await engine.dispose()
+    return ids
+
+
+async def client(http: httpx.AsyncClient, pattern: str, ids: list, size: int, seek_bytes: int, deadline: float, rng: random.Random, out: dict) -> None:
+    while time.perf_counter() < deadline:
+        song_id = rng.choice(ids)
+        headers = {}
+        if pattern == "seek":
+            start = rng.randrange(0, size - seek_bytes)
+            headers["Range"] = f"bytes={start}-{start + seek_bytes - 1}"
+        started = time.perf_counter()
+        async with http.stream("GET", f"/api/songs/{song_id}/stream", headers=headers) as response:
+            expected = 206 if pattern == "seek" else 200
+            if response.status_code != expected:
+                out["errors"] += 1
+                continue
+            first = None
+            async for chunk in response.aiter_raw():
+                if first is None:
+                    first = time.perf_counter() - started
+                out["bytes"] += len(chunk)
+        out["ttfb"].append(first or 0.0)
+        out["latency"].append(time.perf_counter() - started)
+
+
+async def run_pattern(base_url: str, pattern: str, ids: list, args) -> dict:
+    out = {"bytes": 0, "errors": 0, "ttfb": [], "latency": []}
+    limits = httpx.Limits(max_connections=args.streams, max_keepalive_connections=args.streams)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as http:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            client(http, pattern, ids, args.file_mb << 20, args.seek_kb << 10, deadline, random.Random(args.seed + n), out)
+            for n in range(args.streams)
+        ))
+        elapsed = time.perf_counter() - started
+    return {
+        "requests": len(out["latency"]),
+        "errors": out["errors"],
+        "mb_per_second": round(out["bytes"] / elapsed / 2**20, 1),
+        "requests_per_second": round(len(out["latency"]) / elapsed, 1),
+        "ttfb": percentiles(out["ttfb"]),
+        "latency": percentiles(out["latency"]),
+    }
+
+
+async def wait_ready(base_url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url) as http:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with {process.returncode}")
+            try:
+                if (await http.get("/api/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.05)
+    raise TimeoutError("server did not answer in time")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--streams", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per pattern")
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--file-mb", type=int, default=8)
+    parser.add_argument("--seek-kb", type=int, default=256, help="bytes per range request in the seek pattern")
+    parser.add_argument("--chunk-sizes", default="65536,262144,1048576")
+    parser.add_argument("--seed", type=int, default=247)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    url = args.url or f"sqlite+aiosqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+    media = os.path.join(tmpdir.name, "media")
+    keys = write_files(media, args.files, args.file_mb << 20)
+
+    env = {**os.environ, "DATABASE_URL": url, "AUDIO_STORAGE_ROOT": media}
+    subprocess.run([sys.executable, "-m", "app.cli", "migrate"], env=env, check=True, capture_output=True)
+    subprocess.run([sys.executable, "-m", "app.cli", "seed"], env=env, check=True, capture_output=True)
+    ids = await point_songs(url, keys)
+
+    results = {}
+    for chunk_size in [int(value) for value in args.chunk_sizes.split(",")]:
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            env={**env, "AUDIO_STREAM_CHUNK_BYTES": str(chunk_size)},
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            await wait_ready(base_url, process)
+            results[chunk_size] = {pattern: await run_pattern(base_url, pattern, ids, args) for pattern in ("full", "seek")}
+        finally:
+            process.terminate()
+            process.wait()
+
+    tmpdir.cleanup()
+    print(json.dumps({
+        "streams": args.streams,
+        "duration_seconds": args.duration,
+        "file_mb": args.file_mb,
+        "seek_kb": args.seek_kb,
+        "results_by_chunk_size": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,11 @@
+import os
+
+# Tests never touch a real server; set before app.config is first imported
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
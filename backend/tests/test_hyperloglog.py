@@ -0,0 +1,56 @@
+import pytest
+from app.services.hyperloglog import HyperLogLog
+
+
+def sketch(values, precision: int = 11) -> HyperLogLog:
+    result = HyperLogLog(precision)
+    result.update(values)
+    return result
+
+
+def test_empty_sketch_counts_zero():
+    assert HyperLogLog().count() == 0
+
+
+def test_small_counts_are_near_exact():
+    assert sketch(range(100)).count() in range(98, 103)
+
+
+@pytest.mark.parametrize("distinct", [5_000, 50_000])
+def test_estimate_within_a_few_standard_errors(distinct):
+    estimate = sketch(range(distinct)).count()
+    # Precision 11 has a standard error of about 2.3%
+    assert abs(estimate - distinct) / distinct < 0.07
+
+
+def test_duplicates_do_not_count():
+    assert sketch(list(range(1000)) * 3).count() == sketch(range(1000)).count()
+
+
+def test_merge_equals_sketch_of_the_union():
+    left, right = sketch(range(0, 6000)), sketch(range(4000, 10_000))
+    left.merge(right)
+    assert left.registers == sketch(range(10_000)).registers
+
+
+def test_merge_rejects_other_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(11).merge(HyperLogLog(10))
+
+
+@pytest.mark.parametrize("precision", [10, 8, 4])
+def test_reduce_matches_a_sketch_built_at_the_lower_precision(precision):
+    values = range(20_000)
+    assert sketch(values, 12).reduce(precision).registers == sketch(values, precision).registers
+
+
+def test_reduce_cannot_raise_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(10).reduce(11)
+
+
+def test_bytes_round_trip():
+    original = sketch(range(500), 9)
+    restored = HyperLogLog.from_bytes(original.to_bytes())
+    assert restored.precision == 9
+    assert restored.registers == original.registers
@@ -0,0 +1,51 @@
+import pytest
+from app.services.ingest import csv_records
+
+HEADER = b"type,title,name\n"
+
+
+async def chunked(data: bytes, size: int):
+    for offset in range(0, len(data), size):
+        yield data[offset:offset + size]
+
+
+async def parse(data: bytes, size: int = 1 << 20):
+    return [record async for record in csv_records(chunked(data, size))]
+
+
+@pytest.mark.anyio
+async def test_literal_quote_in_unquoted_cell_stays_on_its_line():
+    data = HEADER + b'song,12" Mix,\nsong,B-Side,\nartist,,Someone\n'
+    assert await parse(data) == [
+        (2, {"type": "song", "title": '12" Mix'}),
+        (3, {"type": "song", "title": "B-Side"}),
+        (4, {"type": "artist", "name": "Someone"}),
+    ]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("size", [1, 3, 7, 1 << 20])
+async def test_quoted_cell_spans_lines_and_chunks(size):
+    data = HEADER + b'song,"Line one\nline ""two""\nline three",\nsong,Next,\n'
+    assert await parse(data, size) == [
+        (2, {"type": "song", "title": 'Line one\nline "two"\nline three'}),
+        (5, {"type": "song", "title": "Next"}),
+    ]
+
+
+@pytest.mark.anyio
+async def test_last_line_without_newline_and_blank_lines():
+    data = b"\xef\xbb\xbf" + HEADER + b"\nsong,First,\r\n\nsong,Last,"
+    assert await parse(data, 4) == [
+        (3, {"type": "song", "title": "First"}),
+        (5, {"type": "song", "title": "Last"}),
+    ]
+
+
+@pytest.mark.anyio
+async def test_unterminated_quote_is_reported():
+    data = HEADER + b'song,Fine,\nsong,"Never closed,\nmore\n'
+    assert await parse(data, 5) == [
+        (2, {"type": "song", "title": "Fine"}),
+        (3, {"__error__": "unterminated quoted cell"}),
+    ]
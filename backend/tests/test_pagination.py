@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, create_engine, select, text
+from app.pagination import (
+    NEXT_CURSOR_HEADER,
+    Keyset,
+    _sqlite_timestamp,
+    decode_cursor,
+    decode_offset,
+    encode_cursor,
+)
+
+metadata = MetaData()
+plays = Table(
+    "plays",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("played_at", DateTime(timezone=True)),
+)
+
+
+def test_cursor_round_trip_restores_datetimes():
+    played_at = datetime(2026, 3, 1, 12, 30, 5, 120000, tzinfo=timezone.utc)
+    cursor = encode_cursor([played_at, 42])
+    assert "=" not in cursor
+    assert decode_cursor(cursor, [plays.c.played_at, plays.c.id]) == [played_at, 42]
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor([1]), encode_cursor(["soon", 1])])
+def test_malformed_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor, [plays.c.played_at, plays.c.id])
+    assert raised.value.status_code == 400
+
+
+def test_offset_cursor():
+    assert decode_offset(None) == 0
+    assert decode_offset(encode_cursor([40])) == 40
+    for bad in (encode_cursor([-1]), encode_cursor(["40"])):
+        with pytest.raises(HTTPException):
+            decode_offset(bad)
+
+
+def test_sqlite_timestamp_matches_stored_text():
+    assert _sqlite_timestamp(datetime(2026, 3, 1, 12, 30, 5)) == "2026-03-01 12:30:05"
+    assert _sqlite_timestamp(datetime(2026, 3, 1, 12, 30, 5, 7)) == "2026-03-01 12:30:05.000007"
+
+
+def test_page_hands_out_a_cursor_only_when_more_rows_exist():
+    keyset = Keyset(plays.c.id)
+    headers = {}
+    assert keyset.page([1, 2, 3], 3, headers, key=lambda row: [row]) == [1, 2, 3]
+    assert NEXT_CURSOR_HEADER not in headers
+    assert keyset.page([1, 2, 3, 4], 3, headers, key=lambda row: [row]) == [1, 2, 3]
+    assert decode_cursor(headers[NEXT_CURSOR_HEADER], [plays.c.id]) == [3]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_keyset_pages_through_sqlite_timestamps(descending):
+    db = create_engine("sqlite://")
+    metadata.create_all(db)
+    with db.begin() as conn:
+        # Server defaults store whole seconds, SQLAlchemy writes microseconds
+        conn.execute(text(
+            "INSERT INTO plays (id, played_at) VALUES "
+            "(1, '2026-03-01 12:00:00'), (2, '2026-03-01 12:00:00'), "
+            "(3, '2026-03-01 12:00:00.500000'), (4, '2026-03-01 12:00:01'), "
+            "(5, '2026-03-01 12:00:01.250000')"
+        ))
+    keyset = Keyset(plays.c.played_at, plays.c.id, descending=descending)
+    seen, cursor = [], None
+    with db.connect() as conn:
+        while True:
+            headers = {}
+            rows = conn.execute(keyset.apply(select(plays), cursor, 2)).all()
+            page = keyset.page(rows, 2, headers, key=lambda row: [row.played_at, row.id])
+            seen.extend(row.id for row in page)
+            cursor = headers.get(NEXT_CURSOR_HEADER)
+            if cursor is None:
+                break
+    assert seen == ([5, 4, 3, 2, 1] if descending else [1, 2, 3, 4, 5])
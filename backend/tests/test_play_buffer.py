@@ -0,0 +1,96 @@
+import importlib
+import pytest
+from sqlalchemy import exc
+from app.services.play_buffer import PlayBuffer
+
+# app.services re-exports the play_buffer instance under the module's name
+play_buffer_module = importlib.import_module("app.services.play_buffer")
+
+
+class FailingSession:
+    def __init__(self, error: Exception):
+        self.error = error
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, *args, **kwargs):
+        raise self.error
+
+
+@pytest.fixture
+def failing_db(monkeypatch):
+    def install(error: Exception):
+        monkeypatch.setattr(play_buffer_module, "async_session_maker", lambda: FailingSession(error))
+    return install
+
+
+def integrity_error() -> exc.IntegrityError:
+    return exc.IntegrityError("INSERT INTO recently_played", {}, Exception("foreign key"))
+
+
+@pytest.mark.anyio
+async def test_failed_flush_keeps_events_for_retry(failing_db):
+    failing_db(integrity_error())
+    buffer = PlayBuffer(flush_interval=1, max_events=10, max_buffered=100, max_retries=3)
+    buffer.record(1, 7)
+    buffer.record(2, 7)
+
+    with pytest.raises(exc.IntegrityError):
+        await buffer.flush()
+
+    assert buffer.stats()["buffered_events"] == 2
+    assert buffer.pending(7) == 2
+    assert buffer.failed_flushes == 1
+
+
+@pytest.mark.anyio
+async def test_batch_quarantined_after_max_retries(failing_db):
+    failing_db(integrity_error())
+    buffer = PlayBuffer(flush_interval=1, max_events=10, max_buffered=100, max_retries=3)
+    buffer.record(1, 7)
+
+    for _ in range(3):
+        with pytest.raises(exc.IntegrityError):
+            await buffer.flush()
+
+    stats = buffer.stats()
+    assert stats["buffered_events"] == 0
+    assert stats["quarantined_events"] == 1
+    assert buffer.pending(7) == 0
+    assert [event["song_id"] for event in buffer.quarantined] == [7]
+
+
+@pytest.mark.anyio
+async def test_unreachable_database_never_quarantines(failing_db):
+    failing_db(exc.OperationalError("SELECT 1", {}, ConnectionRefusedError()))
+    buffer = PlayBuffer(flush_interval=1, max_events=10, max_buffered=100, max_retries=2)
+    buffer.record(1, 7)
+
+    for _ in range(5):
+        with pytest.raises(exc.OperationalError):
+            await buffer.flush()
+
+    assert buffer.stats()["buffered_events"] == 1
+    assert buffer.quarantined_events == 0
+
+
+@pytest.mark.anyio
+async def test_buffer_cap_drops_oldest(failing_db):
+    failing_db(exc.OperationalError("SELECT 1", {}, ConnectionRefusedError()))
+    buffer = PlayBuffer(flush_interval=1, max_events=100, max_buffered=3, max_retries=5)
+    for song_id in range(1, 5):
+        buffer.record(1, song_id)
+
+    with pytest.raises(exc.OperationalError):
+        await buffer.flush()
+    buffer.record(1, 5)
+
+    stats = buffer.stats()
+    assert stats["buffered_events"] == 3
+    assert stats["dropped_events"] == 2
+    assert [event["song_id"] for event in buffer._events] == [3, 4, 5]
+    assert buffer.pending(1) == 0 and buffer.pending(2) == 0
@@ -0,0 +1,121 @@
+import httpx
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.auth import Principal, get_current_principal
+from app.database import Base, get_db
+from app.main import app
+from app.models import Album, Artist, Playlist, PlaylistSong, Song, User
+
+# Song id -> duration; songs 1-3 start in the playlist, in that order
+DURATIONS = {1: 100, 2: 200, 3: 300, 4: 400, 5: 500}
+
+
+@pytest.fixture
+async def client():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [{"id": 1, "email": "a@b.com", "username": "a", "hashed_password": "x"}])
+        await conn.execute(insert(Artist), [{"id": 1, "name": "Artist"}])
+        await conn.execute(insert(Album), [{"id": 1, "title": "Album", "artist_id": 1}])
+        await conn.execute(insert(Song), [
+            {"id": song_id, "title": f"Song {song_id}", "artist_id": 1, "album_id": 1,
+             "duration": duration, "audio_url": f"/audio/{song_id}.mp3"}
+            for song_id, duration in DURATIONS.items()
+        ])
+        await conn.execute(insert(Playlist), [{
+            "id": 1, "name": "Mix", "user_id": 1, "version": 1,
+            "song_count": 3, "total_duration": 600, "max_position": 3,
+        }])
+        await conn.execute(insert(PlaylistSong), [
+            {"playlist_id": 1, "song_id": song_id, "position": song_id} for song_id in (1, 2, 3)
+        ])
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override_db():
+        async with session_maker() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_current_principal] = lambda: Principal(id=1, email="a@b.com", username="a")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        http.session_maker = session_maker
+        yield http
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+async def edit(client, *operations):
+    response = await client.patch("/api/playlists/1/songs", json={"operations": list(operations)})
+    return response.status_code, response.json()
+
+
+async def stored(client):
+    """Song ids in playlist order, and the playlist's aggregate columns."""
+    async with client.session_maker() as db:
+        order = (await db.execute(
+            select(PlaylistSong.song_id).where(PlaylistSong.playlist_id == 1).order_by(PlaylistSong.position)
+        )).scalars().all()
+        playlist = await db.get(Playlist, 1)
+        return list(order), (playlist.song_count, playlist.total_duration, playlist.max_position, playlist.version)
+
+
+@pytest.mark.anyio
+async def test_append_keeps_existing_positions(client):
+    status, body = await edit(client, {"op": "add", "song_ids": [4, 5, 4, 99, 1]})
+    assert status == 200
+    assert body["added"] == [{"song_id": 4, "position": 4}, {"song_id": 5, "position": 5}]
+    assert body["moved"] == []
+    assert (body["duplicates"], body["missing"]) == ([4, 1], [99])
+    assert (body["song_count"], body["total_duration"], body["version"]) == (5, 1500, 2)
+    assert await stored(client) == ([1, 2, 3, 4, 5], (5, 1500, 5, 2))
+
+
+@pytest.mark.anyio
+async def test_insert_and_remove_renumber(client):
+    status, body = await edit(
+        client,
+        {"op": "add", "song_ids": [4], "index": 0},
+        {"op": "remove", "song_ids": [2, 5]},
+    )
+    assert status == 200
+    assert body["removed"] == [2]
+    assert body["not_in_playlist"] == [5]
+    assert body["added"] == [{"song_id": 4, "position": 1}]
+    assert body["moved"] == [{"song_id": 1, "position": 2}]
+    assert await stored(client) == ([4, 1, 3], (3, 800, 3, 2))
+
+
+@pytest.mark.anyio
+async def test_move_and_reorder(client):
+    status, body = await edit(client, {"op": "move", "song_id": 3, "index": 0})
+    assert status == 200
+    assert await stored(client) == ([3, 1, 2], (3, 600, 3, 2))
+
+    status, body = await edit(client, {"op": "reorder", "song_ids": [2, 3, 1]})
+    assert status == 200
+    assert body["moved"] == [{"song_id": 3, "position": 2}, {"song_id": 1, "position": 3}, {"song_id": 2, "position": 1}]
+    assert await stored(client) == ([2, 3, 1], (3, 600, 3, 3))
+
+
+@pytest.mark.anyio
+async def test_no_op_batch_leaves_the_version(client):
+    status, body = await edit(client, {"op": "move", "song_id": 1, "index": 0}, {"op": "add", "song_ids": [2]})
+    assert status == 200
+    assert body["version"] == 1
+    assert await stored(client) == ([1, 2, 3], (3, 600, 3, 1))
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("operation", [
+    {"op": "reorder", "song_ids": [1, 2]},
+    {"op": "reorder", "song_ids": [1, 2, 2]},
+    {"op": "move", "song_id": 1},
+])
+async def test_invalid_batches_change_nothing(client, operation):
+    status, _ = await edit(client, {"op": "add", "song_ids": [4]}, operation)
+    assert status == 400
+    assert await stored(client) == ([1, 2, 3], (3, 600, 3, 1))
@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+import pytest
+from starlette.requests import Request
+from app.conditional import http_date
+from app.services.storage import AudioObject
+from app.streaming import RangeNotSatisfiable, if_range_matches, parse_range, stream_audio
+
+SIZE = 1000
+OBJ = AudioObject(
+    key="1.mp3",
+    size=SIZE,
+    modified=datetime(2026, 3, 1, 12, 0, 0, 250000, tzinfo=timezone.utc),
+    etag='"abc"',
+    media_type="audio/mpeg",
+)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=900-", (900, 999)),
+    ("bytes=900-5000", (900, 999)),
+    ("BYTES = 10-10", (10, 10)),
+    # Suffix ranges: the last N bytes, all of them when N exceeds the size
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+])
+def test_satisfiable_ranges(header, expected):
+    assert parse_range(header, SIZE) == expected
+
+
+@pytest.mark.parametrize("header", [
+    # Inverted, multiple, other units and syntax errors are ignored: the full body is sent
+    "bytes=500-100",
+    "bytes=0-99,200-299",
+    "items=0-10",
+    "bytes=abc-",
+    "bytes=10",
+    "bytes=-",
+])
+def test_ignored_ranges(header):
+    assert parse_range(header, SIZE) is None
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=1000-", SIZE),
+    ("bytes=5000-6000", SIZE),
+    ("bytes=-0", SIZE),
+    ("bytes=-10", 0),
+])
+def test_unsatisfiable_ranges(header, size):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, size)
+
+
+def test_if_range_matches_strong_etag_only():
+    assert if_range_matches('"abc"', OBJ)
+    assert not if_range_matches('"other"', OBJ)
+    assert not if_range_matches('W/"abc"', OBJ)
+
+
+def test_if_range_matches_exact_date():
+    assert if_range_matches(http_date(OBJ.modified), OBJ)
+    assert not if_range_matches("Sun, 01 Mar 2026 11:59:59 GMT", OBJ)
+    assert not if_range_matches("not a date", OBJ)
+
+
+def request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/songs/1/stream",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_unsatisfiable_range_answers_416():
+    response = stream_audio(request(range="bytes=2000-"), storage=None, obj=OBJ)
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{SIZE}"
+
+
+@pytest.mark.parametrize("if_range, status", [('"abc"', 206), ('"stale"', 200)])
+def test_if_range_decides_between_partial_and_full(if_range, status):
+    response = stream_audio(request(range="bytes=0-99", if_range=if_range), storage=None, obj=OBJ)
+    assert response.status_code == status
@@ -2,8 +2,8 @@
 
 import { useState, useEffect } from 'react';
 import { FaSearch } from 'react-icons/fa';
-import { Song, Album, Artist } from '@/utils/types';
-import { songsApi, albumsApi, artistsApi } from '@/utils/api';
+import { Song, Album, Artist, SearchResults } from '@/utils/types';
+import { searchApi } from '@/utils/api';
 import { SongCard, AlbumCard, ArtistCard } from '@/components/ui/Cards';
 import Sidebar from '@/components/layout/Sidebar';
 import Header from '@/components/layout/Header';
@@ -40,20 +40,11 @@ export default function SearchPage() {
             setLoading(true);
             setHasSearched(true);
             try {
-                const [songsRes, albumsRes, artistsRes] = await Promise.all([
-                    songsApi.getAll(0, 10, query),
-                    albumsApi.getAll(0, 10),
-                    artistsApi.getAll(0, 10),
-                ]);
-
-                setSongs(songsRes);
-                // Filter albums and artists client-side since backend might not support search
-                setAlbums(albumsRes.filter((a: Album) =>
-                    a.title.toLowerCase().includes(query.toLowerCase())
-                ));
-                setArtists(artistsRes.filter((a: Artist) =>
-                    a.name.toLowerCase().includes(query.toLowerCase())
-                ));
+                const results: SearchResults = await searchApi.search(query, 30);
+
+                setSongs(results.songs);
+                setAlbums(results.albums);
+                setArtists(results.artists);
             } catch (error) {
                 console.error('Search failed:', error);
             } finally {
@@ -31,7 +31,7 @@ export default function Player() {
     // Handle song change
     useEffect(() => {
         if (!audioRef.current || !currentSong) return;
-        audioRef.current.src = currentSong.audio_url;
+        audioRef.current.src = songsApi.streamUrl(currentSong.id);
         audioRef.current.load();
         if (isPlaying) {
             audioRef.current.play().catch(() => setIsPlaying(false));
@@ -1,9 +1,12 @@
 import axios from 'axios';
+import { Album, Artist, Page, PlaylistDiff, PlaylistOperation, Song } from './types';
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
 export const api = axios.create({
     baseURL: API_BASE_URL,
+    // Sends the API's read-your-writes cookie back when reads go to replicas
+    withCredentials: true,
     headers: {
         'Content-Type': 'application/json',
     },
@@ -20,6 +23,18 @@ api.interceptors.request.use((config) => {
     return config;
 });
 
+// Cursor-paginated list endpoints return the next page's cursor in a header
+const getPage = async <T>(url: string, params: Record<string, string>): Promise<Page<T>> => {
+    const { data, headers } = await api.get(`${url}?${new URLSearchParams(params)}`);
+    return { items: data, nextCursor: headers['x-next-cursor'] ?? null };
+};
+
+const pageParams = (limit: number, cursor?: string | null) => {
+    const params: Record<string, string> = { limit: String(limit) };
+    if (cursor) params.cursor = cursor;
+    return params;
+};
+
 // API functions
 export const authApi = {
     register: async (email: string, username: string, password: string) => {
@@ -52,6 +67,8 @@ export const songsApi = {
         const { data } = await api.get(`/api/songs/featured?limit=${limit}`);
         return data;
     },
+    getPage: (cursor?: string | null, limit = 20) =>
+        getPage<Song>('/api/songs', pageParams(limit, cursor)),
     getById: async (id: number) => {
         const { data } = await api.get(`/api/songs/${id}`);
         return data;
@@ -60,6 +77,8 @@ export const songsApi = {
         const { data } = await api.post(`/api/songs/${id}/play`);
         return data;
     },
+    // Range-capable stream; redirects to the CDN for songs hosted elsewhere
+    streamUrl: (id: number) => `${API_BASE_URL}/api/songs/${id}/stream`,
 };
 
 export const albumsApi = {
@@ -67,6 +86,8 @@ export const albumsApi = {
         const { data } = await api.get(`/api/albums?skip=${skip}&limit=${limit}`);
         return data;
     },
+    getPage: (cursor?: string | null, limit = 20) =>
+        getPage<Album>('/api/albums', pageParams(limit, cursor)),
     getFeatured: async (limit = 10) => {
         const { data } = await api.get(`/api/albums/featured?limit=${limit}`);
         return data;
@@ -82,6 +103,8 @@ export const artistsApi = {
         const { data } = await api.get(`/api/artists?skip=${skip}&limit=${limit}`);
         return data;
     },
+    getPage: (cursor?: string | null, limit = 20) =>
+        getPage<Artist>('/api/artists', pageParams(limit, cursor)),
     getFeatured: async (limit = 10) => {
         const { data } = await api.get(`/api/artists/featured?limit=${limit}`);
         return data;
@@ -92,6 +115,14 @@ export const artistsApi = {
     },
 };
 
+export const searchApi = {
+    search: async (q: string, limit = 20) => {
+        const params = new URLSearchParams({ q, limit: String(limit) });
+        const { data } = await api.get(`/api/search?${params}`);
+        return data;
+    },
+};
+
 export const playlistsApi = {
     getMine: async () => {
         const { data } = await api.get('/api/playlists');
@@ -105,6 +136,8 @@ export const playlistsApi = {
         const { data } = await api.get(`/api/playlists/${id}`);
         return data;
     },
+    getSongsPage: (id: number, limit = 100, cursor?: string | null) =>
+        getPage<Song>(`/api/playlists/${id}/songs`, pageParams(limit, cursor)),
     create: async (name: string, description?: string) => {
         const { data } = await api.post('/api/playlists', { name, description });
         return data;
@@ -116,6 +149,10 @@ export const playlistsApi = {
     removeSong: async (playlistId: number, songId: number) => {
         await api.delete(`/api/playlists/${playlistId}/songs/${songId}`);
     },
+    editSongs: async (playlistId: number, operations: PlaylistOperation[]): Promise<PlaylistDiff> => {
+        const { data } = await api.patch(`/api/playlists/${playlistId}/songs`, { operations });
+        return data;
+    },
     delete: async (id: number) => {
         await api.delete(`/api/playlists/${id}`);
     },
@@ -126,6 +163,8 @@ export const libraryApi = {
         const { data } = await api.get('/api/library/liked');
         return data;
     },
+    getLikedSongsPage: (cursor?: string | null, limit = 50) =>
+        getPage<Song>('/api/library/liked', pageParams(limit, cursor)),
     likeSong: async (songId: number) => {
         const { data } = await api.post(`/api/library/liked/${songId}`);
         return data;
@@ -137,6 +176,13 @@ export const libraryApi = {
         const { data } = await api.get(`/api/library/liked/${songId}/check`);
         return data;
     },
+    // Liked subset of a whole track list in one request (up to 500 ids)
+    checkLiked: async (songIds: number[]): Promise<number[]> => {
+        const params = new URLSearchParams();
+        songIds.forEach((id) => params.append('song_ids', String(id)));
+        const { data } = await api.get(`/api/library/liked/check?${params}`);
+        return data.liked;
+    },
     getRecentlyPlayed: async () => {
         const { data } = await api.get('/api/library/recently-played');
         return data;
@@ -30,6 +30,8 @@ export interface Song {
     plays: number;
     track_number?: number;
     created_at: string;
+    // Present when a list is requested with with_liked=true
+    is_liked?: boolean;
 }
 
 export interface Playlist {
@@ -46,6 +48,50 @@ export interface Playlist {
     total_duration?: number;
 }
 
+export interface PlaylistOperation {
+    op: 'add' | 'remove' | 'move' | 'reorder';
+    song_ids?: number[];
+    song_id?: number;
+    index?: number;
+}
+
+export interface PlaylistTrackPosition {
+    song_id: number;
+    position: number;
+}
+
+export interface PlaylistDiff {
+    version: number;
+    song_count: number;
+    total_duration: number;
+    added: PlaylistTrackPosition[];
+    moved: PlaylistTrackPosition[];
+    removed: number[];
+    missing: number[];
+    duplicates: number[];
+    not_in_playlist: number[];
+}
+
+export interface SearchHit {
+    type: 'song' | 'album' | 'artist';
+    id: number;
+    title: string;
+    score: number;
+}
+
+export interface SearchResults {
+    query: string;
+    results: SearchHit[];
+    songs: Song[];
+    albums: Album[];
+    artists: Artist[];
+}
+
+export interface Page<T> {
+    items: T[];
+    nextCursor: string | null;
+}
+
 export interface User {
     id: number;
     email: string;